@@ -1,8 +1,15 @@
 import streamlit as st
-import pandas as pd
 from datetime import datetime, timedelta
+import os
 import random
-from transformers import AutoTokenizer, AutoModelForSeq2SeqLM
+
+# Light on purpose: pandas, httpx and transformers are imported where they
+# are first needed, so the page renders without waiting for them
+from backend.inference import INFERENCE_URL, InferenceClient, InferenceUnavailable, LazyModel
+
+# Start loading the model in the background as soon as the app starts,
+# rather than when the first plan is requested
+PLANNER_WARM_UP = os.getenv("PLANNER_WARM_UP", "false").lower() in ("1", "true", "yes")
 
 def display_berth_map(rows=3, berths_per_row=4, taken_berths=None, key_prefix="train_berth"):
     taken_berths = taken_berths or []
@@ -39,17 +46,28 @@ def display_berth_map(rows=3, berths_per_row=4, taken_berths=None, key_prefix="t
 st.set_page_config(page_title="Travel Planner & Booking System", page_icon="🌍", layout="centered")
 
 # ---------- Load model ---
+# One per server process, shared by every session. Nothing is loaded until
+# the first plan is requested (or PLANNER_WARM_UP starts it early);
+# INFERENCE_BACKEND picks fp32 torch, int8 or ONNX Runtime
 @st.cache_resource
+def get_local_model():
+    return LazyModel("google/flan-t5-base")
+
 def load_model():
     try:
-        tok = AutoTokenizer.from_pretrained("google/flan-t5-base")
-        mdl = AutoModelForSeq2SeqLM.from_pretrained("google/flan-t5-base")
-        return tok, mdl
+        return get_local_model().get()
     except Exception as e:
         st.error(f"Error loading AI model: {e}")
         return None, None
 
-tokenizer, model = load_model()
+# With INFERENCE_URL set, plans come from the shared inference worker
+# (python -m backend.inference_server) instead of a model in this process
+@st.cache_resource
+def get_inference_client():
+    return InferenceClient(INFERENCE_URL)
+
+if PLANNER_WARM_UP and not INFERENCE_URL:
+    get_local_model().warm_up()
 
 # ---------- Tabs ----------
 tab1, tab2, tab3 = st.tabs(["🗺 Travel Planner", "✈ Flight Booking", "🚆 Train Booking"])
@@ -74,40 +92,50 @@ with tab1:
     if submit:
         if not destination or not month or not interests:
             st.warning("Please fill in Destination, Month/Season, and Interests.")
-        elif tokenizer is None or model is None:
-            st.error("AI model is not available. Please check your internet connection and try again.")
         else:
-            with st.spinner("Generating your travel plan..."):
-                try:
-                    prompt = (
-                        f"Plan a {days}-day {travel_type.lower()} trip to {destination} in {month}. "
-                        f"Budget: {budget or 'not specified'}. "
-                        f"The traveler prefers a {pace.lower()} itinerary and will stay in a {accommodation}. "
-                        f"Interests include {interests}. "
-                    )
-                    if special_requests.strip():
-                        prompt += f"Special requests: {special_requests.strip()}. "
-                    prompt += (
-                        "Provide a detailed, day‑by‑day itinerary with morning, afternoon, and evening plans. "
-                        "Include food recommendations, accommodations, transport tips, and safety advice."
-                    )
-
-                    inputs = tokenizer(prompt, return_tensors="pt", truncation=True, max_length=512)
-                    outputs = model.generate(
-                        **inputs,
-                        max_new_tokens=500,
-                        temperature=0.9,
-                        top_p=0.95,
-                        repetition_penalty=1.5,
-                        no_repeat_ngram_size=3,
-                    )
-                    plan = tokenizer.decode(outputs[0], skip_special_tokens=True)
-
-                    st.subheader("Your AI‑Generated Travel Plan")
-                    st.markdown(plan.replace("\n", "\n\n"))
-                except Exception as e:
-                    st.error(f"Error generating travel plan: {e}")
-                    st.info("Please try again with a shorter description or check your internet connection.")
+            tokenizer, model = None, None
+            if not INFERENCE_URL:
+                with st.spinner("Loading the AI model..."):
+                    tokenizer, model = load_model()
+            if not INFERENCE_URL and (tokenizer is None or model is None):
+                st.error("AI model is not available. Please check your internet connection and try again.")
+            else:
+                with st.spinner("Generating your travel plan..."):
+                    try:
+                        prompt = (
+                            f"Plan a {days}-day {travel_type.lower()} trip to {destination} in {month}. "
+                            f"Budget: {budget or 'not specified'}. "
+                            f"The traveler prefers a {pace.lower()} itinerary and will stay in a {accommodation}. "
+                            f"Interests include {interests}. "
+                        )
+                        if special_requests.strip():
+                            prompt += f"Special requests: {special_requests.strip()}. "
+                        prompt += (
+                            "Provide a detailed, day‑by‑day itinerary with morning, afternoon, and evening plans. "
+                            "Include food recommendations, accommodations, transport tips, and safety advice."
+                        )
+
+                        if INFERENCE_URL:
+                            plan = get_inference_client().generate(prompt, max_new_tokens=500).text
+                        else:
+                            inputs = tokenizer(prompt, return_tensors="pt", truncation=True, max_length=512)
+                            outputs = model.generate(
+                                **inputs,
+                                max_new_tokens=500,
+                                temperature=0.9,
+                                top_p=0.95,
+                                repetition_penalty=1.5,
+                                no_repeat_ngram_size=3,
+                            )
+                            plan = tokenizer.decode(outputs[0], skip_special_tokens=True)
+
+                        st.subheader("Your AI‑Generated Travel Plan")
+                        st.markdown(plan.replace("\n", "\n\n"))
+                    except InferenceUnavailable as e:
+                        st.error(f"The AI planner is not reachable right now: {e}")
+                    except Exception as e:
+                        st.error(f"Error generating travel plan: {e}")
+                        st.info("Please try again with a shorter description or check your internet connection.")
 
 # ===== 2. FLIGHT BOOKING =====
 with tab2:
@@ -155,6 +183,7 @@ with tab2:
                 }
             )
 
+        import pandas as pd
         df = pd.DataFrame(flights)
         st.subheader(f"Available flights {origin} → {dest} on {travel_date}")
         selected = st.data_editor(df, use_container_width=True, key="flight_table")
@@ -226,6 +255,7 @@ with tab3:
                 "Total": round(total),
             })
 
+        import pandas as pd
         df_trains = pd.DataFrame(trains)
         st.subheader(f"Available trains {train_origin} → {train_dest} on {train_date}")
         selected_trains = st.data_editor(df_trains, use_container_width=True, key="train_editor")
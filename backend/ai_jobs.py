@@ -0,0 +1,246 @@
+from sqlalchemy import select, update
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Optional
+import asyncio
+import logging
+import multiprocessing
+import os
+import time
+import uuid
+from dotenv import load_dotenv
+
+from .database import SessionLocal, run_write
+from .models import AIJob, AIJobStatus
+from .plan_cache import normalize_plan_request, plan_cache, plan_key
+from .planner import generate_plan, save_plan
+from .schemas import AITripPlanRequest, AITripPlanResponse
+from .serializers import dump_json
+from .timings import TIMING_SAMPLES, quantiles_ms
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Plans generated at once, where generation runs ("thread" or "process"),
+# and the number of jobs allowed to wait before new ones are rejected
+AI_JOB_WORKERS = int(os.getenv("AI_JOB_WORKERS", 2))
+AI_JOB_EXECUTOR = os.getenv("AI_JOB_EXECUTOR", "thread")
+AI_JOB_MAX_QUEUED = int(os.getenv("AI_JOB_MAX_QUEUED", 1000))
+# A job still running after this long is taken to belong to a worker that
+# died, and is queued again when a process starts
+AI_JOB_STALE_SECONDS = float(os.getenv("AI_JOB_STALE_SECONDS", 600))
+
+MAX_ERROR_LENGTH = 1000
+
+def generate_plan_body(request_data: dict, plan_id: str) -> bytes:
+    """Generate and serialize a plan; runs in the job executor"""
+    request = AITripPlanRequest.model_validate(request_data)
+    return dump_json(AITripPlanResponse, generate_plan(request, plan_id))
+
+def warm_up():
+    """Runs once in each new worker process so importing the app happens before the first job"""
+
+class AIJobQueueFull(Exception):
+    """Raised when AI_JOB_MAX_QUEUED jobs are already waiting"""
+
+class AIJobQueue:
+    """Generates AI trip plans in the background on a bounded pool of workers.
+
+    Jobs are rows in ``ai_jobs`` before they are queued in memory. Jobs
+    still queued or cut off by ``stop``, and running jobs whose process died
+    more than ``stale_seconds`` ago, are queued again on the next start.
+    Generation itself runs in a thread or process pool so it never blocks
+    the event loop.
+    """
+
+    def __init__(self, workers: int, executor: str, max_queued: int, stale_seconds: float):
+        if executor not in ("thread", "process"):
+            raise ValueError(f"AI_JOB_EXECUTOR must be 'thread' or 'process', not {executor!r}")
+        self.workers = workers
+        self.executor = executor
+        self.max_queued = max_queued
+        self.stale_seconds = stale_seconds
+        self.active = 0
+        self.completed = 0
+        self.failed = 0
+        self._queue = None
+        self._tasks = []
+        self._executor: Optional[Executor] = None
+        # Jobs this process has claimed and not yet finished
+        self._claimed = set()
+        self._wait_seconds = deque(maxlen=TIMING_SAMPLES)
+        self._run_seconds = deque(maxlen=TIMING_SAMPLES)
+
+    @property
+    def running(self) -> bool:
+        return any(not task.done() for task in self._tasks)
+
+    @property
+    def depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def _create_executor(self) -> Executor:
+        if self.executor == "process":
+            # spawn: forking the threaded server process is not safe
+            return ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="ai-job")
+
+    async def start(self):
+        if self.running or self.workers <= 0:
+            return
+        self._queue = asyncio.Queue()
+        self._executor = self._create_executor()
+        if self.executor == "process":
+            for _ in range(self.workers):
+                self._executor.submit(warm_up)
+        recovered = await self._recover()
+        if recovered:
+            logger.info("Re-queued %d unfinished AI jobs", recovered)
+        self._tasks = [asyncio.create_task(self._run()) for _ in range(self.workers)]
+
+    async def stop(self):
+        # Queued jobs stay so in the database, and the jobs cut off here are
+        # handed back, so the next start of any process picks both up
+        interrupted = list(self._claimed)
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if interrupted:
+            async with SessionLocal() as session:
+                await run_write(lambda write_session: write_session.execute(
+                    update(AIJob)
+                    .where(AIJob.id.in_(interrupted), AIJob.status == AIJobStatus.RUNNING)
+                    .values(status=AIJobStatus.QUEUED, started_at=None)
+                ), session)
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def _recover(self) -> int:
+        # Other worker processes may be running jobs right now, so only
+        # running jobs older than stale_seconds are taken back. Jobs another
+        # process also queues are generated once: _process claims them.
+        stale_before = datetime.utcnow() - timedelta(seconds=self.stale_seconds)
+        async with SessionLocal() as session:
+            await run_write(lambda write_session: write_session.execute(
+                update(AIJob)
+                .where(AIJob.status == AIJobStatus.RUNNING, AIJob.started_at < stale_before)
+                .values(status=AIJobStatus.QUEUED, started_at=None)
+            ), session)
+            job_ids = (await session.scalars(
+                select(AIJob.id)
+                .where(AIJob.status == AIJobStatus.QUEUED)
+                .order_by(AIJob.created_at)
+            )).all()
+        for job_id in job_ids:
+            self._queue.put_nowait(job_id)
+        return len(job_ids)
+
+    async def submit(self, request: AITripPlanRequest, user_id: int, db) -> AIJob:
+        """Record a job and queue it; returns the new job"""
+        if self.depth >= self.max_queued:
+            raise AIJobQueueFull()
+        job = AIJob(
+            id=uuid.uuid4().hex,
+            user_id=user_id,
+            status=AIJobStatus.QUEUED,
+            request=request.model_dump(),
+            created_at=datetime.utcnow()
+        )
+        await run_write(lambda session: session.add(job), db)
+        if self._queue is not None:
+            self._queue.put_nowait(job.id)
+        return job
+
+    async def _run(self):
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await self._process(job_id)
+            except Exception:
+                logger.exception("AI job %s could not be processed", job_id)
+            finally:
+                self._queue.task_done()
+
+    async def _process(self, job_id: str):
+        # Sessions are opened per step: none stays open, holding a pooled
+        # connection and a read transaction, while the plan is generated
+        async with SessionLocal() as session:
+            job = await session.get(AIJob, job_id)
+            if job is None or job.status != AIJobStatus.QUEUED:
+                return
+            started_at = datetime.utcnow()
+
+            async def claim(write_session):
+                # Compare-and-set, so a job queued by several processes runs once
+                result = await write_session.execute(
+                    update(AIJob)
+                    .where(AIJob.id == job_id, AIJob.status == AIJobStatus.QUEUED)
+                    .values(status=AIJobStatus.RUNNING, started_at=started_at)
+                )
+                return result.rowcount
+
+            if not await run_write(claim, session):
+                return
+        self._claimed.add(job_id)
+        self._wait_seconds.append((started_at - job.created_at).total_seconds())
+        self.active += 1
+        clock = time.perf_counter()
+        try:
+            request = normalize_plan_request(AITripPlanRequest.model_validate(job.request))
+            plan_id = plan_key(request)
+            async with SessionLocal() as session:
+                body = await plan_cache.get(plan_id, session)
+            generated = body is None
+            if generated:
+                body = await asyncio.get_running_loop().run_in_executor(
+                    self._executor, generate_plan_body, request.model_dump(), plan_id
+                )
+
+            async def finish(write_session):
+                stored = await save_plan(write_session, job.user_id, plan_id, body, generated)
+                await write_session.execute(
+                    update(AIJob).where(AIJob.id == job_id).values(
+                        status=AIJobStatus.SUCCEEDED, plan_id=plan_id, finished_at=datetime.utcnow()
+                    )
+                )
+                return stored
+
+            async with SessionLocal() as session:
+                plan_cache.add(plan_id, await run_write(finish, session))
+            self.completed += 1
+        except Exception as exc:
+            logger.exception("AI job %s failed", job_id)
+            error = str(exc)[:MAX_ERROR_LENGTH]
+            async with SessionLocal() as session:
+                await run_write(lambda write_session: write_session.execute(
+                    update(AIJob).where(AIJob.id == job_id).values(
+                        status=AIJobStatus.FAILED, error=error, finished_at=datetime.utcnow()
+                    )
+                ), session)
+            self.failed += 1
+        finally:
+            self._claimed.discard(job_id)
+            self.active -= 1
+            self._run_seconds.append(time.perf_counter() - clock)
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "executor": self.executor,
+            "queue_depth": self.depth,
+            "max_queued": self.max_queued,
+            "running": self.active,
+            "completed": self.completed,
+            "failed": self.failed,
+            "queue_wait_ms": quantiles_ms(self._wait_seconds),
+            "run_ms": quantiles_ms(self._run_seconds),
+        }
+
+ai_job_queue = AIJobQueue(AI_JOB_WORKERS, AI_JOB_EXECUTOR, AI_JOB_MAX_QUEUED, AI_JOB_STALE_SECONDS)
@@ -1,13 +1,17 @@
 from fastapi import HTTPException, Depends, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
+from sqlalchemy import select, update, event
+from sqlalchemy.ext.asyncio import AsyncSession
 from jose import JWTError, jwt
-from passlib.context import CryptContext
 from datetime import datetime, timedelta
+from collections import OrderedDict
+from typing import NamedTuple, Optional, Union
 import os
+import time
 from dotenv import load_dotenv
 
-from .database import get_db
+from .database import get_db, run_write
+from .hashing import pwd_context, password_hasher, PasswordHasherBusy
 from .models import User
 
 load_dotenv()
@@ -17,12 +21,78 @@ SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key-here-change-in-production"
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
-# Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Authenticated user cache (0 disables it)
+AUTH_CACHE_TTL_SECONDS = float(os.getenv("AUTH_CACHE_TTL_SECONDS", 60))
+AUTH_CACHE_MAX_SIZE = int(os.getenv("AUTH_CACHE_MAX_SIZE", 10000))
 
 # HTTP Bearer for token authentication
 security = HTTPBearer()
 
+class TokenPrincipal(NamedTuple):
+    """Minimal identity carried in the access token claims"""
+    id: int
+    username: str
+    is_active: bool
+
+class UserCache:
+    """TTL-bounded, size-capped LRU of authenticated users keyed by token subject"""
+
+    def __init__(self, ttl: float, maxsize: int):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        # username -> time of the last invalidation; tokens issued earlier
+        # must not be trusted on their claims alone
+        self._invalidated = OrderedDict()
+
+    def get(self, username: str) -> Optional[User]:
+        entry = self._entries.get(username)
+        if entry is None:
+            return None
+        user, expires_at = entry
+        if expires_at < time.monotonic():
+            del self._entries[username]
+            return None
+        self._entries.move_to_end(username)
+        return user
+
+    def set(self, username: str, user: User):
+        if self.ttl <= 0:
+            return
+        self._entries[username] = (user, time.monotonic() + self.ttl)
+        self._entries.move_to_end(username)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, username: str):
+        """Drop a cached user, e.g. after it was updated or deactivated"""
+        self._entries.pop(username, None)
+        self._invalidated[username] = time.time()
+        self._invalidated.move_to_end(username)
+        # Invalidations only matter while tokens issued before them are valid
+        cutoff = time.time() - ACCESS_TOKEN_EXPIRE_MINUTES * 60
+        while self._invalidated and (
+            len(self._invalidated) > self.maxsize or next(iter(self._invalidated.values())) < cutoff
+        ):
+            self._invalidated.popitem(last=False)
+
+    def invalidated_since(self, username: str, issued_at: float) -> bool:
+        invalidated_at = self._invalidated.get(username)
+        return invalidated_at is not None and invalidated_at >= issued_at
+
+    def clear(self):
+        self._entries.clear()
+        self._invalidated.clear()
+
+user_cache = UserCache(AUTH_CACHE_TTL_SECONDS, AUTH_CACHE_MAX_SIZE)
+
+# ORM updates and deletes of a user evict it from the cache. Bulk UPDATE
+# statements bypass these hooks and must call user_cache.invalidate() themselves.
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_cached_user(mapper, connection, target):
+    user_cache.invalidate(target.username)
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against its hash"""
     return pwd_context.verify(plain_password, hashed_password)
@@ -31,6 +101,20 @@ def get_password_hash(password: str) -> str:
     """Hash a password"""
     return pwd_context.hash(password)
 
+def _password_hasher_busy() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Too many password operations in progress, please retry",
+        headers={"Retry-After": "1"}
+    )
+
+async def get_password_hash_async(password: str) -> str:
+    """Hash a password in the worker pool"""
+    try:
+        return await password_hasher.hash(password)
+    except PasswordHasherBusy:
+        raise _password_hasher_busy()
+
 def create_access_token(data: dict, expires_delta: timedelta = None):
     """Create a JWT access token"""
     to_encode = data.copy()
@@ -38,56 +122,112 @@ def create_access_token(data: dict, expires_delta: timedelta = None):
         expire = datetime.utcnow() + expires_delta
     else:
         expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    
-    to_encode.update({"exp": expire})
+
+    to_encode.update({"exp": expire, "iat": int(time.time())})
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-def verify_token(token: str):
-    """Verify and decode a JWT token"""
+def create_user_access_token(user: User, expires_delta: timedelta = None):
+    """Create an access token carrying the user's minimal identity claims"""
+    return create_access_token(
+        data={"sub": user.username, "uid": user.id, "active": user.is_active},
+        expires_delta=expires_delta
+    )
+
+def decode_token(token: str) -> dict:
+    """Verify a JWT token and return its payload"""
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        username: str = payload.get("sub")
-        if username is None:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Could not validate credentials"
-            )
-        return username
     except JWTError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Could not validate credentials"
         )
-
-def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
-) -> User:
-    """Get the current authenticated user"""
-    token = credentials.credentials
-    username = verify_token(token)
-    
-    user = db.query(User).filter(User.username == username).first()
-    if user is None:
+    if payload.get("sub") is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User not found"
+            detail="Could not validate credentials"
         )
-    
+    return payload
+
+def verify_token(token: str):
+    """Verify and decode a JWT token"""
+    return decode_token(token)["sub"]
+
+async def _load_user(db: AsyncSession, username: str) -> User:
+    user = user_cache.get(username)
+    if user is None:
+        user = await db.scalar(select(User).where(User.username == username))
+        if user is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="User not found"
+            )
+        user_cache.set(username, user)
+
     if not user.is_active:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Inactive user"
         )
-    
+
     return user
 
-def authenticate_user(db: Session, username: str, password: str) -> User:
+async def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: AsyncSession = Depends(get_db)
+) -> User:
+    """Get the current authenticated user"""
+    token = credentials.credentials
+    username = verify_token(token)
+    return await _load_user(db, username)
+
+async def get_current_principal(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: AsyncSession = Depends(get_db)
+) -> Union[User, TokenPrincipal]:
+    """Get the current user's identity, from the token claims when possible.
+
+    For routes that only need to know who is calling: tokens carrying
+    ``uid``/``active`` claims are served without touching the database
+    unless the user was invalidated after the token was issued.
+    """
+    payload = decode_token(credentials.credentials)
+    username = payload["sub"]
+
+    if (
+        user_cache.get(username) is None
+        and "uid" in payload
+        and not user_cache.invalidated_since(username, payload.get("iat", 0))
+    ):
+        if not payload.get("active", False):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Inactive user"
+            )
+        return TokenPrincipal(id=payload["uid"], username=username, is_active=True)
+
+    return await _load_user(db, username)
+
+async def authenticate_user(db: AsyncSession, username: str, password: str) -> User:
     """Authenticate a user with username and password"""
-    user = db.query(User).filter(User.username == username).first()
+    user = await db.scalar(select(User).where(User.username == username))
     if not user:
         return False
-    if not verify_password(password, user.hashed_password):
+    # Return the connection to the pool while the hash runs
+    await db.commit()
+    try:
+        valid, new_hash = await password_hasher.verify_and_update(password, user.hashed_password)
+    except PasswordHasherBusy:
+        raise _password_hasher_busy()
+    if not valid:
         return False
-    return user
\ No newline at end of file
+    if new_hash:
+        # Stored hash used a different cost factor; upgrade it transparently
+        await run_write(
+            lambda session: session.execute(
+                update(User).where(User.id == user.id).values(hashed_password=new_hash)
+            ),
+            db
+        )
+    return user
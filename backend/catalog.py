@@ -0,0 +1,113 @@
+from fastapi import Depends, HTTPException, Request, Response, status
+from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from sqlalchemy import select, event
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional, Union
+import os
+import time
+from dotenv import load_dotenv
+
+from .database import get_db, IS_SQLITE
+from .auth import get_current_principal, TokenPrincipal
+from .models import CatalogVersion, Destination, User
+
+load_dotenv()
+
+# Public mode serves the destination catalog without authentication and
+# marks it cacheable by shared caches (CDNs, reverse proxies)
+CATALOG_PUBLIC = os.getenv("CATALOG_PUBLIC", "false").lower() == "true"
+# How long clients and caches may reuse a catalog response without revalidating
+CATALOG_MAX_AGE_SECONDS = int(os.getenv("CATALOG_MAX_AGE_SECONDS", 300))
+# How long a worker trusts its cached catalog version before re-reading it
+CATALOG_VERSION_TTL_SECONDS = float(os.getenv("CATALOG_VERSION_TTL_SECONDS", 5))
+
+# The version row is bumped by the database itself, so writes from any
+# process or plain SQL invalidate every worker's ETags
+SQLITE_VERSION_DDL = [
+    "INSERT INTO catalog_version (id, version) VALUES (1, 1) ON CONFLICT DO NOTHING",
+] + [
+    f"""CREATE TRIGGER IF NOT EXISTS catalog_version_{operation.lower()} AFTER {operation} ON destinations BEGIN
+        UPDATE catalog_version SET version = version + 1 WHERE id = 1;
+    END"""
+    for operation in ("INSERT", "UPDATE", "DELETE")
+]
+
+POSTGRES_VERSION_DDL = [
+    "INSERT INTO catalog_version (id, version) VALUES (1, 1) ON CONFLICT DO NOTHING",
+    """CREATE OR REPLACE FUNCTION bump_catalog_version() RETURNS trigger AS $$
+    BEGIN
+        UPDATE catalog_version SET version = version + 1 WHERE id = 1;
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql""",
+    "DROP TRIGGER IF EXISTS catalog_version_bump ON destinations",
+    """CREATE TRIGGER catalog_version_bump AFTER INSERT OR UPDATE OR DELETE ON destinations
+        FOR EACH STATEMENT EXECUTE FUNCTION bump_catalog_version()""",
+]
+
+def create_catalog_version_triggers(connection):
+    """Seed the catalog version row and install its triggers (idempotent)"""
+    for statement in SQLITE_VERSION_DDL if IS_SQLITE else POSTGRES_VERSION_DDL:
+        connection.exec_driver_sql(statement)
+
+class CatalogVersionCache:
+    """The database catalog version, re-read at most every ``ttl`` seconds"""
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._version = None
+        self._expires_at = 0.0
+
+    async def get(self, db: AsyncSession) -> int:
+        if self._version is None or self._expires_at <= time.monotonic():
+            self._version = await db.scalar(select(CatalogVersion.version).where(CatalogVersion.id == 1))
+            self._expires_at = time.monotonic() + self.ttl
+        return self._version
+
+    def expire(self):
+        self._expires_at = 0.0
+
+catalog_version = CatalogVersionCache(CATALOG_VERSION_TTL_SECONDS)
+
+# Writes made by this process are visible in its ETags immediately; other
+# workers notice within CATALOG_VERSION_TTL_SECONDS
+@event.listens_for(Destination, "after_insert")
+@event.listens_for(Destination, "after_update")
+@event.listens_for(Destination, "after_delete")
+def _expire_catalog_version(mapper, connection, target):
+    catalog_version.expire()
+
+def strong_etag(*parts) -> str:
+    return '"' + "-".join(str(part) for part in parts) + '"'
+
+def cache_headers(etag: str) -> dict:
+    visibility = "public" if CATALOG_PUBLIC else "private"
+    return {"ETag": etag, "Cache-Control": f"{visibility}, max-age={CATALOG_MAX_AGE_SECONDS}"}
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """If-None-Match check (weak comparison, as RFC 9110 specifies for it)"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    return any(candidate.strip().removeprefix("W/") == etag for candidate in header.split(","))
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=cache_headers(etag))
+
+optional_security = HTTPBearer(auto_error=False)
+
+async def get_catalog_reader(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security),
+    db: AsyncSession = Depends(get_db)
+) -> Optional[Union[User, TokenPrincipal]]:
+    """Authenticate catalog requests unless the catalog is public"""
+    if CATALOG_PUBLIC:
+        return None
+    if credentials is None:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authenticated"
+        )
+    return await get_current_principal(credentials, db)
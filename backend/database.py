@@ -1,7 +1,12 @@
-from sqlalchemy import create_engine
+from sqlalchemy import select, func, text, event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+import asyncio
+import inspect
 import os
+import time
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -12,42 +17,260 @@ DATABASE_URL = os.getenv(
     "sqlite:///./travel_planner.db"
 )
 
-# For SQLite (development)
-if DATABASE_URL.startswith("sqlite"):
-    engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
-else:
-    engine = create_engine(DATABASE_URL)
+# Async drivers used when DATABASE_URL does not name one explicitly
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "postgres": "postgresql+asyncpg",
+}
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+def get_async_database_url(url: str) -> str:
+    """Rewrite a plain database URL to use its asyncio driver"""
+    scheme, separator, rest = url.partition("://")
+    if "+" in scheme:
+        # Explicit driver such as sqlite+aiosqlite:// or postgresql+asyncpg://
+        return url
+    return f"{ASYNC_DRIVERS.get(scheme, scheme)}{separator}{rest}"
+
+ASYNC_DATABASE_URL = get_async_database_url(DATABASE_URL)
+IS_SQLITE = ASYNC_DATABASE_URL.startswith("sqlite")
+
+# SQLite tuning: "production" applies WAL and the pragmas below on every
+# connection and funnels writes through a single writer task; "default"
+# leaves SQLite's own settings alone.
+SQLITE_PROFILE = os.getenv("SQLITE_PROFILE", "production").lower()
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", 268435456))
+SQLITE_CACHE_SIZE = int(os.getenv("SQLITE_CACHE_SIZE", -64000))
+SQLITE_BUSY_TIMEOUT = int(os.getenv("SQLITE_BUSY_TIMEOUT", 5000))
+SQLITE_PRODUCTION = IS_SQLITE and SQLITE_PROFILE == "production"
+
+# Connection pool settings
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 5))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 10))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 30))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 1800))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long callers wait to check out a connection"""
+
+    checkouts = 0
+    timeouts = 0
+    total_wait = 0.0
+    max_wait = 0.0
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            self.timeouts += 1
+            raise
+        wait = time.perf_counter() - start
+        self.checkouts += 1
+        self.total_wait += wait
+        self.max_wait = max(self.max_wait, wait)
+        return connection
+
+    def recreate(self):
+        # Keep the counters when the pool is rebuilt (e.g. after engine.dispose())
+        pool = super().recreate()
+        pool.checkouts, pool.timeouts = self.checkouts, self.timeouts
+        pool.total_wait, pool.max_wait = self.total_wait, self.max_wait
+        return pool
+
+    def stats(self) -> dict:
+        """Current pool occupancy and checkout wait statistics"""
+        return {
+            "size": self.size(),
+            "checked_out": self.checkedout(),
+            "checked_in": self.checkedin(),
+            "overflow": max(self.overflow(), 0),
+            "max_overflow": self._max_overflow,
+            "checkouts": self.checkouts,
+            "timeouts": self.timeouts,
+            "avg_checkout_wait_ms": round(self.total_wait / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+            "max_checkout_wait_ms": round(self.max_wait * 1000, 3)
+        }
+
+pool_options = {
+    "poolclass": InstrumentedPool,
+    "pool_size": DB_POOL_SIZE,
+    "max_overflow": DB_MAX_OVERFLOW,
+    "pool_timeout": DB_POOL_TIMEOUT,
+    "pool_recycle": DB_POOL_RECYCLE,
+    "pool_pre_ping": DB_POOL_PRE_PING,
+}
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}")
+    cursor.execute(f"PRAGMA cache_size={SQLITE_CACHE_SIZE}")
+    cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT}")
+    cursor.close()
+
+def create_database_engine(**overrides):
+    """Create an async engine with the configured pool settings"""
+    options = {**pool_options, **overrides}
+    # For SQLite (development)
+    if IS_SQLITE:
+        # aiosqlite would otherwise default to NullPool, opening a connection (and thread) per session
+        new_engine = create_async_engine(
+            ASYNC_DATABASE_URL,
+            connect_args={"check_same_thread": False},
+            **options
+        )
+    else:
+        new_engine = create_async_engine(ASYNC_DATABASE_URL, **options)
+    
+    if SQLITE_PRODUCTION:
+        event.listen(new_engine.sync_engine, "connect", _set_sqlite_pragmas)
+    return new_engine
+
+engine = create_database_engine()
+
+# Objects stay usable after commit; async sessions cannot lazy-load expired attributes
+SessionLocal = async_sessionmaker(engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
+# The single writer gets its own connection so it never waits behind
+# request sessions holding every connection in the main pool
+writer_engine = create_database_engine(pool_size=1, max_overflow=0) if SQLITE_PRODUCTION else None
 
 Base = declarative_base()
 
 # Dependency to get DB session
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_db():
+    async with SessionLocal() as db:
         yield db
-    finally:
-        db.close()
+
+class WriteQueue:
+    """Runs write transactions one at a time on a dedicated background task.
+
+    SQLite allows a single writer; queueing writes in-process avoids
+    "database is locked" errors while readers keep their own connections.
+    """
+
+    def __init__(self, session_factory, maxsize: int = 1000):
+        self.session_factory = session_factory
+        self.maxsize = maxsize
+        self._queue = None
+        self._task = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    @property
+    def depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def start(self):
+        if not self.running:
+            self._queue = asyncio.Queue(self.maxsize)
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self.running:
+            # Let queued writes finish before shutting the writer down
+            await self._queue.join()
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+
+    async def submit(self, work):
+        """Queue work(session) and wait for its transaction to commit"""
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((work, future))
+        return await future
+
+    async def _run(self):
+        while True:
+            work, future = await self._queue.get()
+            try:
+                if not future.cancelled():
+                    async with self.session_factory() as session:
+                        result = await _call(work, session)
+                        await session.commit()
+                    future.set_result(result)
+            except Exception as e:
+                if not future.cancelled():
+                    future.set_exception(e)
+            finally:
+                self._queue.task_done()
+
+async def _call(work, session):
+    result = work(session)
+    if inspect.isawaitable(result):
+        result = await result
+    return result
+
+write_queue = WriteQueue(
+    async_sessionmaker(writer_engine or engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+)
+
+async def run_write(work, db: AsyncSession):
+    """Run work(session) as a committed write transaction.
+
+    With the SQLite production profile the work is handed to the single
+    writer task; otherwise it runs on the request's session ``db``.
+    """
+    if SQLITE_PRODUCTION and write_queue.running:
+        return await write_queue.submit(work)
+    result = await _call(work, db)
+    await db.commit()
+    return result
+
+async def get_database_health() -> dict:
+    """Measure a database round trip and report connection pool statistics"""
+    start = time.perf_counter()
+    try:
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+    except Exception as e:
+        return {
+            "status": "disconnected",
+            "error": str(e),
+            "pool": engine.pool.stats()
+        }
+    health = {
+        "status": "connected",
+        "latency_ms": round((time.perf_counter() - start) * 1000, 3),
+        "pool": engine.pool.stats()
+    }
+    if write_queue.running:
+        health["write_queue_depth"] = write_queue.depth
+    return health
 
 # Initialize database
 async def init_db():
     from .models import Base
-    Base.metadata.create_all(bind=engine)
+    from .search import create_search_index
+    from .catalog import create_catalog_version_triggers
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(create_search_index)
+        await conn.run_sync(create_catalog_version_triggers)
     
     # Seed initial data
     await seed_destinations()
+    
+    if SQLITE_PRODUCTION:
+        write_queue.start()
 
 async def seed_destinations():
     """Seed the database with popular destinations"""
-    from sqlalchemy.orm import Session
     from .models import Destination
     
     db = SessionLocal()
     
     # Check if destinations already exist
-    if db.query(Destination).count() > 0:
-        db.close()
+    if await db.scalar(select(func.count()).select_from(Destination)) > 0:
+        await db.close()
         return
     
     destinations = [
@@ -126,5 +349,5 @@ async def seed_destinations():
         destination = Destination(**dest_data)
         db.add(destination)
     
-    db.commit()
-    db.close()
\ No newline at end of file
+    await db.commit()
+    await db.close()
\ No newline at end of file
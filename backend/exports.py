@@ -0,0 +1,137 @@
+from sqlalchemy import select
+from datetime import date, datetime
+from enum import Enum
+from typing import AsyncIterator, List, Optional
+import asyncio
+import csv
+import io
+import logging
+import os
+import aiofiles
+import aiofiles.os
+import orjson
+from dotenv import load_dotenv
+
+from .database import SessionLocal
+from .models import AITripPlan, Booking, Trip
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Rows fetched from the cursor, encoded and sent per chunk
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", 1000))
+# Scheduled dumps of every user's rows; 0 disables them
+EXPORT_INTERVAL_SECONDS = float(os.getenv("EXPORT_INTERVAL_SECONDS", 0))
+EXPORT_DIR = os.getenv("EXPORT_DIR", "exports")
+
+EXPORT_MODELS = {"trips": Trip, "bookings": Booking, "ai-plans": AITripPlan}
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+def export_columns(model, include_user: bool) -> list:
+    return [column for column in model.__table__.columns if include_user or column.key != "user_id"]
+
+def _csv_value(value):
+    if value is None:
+        return ""
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, (dict, list)):
+        # JSON columns stay JSON inside their cell
+        return orjson.dumps(value).decode()
+    return value
+
+def encode_ndjson(keys: List[str], rows) -> bytes:
+    return b"".join(orjson.dumps(dict(zip(keys, row)), option=orjson.OPT_APPEND_NEWLINE) for row in rows)
+
+def encode_csv(keys: List[str], rows) -> bytes:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows([_csv_value(value) for value in row] for row in rows)
+    return buffer.getvalue().encode()
+
+ENCODERS = {"ndjson": encode_ndjson, "csv": encode_csv}
+
+async def stream_export(model, export_format: str, user_id: Optional[int] = None) -> AsyncIterator[bytes]:
+    """Yield a table's rows (one user's, or everyone's) as encoded chunks.
+
+    Rows come from a server-side cursor EXPORT_BATCH_SIZE at a time, as
+    plain column tuples rather than ORM objects, so memory stays flat
+    however many rows there are. The export uses its own session because
+    it outlives the request handler that returns it.
+    """
+    columns = export_columns(model, include_user=user_id is None)
+    keys = [column.key for column in columns]
+    stmt = select(*columns).execution_options(yield_per=EXPORT_BATCH_SIZE)
+    if user_id is None:
+        stmt = stmt.order_by(model.id)
+    else:
+        # Walks the (user_id, created_at, id) index, oldest first
+        stmt = stmt.where(model.user_id == user_id).order_by(model.created_at, model.id)
+    encode = ENCODERS[export_format]
+    if export_format == "csv":
+        yield encode_csv(keys, [keys])
+    async with SessionLocal() as session:
+        result = await session.stream(stmt)
+        async for rows in result.partitions():
+            yield encode(keys, rows)
+
+async def export_to_file(model, export_format: str, path: str, user_id: Optional[int] = None) -> int:
+    """Write an export to ``path``, replacing it only once complete; returns bytes written"""
+    partial_path = f"{path}.partial"
+    written = 0
+    async with aiofiles.open(partial_path, "wb") as file:
+        async for chunk in stream_export(model, export_format, user_id):
+            await file.write(chunk)
+            written += len(chunk)
+    await aiofiles.os.replace(partial_path, path)
+    return written
+
+class ExportScheduler:
+    """Dumps every exportable table to ``directory`` on a fixed interval"""
+
+    def __init__(self, directory: str, interval_seconds: float, export_format: str = "ndjson"):
+        self.directory = directory
+        self.interval_seconds = interval_seconds
+        self.export_format = export_format
+        self._task = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self):
+        if self.interval_seconds > 0 and not self.running:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self.running:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+
+    async def dump(self) -> List[str]:
+        """Export every table once; returns the files written"""
+        await aiofiles.os.makedirs(self.directory, exist_ok=True)
+        stamp = datetime.utcnow().strftime("%Y%m%dT%H%M%SZ")
+        paths = []
+        for name, model in EXPORT_MODELS.items():
+            path = os.path.join(self.directory, f"{name}-{stamp}.{self.export_format}")
+            await export_to_file(model, self.export_format, path)
+            paths.append(path)
+        return paths
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval_seconds)
+            try:
+                paths = await self.dump()
+                logger.info("Scheduled export wrote %s", ", ".join(paths))
+            except Exception:
+                logger.exception("Scheduled export failed")
+
+export_scheduler = ExportScheduler(EXPORT_DIR, EXPORT_INTERVAL_SECONDS)
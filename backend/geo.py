@@ -0,0 +1,343 @@
+from sqlalchemy import select, update, event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, object_session
+from typing import Iterable, List, NamedTuple, Optional, Tuple
+import asyncio
+import math
+import os
+import numpy as np
+from dotenv import load_dotenv
+
+from .catalog import catalog_version
+from .models import CatalogVersion, Destination
+
+load_dotenv()
+
+# Side of a spatial index cell in degrees
+GEO_CELL_DEGREES = float(os.getenv("GEO_CELL_DEGREES", 0.25))
+
+# Above this zoom level markers are returned individually instead of clustered
+GEO_MAX_CLUSTER_ZOOM = int(os.getenv("GEO_MAX_CLUSTER_ZOOM", 16))
+
+# Markers closer than this many pixels on a 256px-tile map share a cluster
+CLUSTER_CELL_PIXELS = 64
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+
+class Grid:
+    """Uniform latitude/longitude grid; cell keys sort row by row from the south-west"""
+
+    def __init__(self, cell_degrees: float):
+        self.cell_degrees = cell_degrees
+        self.width = math.ceil(360 / cell_degrees)
+        self.height = math.ceil(180 / cell_degrees)
+
+    def column(self, lon):
+        return np.clip(np.floor((np.asarray(lon) + 180) / self.cell_degrees), 0, self.width - 1).astype(np.int64)
+
+    def row(self, lat):
+        return np.clip(np.floor((np.asarray(lat) + 90) / self.cell_degrees), 0, self.height - 1).astype(np.int64)
+
+    def keys(self, lats, lons) -> np.ndarray:
+        return self.row(lats) * self.width + self.column(lons)
+
+    def key_ranges(self, first_row: int, last_row: int, first_column: int, last_column: int):
+        """Half-open key ranges covering a block of cells, one per row and span.
+
+        ``first_column > last_column`` wraps across the antimeridian.
+        """
+        rows = np.arange(max(first_row, 0), min(last_row, self.height - 1) + 1, dtype=np.int64)
+        if first_column <= last_column:
+            spans = [(first_column, last_column)]
+        else:
+            spans = [(first_column, self.width - 1), (0, last_column)]
+        starts = np.concatenate([rows * self.width + low for low, _ in spans])
+        ends = np.concatenate([rows * self.width + high + 1 for _, high in spans])
+        return starts, ends
+
+    def bounding_box_ranges(self, min_lat: float, min_lon: float, max_lat: float, max_lon: float):
+        return self.key_ranges(
+            int(self.row(min_lat)), int(self.row(max_lat)),
+            int(self.column(min_lon)), int(self.column(max_lon))
+        )
+
+def _gather(sorted_keys: np.ndarray, starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+    """Positions in ``sorted_keys`` falling inside any of the half-open key ranges"""
+    lows = np.searchsorted(sorted_keys, starts)
+    lengths = np.searchsorted(sorted_keys, ends) - lows
+    offsets = np.cumsum(lengths) - lengths
+    return np.repeat(lows - offsets, lengths) + np.arange(int(lengths.sum()))
+
+def haversine_km(lat: float, lon: float, lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+    """Great-circle distances from one point to many"""
+    lat, lon = math.radians(lat), math.radians(lon)
+    lats, lons = np.radians(lats), np.radians(lons)
+    a = np.sin((lats - lat) / 2) ** 2 + math.cos(lat) * np.cos(lats) * np.sin((lons - lon) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+def _in_bounding_box(lats, lons, min_lat, min_lon, max_lat, max_lon) -> np.ndarray:
+    in_lat = (lats >= min_lat) & (lats <= max_lat)
+    if min_lon <= max_lon:
+        return in_lat & (lons >= min_lon) & (lons <= max_lon)
+    return in_lat & ((lons >= min_lon) | (lons <= max_lon))
+
+class Cluster(NamedTuple):
+    latitude: float
+    longitude: float
+    count: int
+    destination_id: Optional[int]
+
+class _ClusterLevel:
+    """Per-cell marker counts and centroids for one zoom level"""
+
+    def __init__(self, grid: Grid, ids: np.ndarray, lats: np.ndarray, lons: np.ndarray):
+        self.grid = grid
+        keys, first, inverse, counts = np.unique(
+            grid.keys(lats, lons), return_index=True, return_inverse=True, return_counts=True
+        )
+        self.keys = keys
+        self.counts = counts
+        self.lats = np.bincount(inverse, weights=lats) / counts
+        self.lons = np.bincount(inverse, weights=lons) / counts
+        self.first_ids = ids[first]
+
+class GeoIndex:
+    """In-memory grid index of destination coordinates.
+
+    Points are kept sorted by grid cell so a bounding box becomes one
+    binary search per row of cells. Writes are queued and folded in by the
+    next query, and cluster levels are built on first use per zoom.
+    """
+
+    def __init__(self, cell_degrees: float):
+        self.grid = Grid(cell_degrees)
+        self.version = 0
+        # Catalog version the points were last loaded at
+        self.catalog_version = None
+        self._ids = np.empty(0, dtype=np.int64)
+        self._lats = np.empty(0)
+        self._lons = np.empty(0)
+        self._keys = np.empty(0, dtype=np.int64)
+        # id -> (lat, lon), or None for a removal, not yet in the arrays
+        self._pending = {}
+        self._clusters = {}
+
+    def __len__(self) -> int:
+        self._apply_pending()
+        return len(self._ids)
+
+    def load(self, points: Iterable[Tuple[int, float, float]]):
+        """Replace the index contents with ``(id, latitude, longitude)`` rows"""
+        points = list(points)
+        self._build(
+            np.fromiter((point[0] for point in points), dtype=np.int64, count=len(points)),
+            np.fromiter((point[1] for point in points), dtype=np.float64, count=len(points)),
+            np.fromiter((point[2] for point in points), dtype=np.float64, count=len(points))
+        )
+
+    def upsert(self, destination_id: int, latitude: Optional[float], longitude: Optional[float]):
+        if latitude is None or longitude is None:
+            self._pending[destination_id] = None
+        else:
+            self._pending[destination_id] = (latitude, longitude)
+
+    def remove(self, destination_id: int):
+        self._pending[destination_id] = None
+
+    def _build(self, ids: np.ndarray, lats: np.ndarray, lons: np.ndarray):
+        keys = self.grid.keys(lats, lons)
+        order = np.argsort(keys, kind="stable")
+        self._ids, self._lats, self._lons, self._keys = ids[order], lats[order], lons[order], keys[order]
+        self._clusters = {}
+        self.version += 1
+
+    def _apply_pending(self):
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, {}
+        keep = ~np.isin(self._ids, np.fromiter(pending, dtype=np.int64, count=len(pending)))
+        added = [(destination_id, point) for destination_id, point in pending.items() if point is not None]
+        self._build(
+            np.concatenate([self._ids[keep], np.array([item[0] for item in added], dtype=np.int64)]),
+            np.concatenate([self._lats[keep], np.array([item[1][0] for item in added], dtype=np.float64)]),
+            np.concatenate([self._lons[keep], np.array([item[1][1] for item in added], dtype=np.float64)])
+        )
+
+    def within(self, min_lat: float, min_lon: float, max_lat: float, max_lon: float,
+               limit: int) -> List[Tuple[int, float, float]]:
+        """Points inside a bounding box; ``min_lon > max_lon`` crosses the antimeridian"""
+        self._apply_pending()
+        positions = _gather(self._keys, *self.grid.bounding_box_ranges(min_lat, min_lon, max_lat, max_lon))
+        lats, lons = self._lats[positions], self._lons[positions]
+        positions = positions[_in_bounding_box(lats, lons, min_lat, min_lon, max_lat, max_lon)][:limit]
+        return list(zip(self._ids[positions].tolist(), self._lats[positions].tolist(), self._lons[positions].tolist()))
+
+    def _count(self, starts: np.ndarray, ends: np.ndarray) -> int:
+        return int((np.searchsorted(self._keys, ends) - np.searchsorted(self._keys, starts)).sum())
+
+    def _block_ranges(self, row: int, column: int, radius: int):
+        """Key ranges of the square of cells ``radius`` cells around a cell"""
+        grid = self.grid
+        if 2 * radius + 1 >= grid.width:
+            first_column, last_column = 0, grid.width - 1
+        else:
+            first_column, last_column = (column - radius) % grid.width, (column + radius) % grid.width
+        return grid.key_ranges(row - radius, row + radius, first_column, last_column)
+
+    def _circle_ranges(self, lat: float, lon: float, radius_km: float):
+        """Key ranges of the cells covering every point within ``radius_km``"""
+        delta = radius_km / KM_PER_DEGREE + 1e-9
+        min_lat, max_lat = max(lat - delta, -90.0), min(lat + delta, 90.0)
+        ratio = math.sin(math.radians(min(delta, 90.0))) / max(math.cos(math.radians(lat)), 1e-12)
+        if max_lat >= 90 or min_lat <= -90 or ratio >= 1:
+            # The circle reaches a pole or wraps all the way around
+            return self.grid.bounding_box_ranges(min_lat, -180.0, max_lat, 180.0)
+        spread = math.degrees(math.asin(ratio))
+        return self.grid.bounding_box_ranges(
+            min_lat, (lon - spread + 180) % 360 - 180, max_lat, (lon + spread + 180) % 360 - 180
+        )
+
+    def _closest(self, lat: float, lon: float, positions: np.ndarray, k: int):
+        distances = haversine_km(lat, lon, self._lats[positions], self._lons[positions])
+        if len(positions) > k:
+            top = np.argpartition(distances, k - 1)[:k]
+            positions, distances = positions[top], distances[top]
+        order = np.argsort(distances, kind="stable")
+        return positions[order], distances[order]
+
+    def nearest(self, lat: float, lon: float, k: int) -> List[Tuple[int, float, float, float]]:
+        """The ``k`` closest points as ``(id, latitude, longitude, distance_km)``, nearest first"""
+        self._apply_pending()
+        k = min(k, len(self._ids))
+        if k <= 0:
+            return []
+        grid = self.grid
+        row, column = int(grid.row(lat)), int(grid.column(lon))
+        # Smallest square of cells holding at least k points: grow by
+        # doubling, then bisect back down, counting without gathering
+        radius = 1
+        while self._count(*self._block_ranges(row, column, radius)) < k:
+            radius *= 2
+        low = radius // 2
+        while low + 1 < radius:
+            middle = (low + radius) // 2
+            if self._count(*self._block_ranges(row, column, middle)) >= k:
+                radius = middle
+            else:
+                low = middle
+        _, distances = self._closest(lat, lon, _gather(self._keys, *self._block_ranges(row, column, radius)), k)
+        # Those k points are an upper bound on the k-th distance; the exact
+        # answer lies inside the circle of that radius
+        positions, distances = self._closest(
+            lat, lon, _gather(self._keys, *self._circle_ranges(lat, lon, distances[-1])), k
+        )
+        return list(zip(
+            self._ids[positions].tolist(), self._lats[positions].tolist(),
+            self._lons[positions].tolist(), distances.tolist()
+        ))
+
+    def clusters(self, min_lat: float, min_lon: float, max_lat: float, max_lon: float,
+                 zoom: int, limit: int) -> List[Cluster]:
+        """Marker clusters for a map viewport at a zoom level"""
+        if zoom > GEO_MAX_CLUSTER_ZOOM:
+            return [
+                Cluster(latitude, longitude, 1, destination_id)
+                for destination_id, latitude, longitude in self.within(min_lat, min_lon, max_lat, max_lon, limit)
+            ]
+        self._apply_pending()
+        level = self._clusters.get(zoom)
+        if level is None:
+            cell_degrees = 360 * CLUSTER_CELL_PIXELS / (256 * 2 ** zoom)
+            level = self._clusters[zoom] = _ClusterLevel(Grid(cell_degrees), self._ids, self._lats, self._lons)
+        positions = _gather(level.keys, *level.grid.bounding_box_ranges(min_lat, min_lon, max_lat, max_lon))[:limit]
+        return [
+            Cluster(latitude, longitude, count, destination_id if count == 1 else None)
+            for latitude, longitude, count, destination_id in zip(
+                level.lats[positions].tolist(), level.lons[positions].tolist(),
+                level.counts[positions].tolist(), level.first_ids[positions].tolist()
+            )
+        ]
+
+geo_index = GeoIndex(GEO_CELL_DEGREES)
+
+# ORM writes to destinations are staged on their session at flush and reach
+# the index only once that session commits, together with the catalog
+# version they produce, so this process's own writes cost no reload. Bulk
+# statements and other processes bypass them; sync_geo_index() reloads on
+# the catalog version.
+def _catalog_version_now(session) -> int:
+    return session.connection().scalar(select(CatalogVersion.version).where(CatalogVersion.id == 1))
+
+def _stage(target, point):
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault("geo_changes", {})[target.id] = point
+
+@event.listens_for(Destination, "after_insert")
+@event.listens_for(Destination, "after_update")
+def _index_destination(mapper, connection, target):
+    _stage(target, (target.latitude, target.longitude))
+
+@event.listens_for(Destination, "after_delete")
+def _unindex_destination(mapper, connection, target):
+    _stage(target, None)
+
+@event.listens_for(Session, "before_flush")
+def _lock_catalog_version(session, flush_context, instances):
+    if "geo_version_before" in session.info or not any(
+        isinstance(instance, Destination) for instance in (*session.new, *session.dirty, *session.deleted)
+    ):
+        return
+    # A no-op update takes the version row's write lock, so until commit the
+    # version moves only by this transaction's own writes
+    session.connection().execute(
+        update(CatalogVersion).where(CatalogVersion.id == 1).values(version=CatalogVersion.version)
+    )
+    session.info["geo_version_before"] = _catalog_version_now(session)
+
+@event.listens_for(Session, "after_flush")
+def _read_catalog_version(session, flush_context):
+    if "geo_version_before" in session.info:
+        session.info["geo_version_after"] = _catalog_version_now(session)
+
+@event.listens_for(Session, "after_commit")
+def _apply_geo_changes(session):
+    for destination_id, point in session.info.pop("geo_changes", {}).items():
+        if point is None:
+            geo_index.remove(destination_id)
+        else:
+            geo_index.upsert(destination_id, *point)
+    before = session.info.pop("geo_version_before", None)
+    after = session.info.pop("geo_version_after", None)
+    # Only if the index was current when this transaction took the lock;
+    # otherwise the next query reloads it as before
+    if before is not None and after is not None and geo_index.catalog_version == before:
+        geo_index.catalog_version = after
+
+@event.listens_for(Session, "after_rollback")
+def _discard_geo_changes(session):
+    for key in ("geo_changes", "geo_version_before", "geo_version_after"):
+        session.info.pop(key, None)
+
+_reload_lock = asyncio.Lock()
+
+async def load_geo_index(db: AsyncSession):
+    """Fill the geo index from the destinations table"""
+    # Read first: a write landing during the load only causes another reload
+    version = await catalog_version.get(db)
+    result = await db.execute(
+        select(Destination.id, Destination.latitude, Destination.longitude).where(
+            Destination.latitude.isnot(None), Destination.longitude.isnot(None)
+        )
+    )
+    geo_index.load(result.all())
+    geo_index.catalog_version = version
+
+async def sync_geo_index(db: AsyncSession, version: int):
+    """Reload the geo index if it was loaded at another catalog version"""
+    if geo_index.catalog_version == version:
+        return
+    async with _reload_lock:
+        if geo_index.catalog_version != version:
+            await load_geo_index(db)
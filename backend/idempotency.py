@@ -0,0 +1,223 @@
+from fastapi import HTTPException, Request, Response, status
+from fastapi.exception_handlers import http_exception_handler
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import select, delete, update
+from sqlalchemy.exc import IntegrityError
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, NamedTuple, Optional, Tuple
+import asyncio
+import hashlib
+import os
+import time
+from dotenv import load_dotenv
+
+from .database import SessionLocal, run_write
+from .models import IdempotencyKey
+
+load_dotenv()
+
+# How long a stored response is replayed for a repeated key
+IDEMPOTENCY_TTL_SECONDS = int(os.getenv("IDEMPOTENCY_TTL_SECONDS", 86400))
+# A key whose request has not finished after this long is treated as
+# abandoned (e.g. its worker died) and may be claimed again
+IDEMPOTENCY_PENDING_TIMEOUT_SECONDS = float(os.getenv("IDEMPOTENCY_PENDING_TIMEOUT_SECONDS", 120))
+# How long a retry waits for the original request before answering 409
+IDEMPOTENCY_WAIT_SECONDS = float(os.getenv("IDEMPOTENCY_WAIT_SECONDS", 30))
+
+POLL_SECONDS = 0.05
+PURGE_INTERVAL_SECONDS = 60
+REPLAYED_HEADER = "Idempotency-Replayed"
+# Headers of the original response that are stored and sent again on replay
+STORED_HEADERS = ("location", "content-location", "etag")
+
+class StoredResponse(NamedTuple):
+    request_hash: str
+    status_code: int
+    media_type: Optional[str]
+    headers: Dict[str, str]
+    body: bytes
+
+    @classmethod
+    def from_response(cls, request_hash: str, response: Response) -> "StoredResponse":
+        headers = {name: response.headers[name] for name in STORED_HEADERS if name in response.headers}
+        return cls(request_hash, response.status_code, response.media_type, headers, bytes(response.body))
+
+    def to_response(self) -> Response:
+        return Response(
+            content=self.body,
+            status_code=self.status_code,
+            media_type=self.media_type,
+            headers={**self.headers, REPLAYED_HEADER: "true"}
+        )
+
+async def request_fingerprint(request: Request) -> str:
+    """Hash of method, path, query string and body"""
+    digest = hashlib.sha256()
+    for part in (request.method, request.url.path, request.url.query):
+        digest.update(part.encode())
+        digest.update(b"\0")
+    digest.update(await request.body())
+    return digest.hexdigest()
+
+def _key_mismatch():
+    return HTTPException(
+        status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+        detail="Idempotency-Key was already used for a different request"
+    )
+
+def _still_running():
+    return HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail="A request with this Idempotency-Key is still being processed"
+    )
+
+class IdempotencyStore:
+    """Runs a write once per (user, Idempotency-Key) and replays its response.
+
+    Responses are kept in the ``idempotency_keys`` table so retries reaching
+    any worker get the original bytes back. A key is claimed with a pending
+    row before the write runs; concurrent retries in this process wait on
+    the original's future, and those in other processes poll the row.
+    """
+
+    CLAIMED = "claimed"
+    PENDING = "pending"
+
+    def __init__(self, ttl_seconds: int, pending_timeout_seconds: float, wait_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self.pending_timeout_seconds = pending_timeout_seconds
+        self.wait_seconds = wait_seconds
+        self._inflight: Dict[Tuple[int, str], asyncio.Future] = {}
+        self._purged_at = 0.0
+
+    async def run(
+        self,
+        request: Request,
+        user_id: int,
+        key: Optional[str],
+        handler: Callable[[], Awaitable]
+    ):
+        """Return handler()'s response, computing it at most once per key"""
+        if key is None:
+            return await handler()
+        fingerprint = await request_fingerprint(request)
+        scope = (user_id, key)
+        deadline = time.monotonic() + self.wait_seconds
+        while True:
+            inflight = self._inflight.get(scope)
+            if inflight is not None:
+                try:
+                    stored = await asyncio.wait_for(asyncio.shield(inflight), deadline - time.monotonic())
+                except asyncio.TimeoutError:
+                    raise _still_running()
+                if stored is None:
+                    # The original failed without a response; claim the key again
+                    continue
+                if stored.request_hash != fingerprint:
+                    raise _key_mismatch()
+                return stored.to_response()
+            outcome = await self._claim(user_id, key, fingerprint)
+            if isinstance(outcome, StoredResponse):
+                return outcome.to_response()
+            if outcome == self.CLAIMED:
+                break
+            # Claimed by another worker process
+            if time.monotonic() >= deadline:
+                raise _still_running()
+            await asyncio.sleep(POLL_SECONDS)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[scope] = future
+        stored = None
+        try:
+            try:
+                response = await handler()
+            except HTTPException as exc:
+                if exc.status_code >= 500:
+                    raise
+                # A client error is the request's outcome too, so retries replay it
+                response = await http_exception_handler(request, exc)
+            if not isinstance(response, Response):
+                response = ORJSONResponse(response)
+            if response.status_code < 500:
+                outcome = StoredResponse.from_response(fingerprint, response)
+                await self._complete(user_id, key, outcome)
+                # Waiting retries replay it only once it is stored
+                stored = outcome
+            else:
+                await self._release(user_id, key)
+            return response
+        except BaseException:
+            # Only removes the key while it is still pending, so a response
+            # that was stored before the failure stays
+            await self._release(user_id, key)
+            raise
+        finally:
+            del self._inflight[scope]
+            future.set_result(stored)
+
+    async def _claim(self, user_id: int, key: str, fingerprint: str):
+        now = datetime.utcnow()
+        # A fresh session per attempt, so polling sees other workers' commits
+        async with SessionLocal() as session:
+            row = await session.scalar(
+                select(IdempotencyKey).where(IdempotencyKey.user_id == user_id, IdempotencyKey.key == key)
+            )
+            stale = row is not None and (
+                row.created_at < now - timedelta(seconds=self.ttl_seconds)
+                or (row.status_code is None and row.created_at < now - timedelta(seconds=self.pending_timeout_seconds))
+            )
+            if row is not None and not stale:
+                if row.request_hash != fingerprint:
+                    raise _key_mismatch()
+                if row.status_code is None:
+                    return self.PENDING
+                return StoredResponse(row.request_hash, row.status_code, row.media_type, row.headers or {}, row.body)
+
+            purge = time.monotonic() - self._purged_at >= PURGE_INTERVAL_SECONDS
+
+            async def claim(write_session):
+                if purge:
+                    await write_session.execute(delete(IdempotencyKey).where(
+                        IdempotencyKey.created_at < now - timedelta(seconds=self.ttl_seconds)
+                    ))
+                if stale:
+                    await write_session.execute(delete(IdempotencyKey).where(IdempotencyKey.id == row.id))
+                write_session.add(IdempotencyKey(
+                    user_id=user_id, key=key, request_hash=fingerprint, created_at=now
+                ))
+
+            try:
+                await run_write(claim, session)
+            except IntegrityError:
+                # Another worker claimed it first
+                await session.rollback()
+                return self.PENDING
+            if purge:
+                self._purged_at = time.monotonic()
+            return self.CLAIMED
+
+    async def _complete(self, user_id: int, key: str, stored: StoredResponse):
+        async with SessionLocal() as session:
+            await run_write(lambda write_session: write_session.execute(
+                update(IdempotencyKey)
+                .where(IdempotencyKey.user_id == user_id, IdempotencyKey.key == key)
+                .values(
+                    status_code=stored.status_code, media_type=stored.media_type,
+                    headers=stored.headers, body=stored.body
+                )
+            ), session)
+
+    async def _release(self, user_id: int, key: str):
+        async with SessionLocal() as session:
+            await run_write(lambda write_session: write_session.execute(
+                delete(IdempotencyKey).where(
+                    IdempotencyKey.user_id == user_id,
+                    IdempotencyKey.key == key,
+                    IdempotencyKey.status_code.is_(None)
+                )
+            ), session)
+
+idempotency_store = IdempotencyStore(
+    IDEMPOTENCY_TTL_SECONDS, IDEMPOTENCY_PENDING_TIMEOUT_SECONDS, IDEMPOTENCY_WAIT_SECONDS
+)
@@ -0,0 +1,369 @@
+from concurrent.futures import Future
+from collections import Counter, deque
+from typing import TYPE_CHECKING, Callable, List, NamedTuple, Optional, Tuple
+import asyncio
+import logging
+import os
+import queue
+import shutil
+import tempfile
+import threading
+import time
+from dotenv import load_dotenv
+
+from .timings import TIMING_SAMPLES, quantiles_ms
+
+if TYPE_CHECKING:
+    import httpx
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Text generation model served by the inference worker, and how it runs:
+# "torch" (fp32), "int8" (torch dynamic quantization of the linear layers)
+# or "onnx" (ONNX Runtime through optimum, exported to INFERENCE_ONNX_DIR
+# on first use)
+INFERENCE_MODEL = os.getenv("INFERENCE_MODEL", "google/flan-t5-base")
+INFERENCE_BACKEND = os.getenv("INFERENCE_BACKEND", "torch")
+INFERENCE_ONNX_DIR = os.getenv("INFERENCE_ONNX_DIR", "models/onnx")
+# Prompts generated together, how long the first prompt of a batch waits for
+# others to join it, and the CPU threads a batch is generated with
+INFERENCE_MAX_BATCH_SIZE = int(os.getenv("INFERENCE_MAX_BATCH_SIZE", 8))
+INFERENCE_BATCH_WINDOW_MS = float(os.getenv("INFERENCE_BATCH_WINDOW_MS", 20))
+INFERENCE_THREADS = int(os.getenv("INFERENCE_THREADS", min(4, os.cpu_count() or 1)))
+# Prompts allowed to wait for a batch before new ones are rejected
+INFERENCE_MAX_QUEUED = int(os.getenv("INFERENCE_MAX_QUEUED", 256))
+# Where the worker listens, and where the app and backend reach it (empty:
+# the backend has no text generation and the app loads its own model)
+INFERENCE_HOST = os.getenv("INFERENCE_HOST", "127.0.0.1")
+INFERENCE_PORT = int(os.getenv("INFERENCE_PORT", 8100))
+INFERENCE_URL = os.getenv("INFERENCE_URL", "")
+INFERENCE_TIMEOUT_SECONDS = float(os.getenv("INFERENCE_TIMEOUT_SECONDS", 300))
+
+# Prompts longer than this are truncated, as the planner app always did
+MAX_INPUT_TOKENS = 512
+DEFAULT_MAX_NEW_TOKENS = 500
+# Passed to every generate call; the values the planner app used
+GENERATION_KWARGS = {
+    "temperature": 0.9,
+    "top_p": 0.95,
+    "repetition_penalty": 1.5,
+    "no_repeat_ngram_size": 3,
+}
+
+INFERENCE_BACKENDS = ("torch", "int8", "onnx")
+
+def load_model(name: str = INFERENCE_MODEL, backend: str = INFERENCE_BACKEND, threads: Optional[int] = None):
+    """Load the tokenizer and a model for the backend; the heavy imports happen here.
+
+    ``threads`` bounds the CPU threads generation uses (None: the library's
+    default, usually every core).
+    """
+    if backend not in INFERENCE_BACKENDS:
+        raise ValueError(f"INFERENCE_BACKEND must be one of {', '.join(INFERENCE_BACKENDS)}, not {backend!r}")
+    from transformers import AutoTokenizer
+    tokenizer = AutoTokenizer.from_pretrained(name)
+    if backend == "onnx":
+        return tokenizer, load_onnx_model(name, threads)
+
+    import torch
+    from transformers import AutoModelForSeq2SeqLM
+    if threads:
+        torch.set_num_threads(threads)
+    model = AutoModelForSeq2SeqLM.from_pretrained(name)
+    model.eval()
+    if backend == "int8":
+        # Weights of the linear layers are stored as int8 and activations are
+        # quantized on the fly; nothing else in the model changes
+        model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    return tokenizer, model
+
+def load_onnx_model(name: str, threads: Optional[int] = None):
+    """An ONNX Runtime model with the transformers ``generate`` API, exported once per model"""
+    import onnxruntime
+    from optimum.onnxruntime import ORTModelForSeq2SeqLM
+
+    export_dir = os.path.join(INFERENCE_ONNX_DIR, name.replace("/", "--"))
+    if not os.path.isdir(export_dir):
+        # Exported next to its final place and renamed into it, so a crashed
+        # or concurrent export never leaves a partial model to be loaded
+        os.makedirs(INFERENCE_ONNX_DIR, exist_ok=True)
+        staging = tempfile.mkdtemp(prefix=".export-", dir=INFERENCE_ONNX_DIR)
+        try:
+            ORTModelForSeq2SeqLM.from_pretrained(name, export=True).save_pretrained(staging)
+            try:
+                os.replace(staging, export_dir)
+            except OSError:
+                # Another process finished exporting first; use its files
+                if not os.path.isdir(export_dir):
+                    raise
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+
+    # ONNX Runtime has its own thread pools; torch.set_num_threads does not reach them
+    options = onnxruntime.SessionOptions()
+    if threads:
+        options.intra_op_num_threads = threads
+        options.inter_op_num_threads = threads
+    return ORTModelForSeq2SeqLM.from_pretrained(export_dir, session_options=options)
+
+class LazyModel:
+    """A tokenizer and model loaded on first use, once, however many threads ask.
+
+    ``warm_up`` starts loading in a background thread so the first request
+    does not pay for it. A failed load is not remembered; the next ``get``
+    tries again.
+    """
+
+    def __init__(self, name: str = INFERENCE_MODEL, backend: str = INFERENCE_BACKEND, loader: Callable = load_model):
+        self.name = name
+        self.backend = backend
+        self._loader = loader
+        self._loaded: Optional[Tuple] = None
+        self._lock = threading.Lock()
+        self._warming: Optional[threading.Thread] = None
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded is not None
+
+    def get(self) -> Tuple:
+        """The (tokenizer, model) pair, loading it if needed"""
+        if self._loaded is None:
+            with self._lock:
+                if self._loaded is None:
+                    self._loaded = self._loader(self.name, self.backend)
+        return self._loaded
+
+    def warm_up(self):
+        if self._loaded is not None or (self._warming is not None and self._warming.is_alive()):
+            return
+        self._warming = threading.Thread(target=self._warm_up, name="model-warm-up", daemon=True)
+        self._warming.start()
+
+    def _warm_up(self):
+        try:
+            self.get()
+        except Exception:
+            logger.exception("Warming up %s failed; it will be loaded on first use", self.name)
+
+class Generation(NamedTuple):
+    text: str
+    # Tokens generated for this prompt
+    tokens: int
+    # Model and backend that generated it
+    model: str
+    backend: str
+
+class _Pending(NamedTuple):
+    prompt: str
+    max_new_tokens: int
+    future: Future
+    queued_at: float
+
+class InferenceBusy(Exception):
+    """Raised when INFERENCE_MAX_QUEUED prompts are already waiting"""
+
+class BatchingGenerator:
+    """Generates text for concurrent prompts in padded batches.
+
+    Callers from any thread submit prompts and get a future. One generation
+    thread takes the first waiting prompt, gives others up to
+    ``window_ms`` to join it (or until ``max_batch_size`` are waiting),
+    and runs a single ``generate`` for prompts asking for the same number
+    of new tokens. Generation is limited to ``threads`` CPU threads (torch's
+    or ONNX Runtime's), so batches share the cores instead of each request
+    competing for them.
+    """
+
+    def __init__(
+        self, model_name: str, max_batch_size: int, window_ms: float, threads: int, max_queued: int,
+        backend: str = INFERENCE_BACKEND
+    ):
+        self.model_name = model_name
+        self.backend = backend
+        self.max_batch_size = max(1, max_batch_size)
+        self.window_ms = window_ms
+        self.threads = threads
+        self.max_queued = max_queued
+        self.tokenizer = None
+        self.model = None
+        self.requests = 0
+        self.failed = 0
+        self.generated_tokens = 0
+        self.generate_seconds = 0.0
+        self.batch_sizes = Counter()
+        self._queue = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+        self._wait_seconds = deque(maxlen=TIMING_SAMPLES)
+        self._batch_seconds = deque(maxlen=TIMING_SAMPLES)
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """Load the model (if not loaded yet) and start the generation thread"""
+        if self.running:
+            return
+        if self.model is None:
+            self.tokenizer, self.model = load_model(self.model_name, self.backend, self.threads)
+        elif self.backend != "onnx":
+            import torch
+            torch.set_num_threads(self.threads)
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="inference", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        while True:
+            try:
+                pending = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            pending.future.cancel()
+
+    def submit(self, prompt: str, max_new_tokens: int = DEFAULT_MAX_NEW_TOKENS) -> Future:
+        """Queue a prompt; the future resolves to a Generation"""
+        if self._queue.qsize() >= self.max_queued:
+            raise InferenceBusy()
+        future = Future()
+        self._queue.put(_Pending(prompt, max_new_tokens, future, time.perf_counter()))
+        return future
+
+    async def generate(self, prompt: str, max_new_tokens: int = DEFAULT_MAX_NEW_TOKENS) -> Generation:
+        return await asyncio.wrap_future(self.submit(prompt, max_new_tokens))
+
+    def _collect(self) -> List[_Pending]:
+        try:
+            batch = [self._queue.get(timeout=0.1)]
+        except queue.Empty:
+            return []
+        deadline = time.perf_counter() + self.window_ms / 1000
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while not self._stopping.is_set():
+            batch = [pending for pending in self._collect() if pending.future.set_running_or_notify_cancel()]
+            groups = {}
+            for pending in batch:
+                groups.setdefault(pending.max_new_tokens, []).append(pending)
+            for max_new_tokens, group in groups.items():
+                try:
+                    self._generate(group, max_new_tokens)
+                except Exception as exc:
+                    logger.exception("Generating a batch of %d prompts failed", len(group))
+                    self.failed += len(group)
+                    for pending in group:
+                        pending.future.set_exception(exc)
+
+    def _generate(self, group: List[_Pending], max_new_tokens: int):
+        import torch
+
+        started = time.perf_counter()
+        for pending in group:
+            self._wait_seconds.append(started - pending.queued_at)
+        # Padded to the longest prompt; the attention mask keeps padding out
+        inputs = self.tokenizer(
+            [pending.prompt for pending in group],
+            return_tensors="pt", padding=True, truncation=True, max_length=MAX_INPUT_TOKENS
+        )
+        with torch.inference_mode():
+            outputs = self.model.generate(**inputs, max_new_tokens=max_new_tokens, **GENERATION_KWARGS)
+        elapsed = time.perf_counter() - started
+
+        # Rows that finished early are padded; the decoder start token is the pad token
+        tokens = (outputs != self.tokenizer.pad_token_id).sum(dim=1).tolist()
+        texts = self.tokenizer.batch_decode(outputs, skip_special_tokens=True)
+        self.requests += len(group)
+        self.generated_tokens += sum(tokens)
+        self.generate_seconds += elapsed
+        self.batch_sizes[len(group)] += 1
+        self._batch_seconds.append(elapsed)
+        for pending, text, count in zip(group, texts, tokens):
+            pending.future.set_result(Generation(text, count, self.model_name, self.backend))
+
+    def stats(self) -> dict:
+        return {
+            "model": self.model_name,
+            "backend": self.backend,
+            "threads": self.threads,
+            "max_batch_size": self.max_batch_size,
+            "batch_window_ms": self.window_ms,
+            "queue_depth": self._queue.qsize(),
+            "requests": self.requests,
+            "failed": self.failed,
+            "batches": sum(self.batch_sizes.values()),
+            # Batches run per batch size
+            "batch_sizes": dict(sorted(self.batch_sizes.items())),
+            "generated_tokens": self.generated_tokens,
+            "tokens_per_second": round(self.generated_tokens / self.generate_seconds, 2) if self.generate_seconds else None,
+            "queue_wait_ms": quantiles_ms(self._wait_seconds),
+            "batch_ms": quantiles_ms(self._batch_seconds),
+        }
+
+class InferenceUnavailable(Exception):
+    """Raised when the inference worker cannot be reached or fails"""
+
+class InferenceClient:
+    """Calls the inference worker started with ``python -m backend.inference_server``"""
+
+    # httpx is imported on first use; it is slow to import and the planner
+    # app only needs it once a plan is requested
+
+    def __init__(self, base_url: str, timeout: float = INFERENCE_TIMEOUT_SECONDS):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self._client: Optional["httpx.Client"] = None
+        self._async_client: Optional["httpx.AsyncClient"] = None
+
+    @staticmethod
+    def _result(response: "httpx.Response") -> Generation:
+        if response.status_code != 200:
+            raise InferenceUnavailable(f"Inference worker answered {response.status_code}: {response.text[:200]}")
+        data = response.json()
+        return Generation(data["text"], data["tokens"], data["model"], data["backend"])
+
+    def generate(self, prompt: str, max_new_tokens: int = DEFAULT_MAX_NEW_TOKENS) -> Generation:
+        import httpx
+        if self._client is None:
+            self._client = httpx.Client(base_url=self.base_url, timeout=self.timeout)
+        try:
+            response = self._client.post("/generate", json={"prompt": prompt, "max_new_tokens": max_new_tokens})
+        except httpx.HTTPError as exc:
+            raise InferenceUnavailable(f"Inference worker at {self.base_url} is unreachable: {exc}") from exc
+        return self._result(response)
+
+    async def agenerate(self, prompt: str, max_new_tokens: int = DEFAULT_MAX_NEW_TOKENS) -> Generation:
+        import httpx
+        if self._async_client is None:
+            self._async_client = httpx.AsyncClient(base_url=self.base_url, timeout=self.timeout)
+        try:
+            response = await self._async_client.post(
+                "/generate", json={"prompt": prompt, "max_new_tokens": max_new_tokens}
+            )
+        except httpx.HTTPError as exc:
+            raise InferenceUnavailable(f"Inference worker at {self.base_url} is unreachable: {exc}") from exc
+        return self._result(response)
+
+    async def aclose(self):
+        if self._async_client is not None:
+            await self._async_client.aclose()
+            self._async_client = None
+        if self._client is not None:
+            self._client.close()
+            self._client = None
+
+inference_client = InferenceClient(INFERENCE_URL) if INFERENCE_URL else None
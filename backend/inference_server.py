@@ -0,0 +1,65 @@
+"""Local inference worker shared by the planner app and the backend.
+
+    python -m backend.inference_server
+
+Loads the model once and serves ``POST /generate`` and ``GET /metrics`` on
+INFERENCE_HOST:INFERENCE_PORT. Point INFERENCE_URL at it from the Streamlit
+app and the API. Run a single uvicorn worker: batching happens within it.
+"""
+from fastapi import FastAPI, HTTPException, status
+from fastapi.responses import ORJSONResponse
+from contextlib import asynccontextmanager
+import asyncio
+import uvicorn
+
+from .inference import (
+    BatchingGenerator, InferenceBusy, INFERENCE_BACKEND, INFERENCE_HOST, INFERENCE_MAX_BATCH_SIZE, INFERENCE_BATCH_WINDOW_MS,
+    INFERENCE_MAX_QUEUED, INFERENCE_MODEL, INFERENCE_PORT, INFERENCE_THREADS
+)
+from .schemas import TextGenerationRequest, TextGenerationResponse
+
+generator = BatchingGenerator(
+    INFERENCE_MODEL, INFERENCE_MAX_BATCH_SIZE, INFERENCE_BATCH_WINDOW_MS, INFERENCE_THREADS, INFERENCE_MAX_QUEUED,
+    INFERENCE_BACKEND
+)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Loading the model takes a while; do it off the event loop
+    await asyncio.to_thread(generator.start)
+    yield
+    await asyncio.to_thread(generator.stop)
+
+app = FastAPI(title="Travel Planner inference worker", lifespan=lifespan, default_response_class=ORJSONResponse)
+
+@app.post("/generate", response_model=TextGenerationResponse)
+async def generate(request: TextGenerationRequest):
+    try:
+        generation = await generator.generate(request.prompt, request.max_new_tokens)
+    except InferenceBusy:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many prompts are waiting; try again shortly"
+        )
+    return {
+        "text": generation.text,
+        "tokens": generation.tokens,
+        "model": generation.model,
+        "backend": generation.backend
+    }
+
+@app.get("/metrics", response_model=dict)
+async def metrics():
+    """Requests, batch-size histogram, tokens/sec and queue wait and batch timings"""
+    return generator.stats()
+
+@app.get("/health")
+async def health():
+    return {
+        "status": "healthy" if generator.running else "starting",
+        "model": generator.model_name,
+        "backend": generator.backend
+    }
+
+if __name__ == "__main__":
+    uvicorn.run(app, host=INFERENCE_HOST, port=INFERENCE_PORT, workers=1, log_level="info")
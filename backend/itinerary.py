@@ -0,0 +1,173 @@
+from functools import lru_cache
+from typing import Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+import random
+
+from .schemas import AITripPlanRequest, ItineraryActivity, ItineraryDay
+
+MORNING = "9:00 AM"
+AFTERNOON = "2:30 PM"
+EVENING = "6:00 PM"
+
+# Activity catalog by interest; compiled into ACTIVITY_INDEX below
+ACTIVITY_CATALOG = {
+    "culture": [
+        {"name": "Visit Historic District", "description": "Explore ancient architecture and cultural landmarks", "duration": "3 hours", "cost": "$25"},
+        {"name": "Local Museum Tour", "description": "Discover art, history, and cultural artifacts", "duration": "2 hours", "cost": "$15"},
+        {"name": "Traditional Performance", "description": "Experience local music and dance", "duration": "2 hours", "cost": "$40"},
+        {"name": "Heritage Walking Tour", "description": "Guided tour through historical neighborhoods", "duration": "3 hours", "cost": "$30"}
+    ],
+    "food": [
+        {"name": "Food Market Tour", "description": "Taste local specialties and street food", "duration": "2 hours", "cost": "$35"},
+        {"name": "Cooking Class", "description": "Learn to prepare traditional dishes", "duration": "4 hours", "cost": "$75"},
+        {"name": "Fine Dining Experience", "description": "Michelin-starred restaurant reservation", "duration": "3 hours", "cost": "$120"},
+        {"name": "Local Food Walking Tour", "description": "Guided culinary adventure", "duration": "3 hours", "cost": "$50"}
+    ],
+    "adventure": [
+        {"name": "Hiking Expedition", "description": "Scenic mountain or nature trail", "duration": "5 hours", "cost": "$40"},
+        {"name": "Water Sports", "description": "Kayaking, surfing, or diving", "duration": "4 hours", "cost": "$80"},
+        {"name": "Adventure Park", "description": "Zip-lining and obstacle courses", "duration": "3 hours", "cost": "$60"},
+        {"name": "Rock Climbing", "description": "Guided climbing experience", "duration": "4 hours", "cost": "$70"}
+    ],
+    "nature": [
+        {"name": "Botanical Garden Visit", "description": "Explore diverse flora and peaceful gardens", "duration": "2 hours", "cost": "$12"},
+        {"name": "Wildlife Safari", "description": "Observe local wildlife in natural habitat", "duration": "6 hours", "cost": "$90"},
+        {"name": "Scenic Viewpoint", "description": "Panoramic views and photography", "duration": "2 hours", "cost": "Free"},
+        {"name": "Nature Reserve Tour", "description": "Guided eco-tour with expert naturalist", "duration": "4 hours", "cost": "$55"}
+    ],
+    "shopping": [
+        {"name": "Local Markets", "description": "Browse handicrafts and souvenirs", "duration": "2 hours", "cost": "$20"},
+        {"name": "Shopping District", "description": "Explore boutiques and local brands", "duration": "3 hours", "cost": "$50"},
+        {"name": "Artisan Workshops", "description": "Meet local craftspeople and buy unique items", "duration": "2 hours", "cost": "$30"},
+        {"name": "Vintage Shopping", "description": "Hunt for unique vintage finds", "duration": "2 hours", "cost": "$25"}
+    ]
+}
+
+# Evening activities for any destination
+DEFAULT_ACTIVITIES = [
+    {"name": "City Orientation Walk", "description": "Get familiar with the city layout and main attractions", "duration": "2 hours", "cost": "Free"},
+    {"name": "Local Transportation Tour", "description": "Learn to navigate public transport", "duration": "1 hour", "cost": "$5"},
+    {"name": "Sunset Viewing", "description": "Find the best spot to watch the sunset", "duration": "1 hour", "cost": "Free"},
+    {"name": "Local Café Experience", "description": "Relax at a popular local café", "duration": "1 hour", "cost": "$15"}
+]
+
+LUNCH = ItineraryActivity(
+    time="12:30 PM",
+    activity="Local Lunch",
+    description="Try authentic local cuisine at a recommended restaurant",
+    duration="1 hour",
+    cost="$25"
+)
+WELCOME_DINNER = ItineraryActivity(
+    time=EVENING,
+    activity="Welcome Dinner",
+    description="Celebrate your arrival with a special dinner",
+    duration="2 hours",
+    cost="$45"
+)
+
+# Interests that set the daily focus, in the user's priority order; the
+# rest only add travel tips
+FOCUS_INTERESTS = 2
+
+def normalize_interest(interest: str) -> str:
+    return interest.strip().lower()
+
+class Activity(NamedTuple):
+    """A catalog activity with its itinerary entries built once per time slot"""
+    name: str
+    slots: Dict[str, ItineraryActivity]
+
+def _compile(entry: dict, times: Sequence[str]) -> Activity:
+    return Activity(
+        name=entry["name"],
+        slots={
+            time: ItineraryActivity(
+                time=time,
+                activity=entry["name"],
+                description=entry["description"],
+                duration=entry["duration"],
+                cost=entry["cost"]
+            )
+            for time in times
+        }
+    )
+
+class ActivityPool(NamedTuple):
+    """Candidates for a set of focus interests.
+
+    ``alternatives[i]`` is the pool without ``activities[i]``, so the
+    afternoon pick never repeats the morning one.
+    """
+    activities: Tuple[Activity, ...]
+    alternatives: Tuple[Tuple[Activity, ...], ...]
+
+class ActivityIndex:
+    """The activity catalog compiled once: per-interest activity arrays with
+    ready-made itinerary entries."""
+
+    def __init__(self, catalog: Dict[str, List[dict]], defaults: List[dict]):
+        self.by_interest = {
+            normalize_interest(interest): tuple(_compile(entry, (MORNING, AFTERNOON)) for entry in entries)
+            for interest, entries in catalog.items()
+        }
+        self.evening = tuple(_compile(entry, (EVENING,)) for entry in defaults)
+        # Pools depend only on the focus interests, so each distinct
+        # combination is assembled once
+        self.pool = lru_cache(maxsize=1024)(self._pool)
+
+    def _pool(self, interests: Tuple[str, ...]) -> ActivityPool:
+        activities = tuple(
+            activity
+            for interest in interests
+            for activity in self.by_interest.get(interest, ())
+        )
+        return ActivityPool(activities, tuple(
+            tuple(other for other in activities if other.name != activity.name)
+            for activity in activities
+        ))
+
+ACTIVITY_INDEX = ActivityIndex(ACTIVITY_CATALOG, DEFAULT_ACTIVITIES)
+
+def plan_seed(request: AITripPlanRequest) -> int:
+    """The request's seed, or a fresh one to report back so the plan can be reproduced"""
+    return request.seed if request.seed is not None else random.getrandbits(32)
+
+def iter_itinerary(request: AITripPlanRequest, rng: random.Random, index: ActivityIndex = ACTIVITY_INDEX) -> Iterator[ItineraryDay]:
+    """Yield the itinerary one day at a time; the same seed gives the same plan"""
+    interests = tuple(normalize_interest(interest) for interest in request.interests)
+    first_day_focus = ("culture",) if "culture" in interests else interests[:1]
+
+    for day in range(1, request.duration + 1):
+        # Determine day theme based on interests and day number
+        if day == 1:
+            day_title = f"Arrival & First Impressions of {request.destination}"
+            pool = index.pool(first_day_focus)
+        elif day == request.duration:
+            day_title = f"Final Adventures & Departure from {request.destination}"
+            pool = index.pool(interests[:FOCUS_INTERESTS])
+        else:
+            day_title = f"Exploring {request.destination} - Day {day}"
+            pool = index.pool(interests[:FOCUS_INTERESTS])
+
+        activities = []
+        if pool.activities:
+            position = rng.randrange(len(pool.activities))
+            activities.append(pool.activities[position].slots[MORNING])
+            activities.append(LUNCH)
+            alternatives = pool.alternatives[position]
+            if alternatives:
+                activities.append(alternatives[rng.randrange(len(alternatives))].slots[AFTERNOON])
+        else:
+            activities.append(LUNCH)
+
+        if day == 1:
+            activities.append(WELCOME_DINNER)
+        else:
+            activities.append(index.evening[rng.randrange(len(index.evening))].slots[EVENING])
+
+        # Every part was validated when the index was built
+        yield ItineraryDay.model_construct(day=day, title=day_title, activities=activities)
+
+def generate_smart_itinerary(request: AITripPlanRequest, rng: Optional[random.Random] = None) -> List[ItineraryDay]:
+    """Generate intelligent itinerary based on user preferences"""
+    return list(iter_itinerary(request, rng or random.Random(plan_seed(request))))
@@ -1,14 +1,23 @@
 from fastapi import FastAPI, HTTPException, Depends, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from contextlib import asynccontextmanager
 import uvicorn
 from typing import List, Optional
+from datetime import datetime
 import os
 from dotenv import load_dotenv
 
-from .database import init_db, get_db
+from .database import init_db, get_db, engine, writer_engine, get_database_health, write_queue, SessionLocal
+from .geo import load_geo_index
+from .popularity import popularity_index
+from .exports import export_scheduler
+from .plan_cache import plan_cache
+from .ai_jobs import ai_job_queue
+from .inference import inference_client
 from .auth import get_current_user
+from .hashing import password_hasher
 from .models import User
 from .routers import (
     auth_router,
@@ -17,7 +26,8 @@ from .routers import (
     destinations_router,
     recommendations_router,
     weather_router,
-    ai_router
+    ai_router,
+    exports_router
 )
 
 load_dotenv()
@@ -26,15 +36,32 @@ load_dotenv()
 async def lifespan(app: FastAPI):
     # Startup
     await init_db()
+    async with SessionLocal() as db:
+        await load_geo_index(db)
+        await popularity_index.refresh(db)
+    popularity_index.start()
+    export_scheduler.start()
+    await ai_job_queue.start()
     yield
     # Shutdown
-    pass
+    await ai_job_queue.stop()
+    if inference_client is not None:
+        await inference_client.aclose()
+    await export_scheduler.stop()
+    await popularity_index.stop()
+    password_hasher.shutdown()
+    await write_queue.stop()
+    await engine.dispose()
+    if writer_engine is not None:
+        await writer_engine.dispose()
 
 # Create FastAPI app
 app = FastAPI(
     title="Travel Planner API",
     description="A comprehensive AI-powered travel planning and booking backend API",
     version="1.0.0",
+    # Routes returning plain dicts are encoded by orjson rather than json.dumps
+    default_response_class=ORJSONResponse,
     lifespan=lifespan
 )
 
@@ -58,6 +85,7 @@ app.include_router(destinations_router.router, prefix="/api/v1/destinations", ta
 app.include_router(recommendations_router.router, prefix="/api/v1/recommendations", tags=["Recommendations"])
 app.include_router(weather_router.router, prefix="/api/v1/weather", tags=["Weather"])
 app.include_router(ai_router.router, prefix="/api/v1/ai", tags=["AI Services"])
+app.include_router(exports_router.router, prefix="/api/v1/exports", tags=["Exports"])
 
 @app.get("/")
 async def root():
@@ -74,12 +102,15 @@ async def root():
 
 @app.get("/api/v1/health")
 async def health_check():
+    database = await get_database_health()
     return {
-        "status": "healthy",
-        "timestamp": "2024-01-01T00:00:00Z",
+        "status": "healthy" if database["status"] == "connected" else "degraded",
+        "timestamp": datetime.utcnow().isoformat() + "Z",
         "services": {
-            "database": "connected",
+            "database": database,
             "ai_service": "available",
+            "ai_plan_cache": plan_cache.stats(),
+            "ai_jobs": ai_job_queue.stats(),
             "external_apis": "available"
         }
     }
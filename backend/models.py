@@ -1,4 +1,7 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean, Text, ForeignKey, JSON, Enum
+from sqlalchemy import (
+    Column, Integer, String, Float, DateTime, Boolean, Text, ForeignKey, JSON, Enum, Index, LargeBinary, UniqueConstraint
+)
+from sqlalchemy.dialects import sqlite
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -8,6 +11,16 @@ import uuid
 
 Base = declarative_base()
 
+# Timestamp written by the database. On SQLite it is stored in the same
+# "YYYY-MM-DD HH:MM:SS" form as CURRENT_TIMESTAMP so bound values compare
+# correctly against it (keyset pagination relies on this).
+Timestamp = DateTime(timezone=True).with_variant(
+    sqlite.DATETIME(
+        storage_format="%(year)04d-%(month)02d-%(day)02d %(hour)02d:%(minute)02d:%(second)02d"
+    ),
+    "sqlite"
+)
+
 class TripStatus(PyEnum):
     PLANNING = "planning"
     BOOKED = "booked"
@@ -29,6 +42,12 @@ class BookingType(PyEnum):
     CAR_RENTAL = "car_rental"
     ACTIVITY = "activity"
 
+class AIJobStatus(PyEnum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
 class User(Base):
     __tablename__ = "users"
     
@@ -119,9 +138,14 @@ class Trip(Base):
     status = Column(Enum(TripStatus), default=TripStatus.PLANNING)
     itinerary = Column(JSON)
     ai_generated = Column(Boolean, default=False)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(Timestamp, server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
+    __table_args__ = (
+        # Newest-first keyset pagination of a user's trips
+        Index("ix_trips_user_created", "user_id", "created_at", "id"),
+    )
+    
     # Relationships
     user = relationship("User", back_populates="trips")
     destination = relationship("Destination", back_populates="trips")
@@ -147,9 +171,13 @@ class Booking(Base):
     confirmation_details = Column(JSON)
     cancellation_policy = Column(Text)
     special_requests = Column(Text)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(Timestamp, server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
+    __table_args__ = (
+        Index("ix_bookings_user_created", "user_id", "created_at", "id"),
+    )
+    
     # Relationships
     user = relationship("User", back_populates="bookings")
     trip = relationship("Trip", back_populates="bookings")
@@ -166,7 +194,11 @@ class AITripPlan(Base):
     interests = Column(JSON)
     generated_plan = Column(JSON)
     estimated_cost = Column(JSON)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(Timestamp, server_default=func.now())
+    
+    __table_args__ = (
+        Index("ix_ai_trip_plans_user_created", "user_id", "created_at", "id"),
+    )
     
     # Relationships
     user = relationship("User")
@@ -191,4 +223,61 @@ class Recommendation(Base):
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
     # Relationships
-    destination = relationship("Destination")
\ No newline at end of file
+    destination = relationship("Destination")
+
+class CatalogVersion(Base):
+    """Single-row counter bumped by database triggers on every write to destinations"""
+    __tablename__ = "catalog_version"
+    
+    id = Column(Integer, primary_key=True)
+    version = Column(Integer, nullable=False, default=1)
+
+class IdempotencyKey(Base):
+    """The stored response of a write request sent with an Idempotency-Key"""
+    __tablename__ = "idempotency_keys"
+    
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    key = Column(String(255), nullable=False)
+    # Fingerprint of method, path, query and body, so a key cannot be
+    # replayed for a different request
+    request_hash = Column(String(64), nullable=False)
+    # NULL while the original request is still running
+    status_code = Column(Integer)
+    media_type = Column(String(100))
+    # Response headers a replay must repeat, e.g. Location
+    headers = Column(JSON)
+    body = Column(LargeBinary)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    
+    __table_args__ = (
+        UniqueConstraint("user_id", "key", name="uq_idempotency_keys_user_key"),
+        Index("ix_idempotency_keys_created", "created_at"),
+    )
+
+class CachedAIPlan(Base):
+    """A generated AI trip plan's response, keyed by the hash of its normalized request"""
+    __tablename__ = "ai_plan_cache"
+    
+    key = Column(String(64), primary_key=True)
+    body = Column(LargeBinary, nullable=False)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+class AIJob(Base):
+    """A queued AI trip plan generation; kept in the database so queued work survives a restart"""
+    __tablename__ = "ai_jobs"
+    
+    id = Column(String(32), primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    status = Column(Enum(AIJobStatus), nullable=False, default=AIJobStatus.QUEUED)
+    request = Column(JSON, nullable=False)
+    # Set once the plan is stored in ai_plan_cache
+    plan_id = Column(String(64))
+    error = Column(Text)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    started_at = Column(DateTime)
+    finished_at = Column(DateTime)
+    
+    __table_args__ = (
+        Index("ix_ai_jobs_status_created", "status", "created_at"),
+    )
@@ -0,0 +1,58 @@
+from fastapi import HTTPException, status
+from sqlalchemy import tuple_, literal
+from datetime import datetime
+from typing import List, Optional, Tuple
+import base64
+import binascii
+import json
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Page sizes for list endpoints
+DEFAULT_PAGE_SIZE = int(os.getenv("DEFAULT_PAGE_SIZE", 20))
+MAX_PAGE_SIZE = int(os.getenv("MAX_PAGE_SIZE", 100))
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    """Encode the (created_at, id) key of the last row on a page as an opaque cursor"""
+    raw = json.dumps([created_at.isoformat(), row_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Decode a cursor produced by encode_cursor"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(created_at), int(row_id)
+    except (binascii.Error, ValueError, TypeError, UnicodeDecodeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+def paginate(stmt, model, limit: int, cursor: Optional[str] = None):
+    """Apply newest-first keyset pagination on (created_at, id) to a select.
+
+    One extra row is fetched so ``next_page`` can tell whether another
+    page follows.
+    """
+    if cursor:
+        created_at, row_id = decode_cursor(cursor)
+        # Row-value comparison lets the (user_id, created_at, id) index seek
+        # straight to the cursor instead of scanning from the newest row.
+        # Values are bound with the column types so SQLite compares the
+        # timestamp in its stored format.
+        stmt = stmt.where(tuple_(model.created_at, model.id) < tuple_(
+            literal(created_at, model.created_at.type),
+            literal(row_id, model.id.type)
+        ))
+    return stmt.order_by(model.created_at.desc(), model.id.desc()).limit(limit + 1)
+
+def next_page(rows: List, limit: int) -> Tuple[List, Optional[str]]:
+    """Split the rows fetched by paginate into a page and the next cursor"""
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor(last.created_at, last.id)
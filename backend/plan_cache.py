@@ -0,0 +1,144 @@
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional
+import hashlib
+import os
+import orjson
+from dotenv import load_dotenv
+
+from .database import IS_SQLITE
+from .itinerary import FOCUS_INTERESTS, normalize_interest
+from .models import CachedAIPlan
+from .schemas import AITripPlanRequest
+
+load_dotenv()
+
+# Plan bodies each worker keeps in memory (0 disables the in-memory tier);
+# every plan is also stored in the ai_plan_cache table
+AI_PLAN_CACHE_SIZE = int(os.getenv("AI_PLAN_CACHE_SIZE", 1000))
+
+# Part of every key: bump it when generation changes so plans made by the
+# old code stop being served
+PLAN_FORMAT_VERSION = 2
+
+insert_or_ignore = sqlite_insert if IS_SQLITE else postgresql_insert
+
+def normalize_plan_request(request: AITripPlanRequest) -> AITripPlanRequest:
+    """The request with the variations that must not change the plan removed"""
+    # Interests keep the user's order: the first ones set each day's focus
+    return request.model_copy(update={
+        "destination": " ".join(request.destination.split()),
+        "budget": request.budget.strip().lower(),
+        "interests": list(dict.fromkeys(normalize_interest(interest) for interest in request.interests)),
+    })
+
+def plan_key(request: AITripPlanRequest) -> str:
+    """Content address of a normalized request; also the plan's public id"""
+    # Only the focus interests' order changes the plan, so the others are
+    # sorted and listing them in another order finds the same plan
+    interests = request.interests[:FOCUS_INTERESTS] + sorted(request.interests[FOCUS_INTERESTS:])
+    canonical = orjson.dumps([
+        PLAN_FORMAT_VERSION,
+        request.destination.casefold(),
+        request.duration,
+        request.travelers,
+        request.budget,
+        interests,
+        request.seed,
+    ])
+    return hashlib.sha256(canonical).hexdigest()
+
+class PlanCache:
+    """Serialized plans by key: a per-worker LRU in front of the ai_plan_cache table"""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.db_hits = 0
+        self.misses = 0
+
+    def _remember(self, key: str, body: bytes):
+        if self.maxsize <= 0:
+            return
+        self._entries[key] = body
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    async def get(self, key: str, db: AsyncSession) -> Optional[bytes]:
+        body = self._entries.get(key)
+        if body is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return body
+        body = await db.scalar(select(CachedAIPlan.body).where(CachedAIPlan.key == key))
+        if body is None:
+            self.misses += 1
+            return None
+        self.db_hits += 1
+        self._remember(key, body)
+        return body
+
+    async def get_many(self, keys: Iterable[str], db: AsyncSession) -> Dict[str, bytes]:
+        """The cached plans among ``keys``, looking up memory misses in one query"""
+        found = {}
+        missing = []
+        for key in set(keys):
+            body = self._entries.get(key)
+            if body is None:
+                missing.append(key)
+            else:
+                self._entries.move_to_end(key)
+                found[key] = body
+        self.hits += len(found)
+        if missing:
+            rows = await db.execute(
+                select(CachedAIPlan.key, CachedAIPlan.body).where(CachedAIPlan.key.in_(missing))
+            )
+            for key, body in rows:
+                found[key] = body
+                self._remember(key, body)
+                self.db_hits += 1
+            self.misses += sum(key not in found for key in missing)
+        return found
+
+    async def store(self, session: AsyncSession, key: str, body: bytes) -> bytes:
+        """Store a plan within the caller's write transaction and return the stored body.
+
+        If another request stored this key first, its plan is kept and
+        returned, so every response for a key carries the same plan.
+        """
+        inserted = await session.scalar(
+            insert_or_ignore(CachedAIPlan)
+            .values(key=key, body=body)
+            .on_conflict_do_nothing(index_elements=[CachedAIPlan.key])
+            .returning(CachedAIPlan.key)
+        )
+        if inserted is not None:
+            return body
+        return await session.scalar(select(CachedAIPlan.body).where(CachedAIPlan.key == key))
+
+    def add(self, key: str, body: bytes):
+        """Keep a plan in memory once its write has committed"""
+        self._remember(key, body)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.db_hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.maxsize,
+            "memory_hits": self.hits,
+            "db_hits": self.db_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.hits + self.db_hits) / lookups, 4) if lookups else None,
+        }
+
+    def clear(self):
+        self._entries.clear()
+        self.hits = self.db_hits = self.misses = 0
+
+plan_cache = PlanCache(AI_PLAN_CACHE_SIZE)
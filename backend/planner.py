@@ -0,0 +1,198 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from functools import lru_cache
+from typing import Generator, List, Tuple
+import random
+import orjson
+
+from .itinerary import iter_itinerary, normalize_interest, plan_seed
+from .models import AITripPlan
+from .plan_cache import plan_cache
+from .pricing import BASE_DAILY_COSTS, FIXED_TRANSPORT, SHARED_ROOM_FACTOR, budget_multiplier
+from .schemas import AITripPlanRequest, AITripPlanResponse, EstimatedCost, ItineraryDay
+
+async def save_plan(session: AsyncSession, user_id: int, plan_id: str, body: bytes, generated: bool) -> bytes:
+    """Store a newly generated plan and add it to the user's plans, within the caller's write.
+
+    Returns the stored body, which is another request's if it stored the
+    same plan first.
+    """
+    stored = await plan_cache.store(session, plan_id, body) if generated else body
+    session.add(plan_record(user_id, plan_id, stored))
+    return stored
+
+def plan_record(user_id: int, plan_id: str, body: bytes) -> AITripPlan:
+    """The user's ai_trip_plans row for a serialized plan"""
+    plan = orjson.loads(body)
+    return AITripPlan(
+        user_id=user_id,
+        destination=plan["destination"],
+        duration=plan["duration"],
+        travelers=plan["travelers"],
+        budget=plan["budget"],
+        interests=plan["interests"],
+        generated_plan={
+            "plan_id": plan_id,
+            "itinerary": plan["itinerary"],
+            "estimated_cost": plan["estimated_cost"],
+            "travel_tips": plan["travel_tips"],
+            "seed": plan["seed"]
+        },
+        estimated_cost=plan["estimated_cost"]
+    )
+
+def generate_plan(request: AITripPlanRequest, plan_id: str) -> AITripPlanResponse:
+    """Generate a trip plan for a normalized request"""
+    days = iter_plan(request, plan_id, plan_seed(request))
+    while True:
+        try:
+            next(days)
+        except StopIteration as done:
+            return done.value
+
+def iter_plan(request: AITripPlanRequest, plan_id: str, seed: int) -> Generator[ItineraryDay, None, AITripPlanResponse]:
+    """Yield a normalized request's itinerary day by day; returns the complete plan"""
+    # One seeded generator drives the whole plan, so the seed reproduces it
+    rng = random.Random(seed)
+    
+    # AI-powered itinerary generation (mock implementation)
+    itinerary = []
+    for day in iter_itinerary(request, rng):
+        itinerary.append(day)
+        yield day
+    
+    # Calculate estimated costs based on destination and preferences
+    estimated_cost = calculate_trip_cost(request)
+    
+    # Generate travel tips
+    travel_tips = generate_travel_tips(request.destination, request.interests, rng)
+    
+    return AITripPlanResponse(
+        id=plan_id,
+        destination=request.destination,
+        duration=request.duration,
+        travelers=request.travelers,
+        budget=request.budget,
+        interests=request.interests,
+        itinerary=itinerary,
+        estimated_cost=estimated_cost,
+        travel_tips=travel_tips,
+        best_time_to_visit=get_best_time_to_visit(request.destination),
+        seed=seed
+    )
+
+def plan_prompt(request: AITripPlanRequest) -> str:
+    """The text-generation prompt for a trip, worded like the planner app's"""
+    party = "solo" if request.travelers == 1 else f"{request.travelers}-person"
+    prompt = (
+        f"Plan a {request.duration}-day {party} trip to {request.destination}. "
+        f"Budget: {request.budget}. "
+    )
+    if request.interests:
+        prompt += f"Interests include {', '.join(request.interests)}. "
+    return prompt + (
+        "Provide a detailed, day-by-day itinerary with morning, afternoon, and evening plans. "
+        "Include food recommendations, accommodations, transport tips, and safety advice."
+    )
+
+def calculate_trip_cost(request: AITripPlanRequest) -> EstimatedCost:
+    """Calculate estimated trip costs based on destination and preferences"""
+    
+    multiplier = budget_multiplier(request.budget)
+    
+    # Calculate daily costs
+    daily_accommodation = BASE_DAILY_COSTS["accommodation"] * multiplier
+    daily_food = BASE_DAILY_COSTS["food"] * multiplier
+    daily_activities = BASE_DAILY_COSTS["activities"] * multiplier
+    daily_transport = BASE_DAILY_COSTS["transport"] * multiplier
+    
+    # Total costs for the trip
+    accommodation = daily_accommodation * request.duration
+    food = daily_food * request.duration
+    activities = daily_activities * request.duration
+    transport = daily_transport * request.duration + FIXED_TRANSPORT  # Base transport to destination
+    
+    # Adjust for number of travelers (accommodation might be shared)
+    if request.travelers > 1:
+        accommodation = accommodation * (1 + (request.travelers - 1) * SHARED_ROOM_FACTOR)  # Shared rooms
+        food = food * request.travelers
+        activities = activities * request.travelers
+        transport = transport * request.travelers
+    
+    total = accommodation + food + activities + transport
+    
+    return EstimatedCost(
+        accommodation=round(accommodation, 2),
+        food=round(food, 2),
+        activities=round(activities, 2),
+        transport=round(transport, 2),
+        total=round(total, 2)
+    )
+
+BASE_TIPS = [
+    "Download offline maps for {destination} before you travel",
+    "Keep copies of important documents in separate locations",
+    "Learn a few basic phrases in the local language",
+    "Check visa requirements and passport validity",
+    "Get travel insurance for peace of mind",
+    "Notify your bank about your travel dates",
+    "Pack comfortable walking shoes",
+    "Bring a portable charger for your devices"
+]
+
+INTEREST_TIPS = {
+    "culture": [
+        "Research local customs and etiquette beforehand",
+        "Visit museums early in the morning to avoid crowds",
+        "Consider hiring a local guide for deeper cultural insights"
+    ],
+    "food": [
+        "Try street food from busy stalls (high turnover = fresh food)",
+        "Ask locals for restaurant recommendations",
+        "Be adventurous but know your dietary restrictions"
+    ],
+    "adventure": [
+        "Pack appropriate gear for outdoor activities",
+        "Check weather conditions before adventure activities",
+        "Consider travel insurance that covers adventure sports"
+    ],
+    "nature": [
+        "Bring binoculars for wildlife viewing",
+        "Pack insect repellent and sunscreen",
+        "Respect local wildlife and follow park rules"
+    ],
+    "shopping": [
+        "Learn basic bargaining phrases",
+        "Keep receipts for customs declarations",
+        "Leave extra space in your luggage for purchases"
+    ]
+}
+
+@lru_cache(maxsize=1024)
+def destination_tips(destination: str) -> Tuple[str, ...]:
+    return tuple(tip.format(destination=destination) for tip in BASE_TIPS)
+
+def generate_travel_tips(destination: str, interests: List[str], rng: random.Random = random) -> List[str]:
+    """Generate personalized travel tips"""
+    tips = list(destination_tips(destination))
+    
+    # In a fixed order, so the same seed picks the same tips however the
+    # interests were listed
+    for interest in sorted({normalize_interest(interest) for interest in interests}):
+        tips.extend(INTEREST_TIPS.get(interest, ()))
+    
+    return rng.sample(tips, min(8, len(tips)))
+
+# This would typically come from a database or external API; for now,
+# generic advice per destination
+SEASONAL_ADVICE = {
+    "paris": "April-June, September-October",
+    "tokyo": "March-May, September-November",
+    "bali": "April-October",
+    "new york": "April-June, September-November",
+    "london": "May-September",
+    "rome": "April-June, September-October"
+}
+
+def get_best_time_to_visit(destination: str) -> str:
+    """Get the best time to visit a destination"""
+    return SEASONAL_ADVICE.get(destination.lower(), "Check local weather patterns and tourist seasons")
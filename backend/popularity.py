@@ -0,0 +1,270 @@
+from sqlalchemy import select, func, event
+from sqlalchemy.ext.asyncio import AsyncSession
+from collections import Counter
+from datetime import date, datetime, timedelta
+from typing import Dict, List, NamedTuple, Optional
+import asyncio
+import hashlib
+import heapq
+import logging
+import math
+import os
+import time
+from dotenv import load_dotenv
+
+from .models import Booking, Destination, Trip
+from .schemas import DestinationResponse
+from .serializers import to_destination, dump_json
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Trips and bookings created within this many days count towards popularity
+POPULARITY_WINDOW_DAYS = int(os.getenv("POPULARITY_WINDOW_DAYS", 30))
+# Seconds between incremental refreshes, and between full rebuilds that also
+# pick up changes made by other worker processes
+POPULARITY_REFRESH_SECONDS = float(os.getenv("POPULARITY_REFRESH_SECONDS", 60))
+POPULARITY_REBUILD_SECONDS = float(os.getenv("POPULARITY_REBUILD_SECONDS", 3600))
+# Length of the precomputed list; /destinations/popular serves at most this many
+POPULARITY_TOP_N = int(os.getenv("POPULARITY_TOP_N", 100))
+
+# Score weights; each component is scaled to 0..1 first
+RATING_WEIGHT = 0.5
+SAFETY_WEIGHT = 0.2
+VOLUME_WEIGHT = 0.3
+# Trips plus bookings in the window at which the volume component tops out.
+# A fixed scale (rather than the current maximum) keeps every score
+# independent, so a refresh only rescores destinations that changed.
+VOLUME_SATURATION = 1000
+
+def popularity_score(tourist_rating: Optional[float], safety_rating: Optional[float], volume: int) -> float:
+    """Blend ratings and recent trip/booking volume into a 0..1 score"""
+    return (
+        RATING_WEIGHT * (tourist_rating or 0) / 10
+        + SAFETY_WEIGHT * (safety_rating or 0) / 10
+        + VOLUME_WEIGHT * min(1.0, math.log1p(volume) / math.log1p(VOLUME_SATURATION))
+    )
+
+class PopularityRanking(NamedTuple):
+    """An immutable published top-N list; ``version`` changes whenever it does.
+
+    ``digest`` is derived from the content, so unlike ``version`` it is the
+    same in every worker process and can back an HTTP ETag.
+    """
+    version: int
+    digest: str
+    computed_at: datetime
+    destinations: List[DestinationResponse]
+
+class PopularityIndex:
+    """Destination popularity scores kept current by a background task.
+
+    Each refresh reads only rows added since the previous one (by id),
+    expires trip/booking volume that left the window, and rescores just the
+    destinations affected; the published top-N is swapped in atomically so
+    readers never wait on the database.
+    """
+
+    def __init__(self, top_n: int, window_days: int, refresh_seconds: float, rebuild_seconds: float):
+        self.top_n = top_n
+        self.window_days = window_days
+        self.refresh_seconds = refresh_seconds
+        self.rebuild_seconds = rebuild_seconds
+        self.ranking: Optional[PopularityRanking] = None
+        self._task = None
+        self._lock = asyncio.Lock()
+        self._rebuilt_at = None
+        # Destinations edited through the ORM in this process since the last refresh
+        self._dirty = set()
+        self._reset()
+
+    def _reset(self):
+        self._ratings: Dict[int, tuple] = {}
+        self._scores: Dict[int, float] = {}
+        self._volume = Counter()
+        self._daily: Dict[object, Counter] = {}
+        self._top: List[tuple] = []
+        self._last_destination_id = 0
+        self._last_trip_id = 0
+        self._last_booking_id = 0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self):
+        if not self.running:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self.running:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+
+    def mark_dirty(self, destination_id: int):
+        self._dirty.add(destination_id)
+
+    async def _run(self):
+        from .database import SessionLocal
+        while True:
+            await asyncio.sleep(self.refresh_seconds)
+            try:
+                async with SessionLocal() as db:
+                    await self.refresh(db)
+            except Exception:
+                logger.exception("Popularity refresh failed; serving the previous ranking")
+
+    async def refresh(self, db: AsyncSession) -> PopularityRanking:
+        """Fold in changes since the last refresh and republish the top-N"""
+        async with self._lock:
+            if self._rebuilt_at is None or time.monotonic() - self._rebuilt_at >= self.rebuild_seconds:
+                await self._rebuild(db)
+            else:
+                await self._update(db)
+            return await self._publish(db)
+
+    def _cutoff(self) -> date:
+        """First day still inside the window"""
+        return (datetime.utcnow() - timedelta(days=self.window_days)).date()
+
+    def _add_volume(self, destination_id: int, day, count: int, touched: set):
+        if isinstance(day, str):
+            # SQLite returns date() as text
+            day = date.fromisoformat(day)
+        if day < self._cutoff():
+            return
+        self._daily.setdefault(day, Counter())[destination_id] += count
+        self._volume[destination_id] += count
+        touched.add(destination_id)
+
+    def _expire_volume(self, touched: set):
+        cutoff = self._cutoff()
+        for day in [day for day in self._daily if day < cutoff]:
+            expired = self._daily.pop(day)
+            self._volume.subtract(expired)
+            touched.update(expired)
+
+    async def _load_activity(self, db: AsyncSession, touched: set):
+        # Watermarks come from the tables, not the window, so rows older than
+        # the window are never read again. They are taken first so rows
+        # committed while this runs are left for the next refresh.
+        last_trip_id = await db.scalar(select(func.coalesce(func.max(Trip.id), 0)))
+        last_booking_id = await db.scalar(select(func.coalesce(func.max(Booking.id), 0)))
+        window_start = datetime.combine(self._cutoff(), datetime.min.time())
+        # Counted per destination and day in the database; only the
+        # aggregates cross into Python
+        trip_day = func.date(Trip.created_at)
+        trips = (
+            select(Trip.destination_id, trip_day, func.count())
+            .where(Trip.id > self._last_trip_id, Trip.id <= last_trip_id, Trip.created_at >= window_start)
+            .group_by(Trip.destination_id, trip_day)
+        )
+        booking_day = func.date(Booking.created_at)
+        bookings = (
+            select(Trip.destination_id, booking_day, func.count())
+            .join(Trip, Booking.trip_id == Trip.id)
+            .where(
+                Booking.id > self._last_booking_id, Booking.id <= last_booking_id,
+                Booking.created_at >= window_start
+            )
+            .group_by(Trip.destination_id, booking_day)
+        )
+        for statement in (trips, bookings):
+            for destination_id, day, count in (await db.execute(statement)).all():
+                self._add_volume(destination_id, day, count, touched)
+        self._last_trip_id = last_trip_id
+        self._last_booking_id = last_booking_id
+
+    async def _load_ratings(self, db: AsyncSession, condition) -> set:
+        rows = (await db.execute(
+            select(Destination.id, Destination.tourist_rating, Destination.safety_rating).where(condition)
+        )).all()
+        for row in rows:
+            self._ratings[row.id] = (row.tourist_rating, row.safety_rating)
+            self._last_destination_id = max(self._last_destination_id, row.id)
+        return {row.id for row in rows}
+
+    def _score(self, destination_ids):
+        for destination_id in destination_ids:
+            if destination_id in self._ratings:
+                tourist_rating, safety_rating = self._ratings[destination_id]
+                self._scores[destination_id] = popularity_score(
+                    tourist_rating, safety_rating, self._volume[destination_id]
+                )
+            else:
+                self._scores.pop(destination_id, None)
+
+    def _select_top(self):
+        self._top = heapq.nlargest(self.top_n, ((score, -destination_id) for destination_id, score in self._scores.items()))
+
+    async def _rebuild(self, db: AsyncSession):
+        self._reset()
+        self._dirty.clear()
+        touched = await self._load_ratings(db, Destination.id > 0)
+        await self._load_activity(db, touched)
+        self._score(touched)
+        self._select_top()
+        self._rebuilt_at = time.monotonic()
+
+    async def _update(self, db: AsyncSession):
+        dirty, self._dirty = self._dirty, set()
+        touched = await self._load_ratings(db, Destination.id > self._last_destination_id)
+        if dirty:
+            deleted = dirty - await self._load_ratings(db, Destination.id.in_(dirty))
+            for destination_id in deleted:
+                self._ratings.pop(destination_id, None)
+            touched |= dirty
+        await self._load_activity(db, touched)
+        self._expire_volume(touched)
+        if not touched:
+            return
+        floor = self._top[-1] if len(self._top) == self.top_n else None
+        current = {-entry[1]: entry[0] for entry in self._top}
+        self._score(touched)
+        # The list can be patched in place unless a member lost score or
+        # left, in which case some destination outside it may now qualify
+        if any(
+            destination_id in current and self._scores.get(destination_id, -1.0) < current[destination_id]
+            for destination_id in touched
+        ):
+            self._select_top()
+            return
+        candidates = {entry[1]: entry for entry in self._top}
+        for destination_id in touched:
+            if destination_id in self._scores:
+                entry = (self._scores[destination_id], -destination_id)
+                if floor is None or entry > floor:
+                    candidates[-destination_id] = entry
+        self._top = heapq.nlargest(self.top_n, candidates.values())
+
+    async def _publish(self, db: AsyncSession) -> PopularityRanking:
+        ids = [-entry[1] for entry in self._top]
+        rows = {
+            dest.id: dest
+            for dest in (await db.scalars(select(Destination).where(Destination.id.in_(ids)))).all()
+        }
+        destinations = [to_destination(rows[destination_id]) for destination_id in ids if destination_id in rows]
+        if self.ranking is None or self.ranking.destinations != destinations:
+            self.ranking = PopularityRanking(
+                version=(self.ranking.version + 1) if self.ranking else 1,
+                digest=hashlib.sha256(dump_json(List[DestinationResponse], destinations)).hexdigest()[:20],
+                computed_at=datetime.utcnow(),
+                destinations=destinations
+            )
+        return self.ranking
+
+popularity_index = PopularityIndex(
+    POPULARITY_TOP_N, POPULARITY_WINDOW_DAYS, POPULARITY_REFRESH_SECONDS, POPULARITY_REBUILD_SECONDS
+)
+
+# Rating edits made through the ORM are rescored on the next refresh instead
+# of waiting for a full rebuild
+@event.listens_for(Destination, "after_update")
+@event.listens_for(Destination, "after_delete")
+def _mark_destination_dirty(mapper, connection, target):
+    popularity_index.mark_dirty(target.id)
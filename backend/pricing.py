@@ -0,0 +1,49 @@
+from typing import Dict, Sequence
+import numpy as np
+
+# Daily costs per traveler at the moderate budget level, in USD
+BASE_DAILY_COSTS = {
+    "accommodation": 100,
+    "food": 60,
+    "activities": 50,
+    "transport": 30,
+}
+BUDGET_MULTIPLIERS = {
+    "budget": 0.7,
+    "moderate": 1.0,
+    "luxury": 1.8,
+}
+# Unknown budget levels are priced as moderate
+DEFAULT_MULTIPLIER = 1.0
+# Getting to the destination, per traveler
+FIXED_TRANSPORT = 200
+# Each extra traveler adds this share of the accommodation (shared rooms)
+SHARED_ROOM_FACTOR = 0.6
+
+COST_COMPONENTS = ("accommodation", "food", "activities", "transport")
+
+def budget_multiplier(budget: str) -> float:
+    return BUDGET_MULTIPLIERS.get(budget, DEFAULT_MULTIPLIER)
+
+def quote_grid(budgets: Sequence[str], durations: Sequence[int], travelers: Sequence[int]) -> Dict[str, np.ndarray]:
+    """Trip cost estimates for every (budget, duration, travelers) combination.
+
+    Evaluates calculate_trip_cost's formula over whole arrays at once; each
+    component and the total is a float array of shape
+    ``(len(budgets), len(durations), len(travelers))``, rounded to cents.
+    """
+    multiplier = np.array([budget_multiplier(budget) for budget in budgets], dtype=np.float64)[:, None, None]
+    days = np.asarray(durations, dtype=np.float64)[None, :, None]
+    people = np.asarray(travelers, dtype=np.float64)[None, None, :]
+
+    daily = {name: BASE_DAILY_COSTS[name] * multiplier for name in COST_COMPONENTS}
+    costs = {
+        "accommodation": daily["accommodation"] * days * (1 + (people - 1) * SHARED_ROOM_FACTOR),
+        "food": daily["food"] * days * people,
+        "activities": daily["activities"] * days * people,
+        "transport": (daily["transport"] * days + FIXED_TRANSPORT) * people,
+    }
+    shape = (len(budgets), len(durations), len(travelers))
+    costs = {name: np.broadcast_to(value, shape) for name, value in costs.items()}
+    costs["total"] = sum(costs[name] for name in COST_COMPONENTS)
+    return {name: np.round(value, 2) for name, value in costs.items()}
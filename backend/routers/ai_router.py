@@ -1,329 +1,353 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List
-import random
-import uuid
+from fastapi import APIRouter, Depends, HTTPException, Header, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional, Union
+import os
+import orjson
+from dotenv import load_dotenv
 
-from ..database import get_db
-from ..auth import get_current_user
-from ..models import User, AITripPlan, Destination
-from ..schemas import AITripPlanRequest, AITripPlanResponse, ItineraryDay, ItineraryActivity, EstimatedCost
+from ..database import SessionLocal, get_db, run_write
+from ..auth import get_current_user, get_current_principal, TokenPrincipal
+from ..ai_jobs import ai_job_queue, AIJobQueueFull
+from ..idempotency import idempotency_store
+from ..inference import InferenceUnavailable, inference_client
+from ..models import User, AIJob, AITripPlan, Destination
+from ..pagination import paginate, next_page, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from ..schemas import (
+    Page, AIJobResponse, AITripPlanRequest, AITripPlanResponse, AITripPlanVariantsRequest, AITripPlanVariantsResponse,
+    AIPlanSummary, AITextPlanResponse, EstimatedCost, ItineraryDay, PriceGridResponse
+)
+from ..itinerary import plan_seed
+from ..planner import generate_plan, get_best_time_to_visit, iter_plan, plan_prompt, plan_record, save_plan
+from ..pricing import BUDGET_MULTIPLIERS, COST_COMPONENTS, quote_grid
+from ..plan_cache import normalize_plan_request, plan_cache, plan_key
+from ..serializers import dump_json, model_response
+
+load_dotenv()
+
+# Variations accepted per /generate-variants request
+AI_PLAN_MAX_VARIANTS = int(os.getenv("AI_PLAN_MAX_VARIANTS", 20))
+
+# Plan fields sent as their own events by /generate-trip/stream
+STREAMED_SEPARATELY = {"itinerary", "estimated_cost", "travel_tips"}
 
 router = APIRouter()
 
 @router.post("/generate-trip", response_model=AITripPlanResponse)
 async def generate_ai_trip_plan(
     request: AITripPlanRequest,
+    http_request: Request,
+    idempotency_key: Optional[str] = Header(None, max_length=255),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    """Generate an AI-powered trip plan"""
-    
-    # Generate unique trip ID
-    trip_id = f"ai_trip_{uuid.uuid4().hex[:8]}"
-    
-    # AI-powered itinerary generation (mock implementation)
-    itinerary = generate_smart_itinerary(request)
-    
-    # Calculate estimated costs based on destination and preferences
-    estimated_cost = calculate_trip_cost(request)
+    """Generate an AI-powered trip plan; retries with the same Idempotency-Key replay the first plan.
+
+    Plans are cached by their normalized request, so repeating a request
+    without a seed returns the same plan and id.
+    """
+    return await idempotency_store.run(
+        http_request, current_user.id, idempotency_key,
+        lambda: create_ai_trip_plan(request, current_user, db)
+    )
+
+async def create_ai_trip_plan(request: AITripPlanRequest, current_user: User, db: AsyncSession):
+    """Return the plan for the request, generating and caching it if needed, and save it to the user's plans"""
+    request = normalize_plan_request(request)
+    plan_id = plan_key(request)
     
-    # Generate travel tips
-    travel_tips = generate_travel_tips(request.destination, request.interests)
+    body = await plan_cache.get(plan_id, db)
+    generated = body is None
+    if generated:
+        body = dump_json(AITripPlanResponse, generate_plan(request, plan_id))
     
-    # Save AI trip plan to database
-    ai_plan = AITripPlan(
-        user_id=current_user.id,
-        destination=request.destination,
-        duration=request.duration,
-        travelers=request.travelers,
-        budget=request.budget,
-        interests=request.interests,
-        generated_plan={
-            "itinerary": [day.dict() for day in itinerary],
-            "estimated_cost": estimated_cost.dict(),
-            "travel_tips": travel_tips
-        },
-        estimated_cost=estimated_cost.dict()
+    body = await run_write(
+        lambda session: save_plan(session, current_user.id, plan_id, body, generated), db
     )
+    plan_cache.add(plan_id, body)
     
-    db.add(ai_plan)
-    db.commit()
-    
-    return AITripPlanResponse(
-        id=trip_id,
-        destination=request.destination,
-        duration=request.duration,
-        travelers=request.travelers,
-        budget=request.budget,
-        interests=request.interests,
-        itinerary=itinerary,
-        estimated_cost=estimated_cost,
-        travel_tips=travel_tips,
-        best_time_to_visit=get_best_time_to_visit(request.destination)
+    return Response(content=body, media_type="application/json")
+
+@router.post("/generate-trip/stream", response_class=StreamingResponse)
+async def stream_ai_trip_plan(
+    request: AITripPlanRequest,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Generate an AI-powered trip plan as Server-Sent Events.
+
+    Emits ``plan`` (id, trip details, seed and best time to visit), one
+    ``day`` per itinerary day as soon as it is produced, ``estimated_cost``,
+    ``travel_tips``, and ``done`` once the plan is saved to the user's plans.
+    If another request stored a different plan under the same id first,
+    ``replace`` carries that whole plan before ``done``; it is the one
+    ``GET /plans/{id}`` returns.
+    """
+    request = normalize_plan_request(request)
+    plan_id = plan_key(request)
+    cached = await plan_cache.get(plan_id, db)
+    return StreamingResponse(
+        plan_events(request, plan_id, current_user.id, cached),
+        media_type="text/event-stream",
+        # Keep proxies from buffering the stream
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
     )
 
-def generate_smart_itinerary(request: AITripPlanRequest) -> List[ItineraryDay]:
-    """Generate intelligent itinerary based on user preferences"""
-    
-    # Activity pools based on interests
-    activity_pools = {
-        "culture": [
-            {"name": "Visit Historic District", "description": "Explore ancient architecture and cultural landmarks", "duration": "3 hours", "cost": "$25"},
-            {"name": "Local Museum Tour", "description": "Discover art, history, and cultural artifacts", "duration": "2 hours", "cost": "$15"},
-            {"name": "Traditional Performance", "description": "Experience local music and dance", "duration": "2 hours", "cost": "$40"},
-            {"name": "Heritage Walking Tour", "description": "Guided tour through historical neighborhoods", "duration": "3 hours", "cost": "$30"}
-        ],
-        "food": [
-            {"name": "Food Market Tour", "description": "Taste local specialties and street food", "duration": "2 hours", "cost": "$35"},
-            {"name": "Cooking Class", "description": "Learn to prepare traditional dishes", "duration": "4 hours", "cost": "$75"},
-            {"name": "Fine Dining Experience", "description": "Michelin-starred restaurant reservation", "duration": "3 hours", "cost": "$120"},
-            {"name": "Local Food Walking Tour", "description": "Guided culinary adventure", "duration": "3 hours", "cost": "$50"}
-        ],
-        "adventure": [
-            {"name": "Hiking Expedition", "description": "Scenic mountain or nature trail", "duration": "5 hours", "cost": "$40"},
-            {"name": "Water Sports", "description": "Kayaking, surfing, or diving", "duration": "4 hours", "cost": "$80"},
-            {"name": "Adventure Park", "description": "Zip-lining and obstacle courses", "duration": "3 hours", "cost": "$60"},
-            {"name": "Rock Climbing", "description": "Guided climbing experience", "duration": "4 hours", "cost": "$70"}
-        ],
-        "nature": [
-            {"name": "Botanical Garden Visit", "description": "Explore diverse flora and peaceful gardens", "duration": "2 hours", "cost": "$12"},
-            {"name": "Wildlife Safari", "description": "Observe local wildlife in natural habitat", "duration": "6 hours", "cost": "$90"},
-            {"name": "Scenic Viewpoint", "description": "Panoramic views and photography", "duration": "2 hours", "cost": "Free"},
-            {"name": "Nature Reserve Tour", "description": "Guided eco-tour with expert naturalist", "duration": "4 hours", "cost": "$55"}
-        ],
-        "shopping": [
-            {"name": "Local Markets", "description": "Browse handicrafts and souvenirs", "duration": "2 hours", "cost": "$20"},
-            {"name": "Shopping District", "description": "Explore boutiques and local brands", "duration": "3 hours", "cost": "$50"},
-            {"name": "Artisan Workshops", "description": "Meet local craftspeople and buy unique items", "duration": "2 hours", "cost": "$30"},
-            {"name": "Vintage Shopping", "description": "Hunt for unique vintage finds", "duration": "2 hours", "cost": "$25"}
-        ]
-    }
-    
-    # Default activities for any destination
-    default_activities = [
-        {"name": "City Orientation Walk", "description": "Get familiar with the city layout and main attractions", "duration": "2 hours", "cost": "Free"},
-        {"name": "Local Transportation Tour", "description": "Learn to navigate public transport", "duration": "1 hour", "cost": "$5"},
-        {"name": "Sunset Viewing", "description": "Find the best spot to watch the sunset", "duration": "1 hour", "cost": "Free"},
-        {"name": "Local Café Experience", "description": "Relax at a popular local café", "duration": "1 hour", "cost": "$15"}
-    ]
-    
-    itinerary = []
-    
-    for day in range(1, request.duration + 1):
-        # Determine day theme based on interests and day number
-        if day == 1:
-            day_title = f"Arrival & First Impressions of {request.destination}"
-            focus_interests = ["culture"] if "culture" in request.interests else request.interests[:1]
-        elif day == request.duration:
-            day_title = f"Final Adventures & Departure from {request.destination}"
-            focus_interests = request.interests[:2]
-        else:
-            day_title = f"Exploring {request.destination} - Day {day}"
-            focus_interests = request.interests[:2]
-        
-        # Generate activities for the day
-        activities = []
-        
-        # Morning activity
-        morning_activities = []
-        for interest in focus_interests:
-            if interest.lower() in activity_pools:
-                morning_activities.extend(activity_pools[interest.lower()])
-        
-        if morning_activities:
-            morning_activity = random.choice(morning_activities)
-            activities.append(ItineraryActivity(
-                time="9:00 AM",
-                activity=morning_activity["name"],
-                description=morning_activity["description"],
-                duration=morning_activity["duration"],
-                cost=morning_activity["cost"]
-            ))
-        
-        # Lunch
-        activities.append(ItineraryActivity(
-            time="12:30 PM",
-            activity="Local Lunch",
-            description="Try authentic local cuisine at a recommended restaurant",
-            duration="1 hour",
-            cost="$25"
-        ))
-        
-        # Afternoon activity
-        afternoon_activities = []
-        for interest in focus_interests:
-            if interest.lower() in activity_pools:
-                afternoon_activities.extend(activity_pools[interest.lower()])
-        
-        if afternoon_activities:
-            afternoon_activity = random.choice([a for a in afternoon_activities if a not in [morning_activity] if 'morning_activity' in locals()])
-            activities.append(ItineraryActivity(
-                time="2:30 PM",
-                activity=afternoon_activity["name"],
-                description=afternoon_activity["description"],
-                duration=afternoon_activity["duration"],
-                cost=afternoon_activity["cost"]
-            ))
-        
-        # Evening activity
-        if day == 1:
-            activities.append(ItineraryActivity(
-                time="6:00 PM",
-                activity="Welcome Dinner",
-                description="Celebrate your arrival with a special dinner",
-                duration="2 hours",
-                cost="$45"
-            ))
-        else:
-            evening_activity = random.choice(default_activities)
-            activities.append(ItineraryActivity(
-                time="6:00 PM",
-                activity=evening_activity["name"],
-                description=evening_activity["description"],
-                duration=evening_activity["duration"],
-                cost=evening_activity["cost"]
-            ))
-        
-        itinerary.append(ItineraryDay(
-            day=day,
-            title=day_title,
-            activities=activities
-        ))
-    
-    return itinerary
+def sse_event(event: str, data: bytes) -> bytes:
+    return b"event: " + event.encode() + b"\ndata: " + data + b"\n\n"
 
-def calculate_trip_cost(request: AITripPlanRequest) -> EstimatedCost:
-    """Calculate estimated trip costs based on destination and preferences"""
-    
-    # Base costs per day by budget level
-    budget_multipliers = {
-        "budget": 0.7,
-        "moderate": 1.0,
-        "luxury": 1.8
-    }
-    
-    # Base costs per day (moderate budget)
-    base_accommodation = 100
-    base_food = 60
-    base_activities = 50
-    base_transport = 30
-    
-    multiplier = budget_multipliers.get(request.budget, 1.0)
-    
-    # Calculate daily costs
-    daily_accommodation = base_accommodation * multiplier
-    daily_food = base_food * multiplier
-    daily_activities = base_activities * multiplier
-    daily_transport = base_transport * multiplier
-    
-    # Total costs for the trip
-    accommodation = daily_accommodation * request.duration
-    food = daily_food * request.duration
-    activities = daily_activities * request.duration
-    transport = daily_transport * request.duration + 200  # Base transport to destination
+async def plan_events(request: AITripPlanRequest, plan_id: str, user_id: int, cached: Optional[bytes]):
+    if cached is None:
+        seed = plan_seed(request)
+        yield sse_event("plan", orjson.dumps({
+            "id": plan_id,
+            "destination": request.destination,
+            "duration": request.duration,
+            "travelers": request.travelers,
+            "budget": request.budget,
+            "interests": request.interests,
+            "best_time_to_visit": get_best_time_to_visit(request.destination),
+            "seed": seed
+        }))
+        days = iter_plan(request, plan_id, seed)
+        while True:
+            try:
+                day = next(days)
+            except StopIteration as done:
+                plan = done.value
+                break
+            yield sse_event("day", dump_json(ItineraryDay, day))
+        body = dump_json(AITripPlanResponse, plan)
+    else:
+        plan = AITripPlanResponse.model_validate_json(cached)
+        yield sse_event("plan", plan.model_dump_json(exclude=STREAMED_SEPARATELY).encode())
+        for day in plan.itinerary:
+            yield sse_event("day", dump_json(ItineraryDay, day))
+        body = cached
     
-    # Adjust for number of travelers (accommodation might be shared)
-    if request.travelers > 1:
-        accommodation = accommodation * (1 + (request.travelers - 1) * 0.6)  # Shared rooms
-        food = food * request.travelers
-        activities = activities * request.travelers
-        transport = transport * request.travelers
+    yield sse_event("estimated_cost", dump_json(EstimatedCost, plan.estimated_cost))
+    yield sse_event("travel_tips", orjson.dumps(plan.travel_tips))
     
-    total = accommodation + food + activities + transport
-    
-    return EstimatedCost(
-        accommodation=round(accommodation, 2),
-        food=round(food, 2),
-        activities=round(activities, 2),
-        transport=round(transport, 2),
-        total=round(total, 2)
+    # The stream outlives the request handler, so it saves with its own session
+    async with SessionLocal() as session:
+        stored = await run_write(
+            lambda write_session: save_plan(write_session, user_id, plan_id, body, cached is None), session
+        )
+    plan_cache.add(plan_id, stored)
+    if stored != body:
+        yield sse_event("replace", stored)
+    yield sse_event("done", orjson.dumps({"id": plan_id}))
+
+@router.post("/generate-variants", response_model=AITripPlanVariantsResponse)
+async def generate_ai_trip_variants(
+    request: AITripPlanVariantsRequest,
+    http_request: Request,
+    idempotency_key: Optional[str] = Header(None, max_length=255),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Generate one plan per variation of a base request, e.g. budget vs luxury"""
+    if len(request.variations) > AI_PLAN_MAX_VARIANTS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {AI_PLAN_MAX_VARIANTS} variations per request"
+        )
+    return await idempotency_store.run(
+        http_request, current_user.id, idempotency_key,
+        lambda: create_ai_trip_variants(request, current_user, db)
     )
 
-def generate_travel_tips(destination: str, interests: List[str]) -> List[str]:
-    """Generate personalized travel tips"""
-    
-    base_tips = [
-        f"Download offline maps for {destination} before you travel",
-        "Keep copies of important documents in separate locations",
-        "Learn a few basic phrases in the local language",
-        "Check visa requirements and passport validity",
-        "Get travel insurance for peace of mind",
-        "Notify your bank about your travel dates",
-        "Pack comfortable walking shoes",
-        "Bring a portable charger for your devices"
+async def create_ai_trip_variants(request: AITripPlanVariantsRequest, current_user: User, db: AsyncSession):
+    """Return every variation's plan, saving them to the user's plans in one transaction"""
+    base = request.base.model_dump()
+    variants = [
+        normalize_plan_request(AITripPlanRequest(**{**base, **variation.model_dump(exclude_unset=True, exclude_none=True)}))
+        for variation in request.variations
     ]
+    plan_ids = [plan_key(variant) for variant in variants]
     
-    interest_tips = {
-        "culture": [
-            "Research local customs and etiquette beforehand",
-            "Visit museums early in the morning to avoid crowds",
-            "Consider hiring a local guide for deeper cultural insights"
-        ],
-        "food": [
-            "Try street food from busy stalls (high turnover = fresh food)",
-            "Ask locals for restaurant recommendations",
-            "Be adventurous but know your dietary restrictions"
-        ],
-        "adventure": [
-            "Pack appropriate gear for outdoor activities",
-            "Check weather conditions before adventure activities",
-            "Consider travel insurance that covers adventure sports"
-        ],
-        "nature": [
-            "Bring binoculars for wildlife viewing",
-            "Pack insect repellent and sunscreen",
-            "Respect local wildlife and follow park rules"
-        ],
-        "shopping": [
-            "Learn basic bargaining phrases",
-            "Keep receipts for customs declarations",
-            "Leave extra space in your luggage for purchases"
-        ]
-    }
+    # Cached plans come from one lookup; repeated variations are generated once
+    bodies = await plan_cache.get_many(plan_ids, db)
+    generated = {}
+    for plan_id, variant in zip(plan_ids, variants):
+        if plan_id not in bodies and plan_id not in generated:
+            generated[plan_id] = dump_json(AITripPlanResponse, generate_plan(variant, plan_id))
     
-    tips = base_tips.copy()
+    async def save(session):
+        stored = dict(bodies)
+        for plan_id, body in generated.items():
+            stored[plan_id] = await plan_cache.store(session, plan_id, body)
+        session.add_all([plan_record(current_user.id, plan_id, stored[plan_id]) for plan_id in plan_ids])
+        return stored
     
-    for interest in interests:
-        if interest.lower() in interest_tips:
-            tips.extend(interest_tips[interest.lower()])
+    stored = await run_write(save, db)
+    for plan_id in generated:
+        plan_cache.add(plan_id, stored[plan_id])
     
-    return random.sample(tips, min(8, len(tips)))
+    # The stored bodies are already AITripPlanResponse JSON
+    return Response(
+        content=b'{"plans":[' + b",".join(stored[plan_id] for plan_id in plan_ids) + b"]}",
+        media_type="application/json"
+    )
+
+@router.post("/jobs", response_model=AIJobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def submit_ai_trip_job(
+    request: AITripPlanRequest,
+    http_request: Request,
+    idempotency_key: Optional[str] = Header(None, max_length=255),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Queue a trip plan generation and return its job at once; poll GET /jobs/{id} for the plan"""
+    return await idempotency_store.run(
+        http_request, current_user.id, idempotency_key,
+        lambda: create_ai_trip_job(request, http_request, current_user, db)
+    )
 
-def get_best_time_to_visit(destination: str) -> str:
-    """Get the best time to visit a destination"""
+async def create_ai_trip_job(request: AITripPlanRequest, http_request: Request, current_user: User, db: AsyncSession):
+    try:
+        job = await ai_job_queue.submit(request, current_user.id, db)
+    except AIJobQueueFull:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many AI jobs queued, please retry",
+            headers={"Retry-After": "5"}
+        )
+    return model_response(
+        AIJobResponse, AIJobResponse.model_validate(job),
+        status_code=status.HTTP_202_ACCEPTED,
+        headers={"Location": str(http_request.url_for("get_ai_trip_job", job_id=job.id))}
+    )
+
+@router.get("/jobs/metrics", response_model=dict)
+async def get_ai_job_metrics(current_user: Union[User, TokenPrincipal] = Depends(get_current_principal)):
+    """Queue depth, worker usage and recent job timings"""
+    return ai_job_queue.stats()
+
+@router.get("/jobs/{job_id}", response_model=AIJobResponse)
+async def get_ai_trip_job(
+    job_id: str,
+    current_user: Union[User, TokenPrincipal] = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get a job's status, and its plan once it has succeeded"""
+    job = await db.get(AIJob, job_id)
+    if job is None or job.user_id != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="AI job not found"
+        )
+    response = AIJobResponse.model_validate(job)
+    if job.plan_id is not None:
+        body = await plan_cache.get(job.plan_id, db)
+        if body is not None:
+            response.result = AITripPlanResponse.model_validate_json(body)
+    return model_response(AIJobResponse, response)
+
+@router.post("/generate-text-plan", response_model=AITextPlanResponse)
+async def generate_ai_text_plan(
+    request: AITripPlanRequest,
+    current_user: User = Depends(get_current_user)
+):
+    """Write a free-text trip plan with the language model on the inference worker.
+
+    Concurrent requests are batched by the worker, so they share one
+    ``generate`` call rather than waiting for each other.
+    """
+    if inference_client is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Text generation is not configured"
+        )
+    request = normalize_plan_request(request)
+    try:
+        generation = await inference_client.agenerate(plan_prompt(request))
+    except InferenceUnavailable:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Text generation is unavailable; try again shortly"
+        )
     
-    # This would typically query a database or external API
-    # For now, return generic advice
-    seasonal_advice = {
-        "paris": "April-June, September-October",
-        "tokyo": "March-May, September-November", 
-        "bali": "April-October",
-        "new york": "April-June, September-November",
-        "london": "May-September",
-        "rome": "April-June, September-October"
+    return {
+        "destination": request.destination,
+        "duration": request.duration,
+        "plan": generation.text,
+        "model": generation.model,
+        "backend": generation.backend
     }
+
+@router.get("/price-grid", response_model=PriceGridResponse)
+async def get_price_grid(
+    budget: List[str] = Query(list(BUDGET_MULTIPLIERS), description="Budget levels, in output order"),
+    min_duration: int = Query(1, ge=1, le=30),
+    max_duration: int = Query(30, ge=1, le=30),
+    min_travelers: int = Query(1, ge=1, le=20),
+    max_travelers: int = Query(20, ge=1, le=20),
+    components: bool = False,
+    current_user: Union[User, TokenPrincipal] = Depends(get_current_principal)
+):
+    """Estimated trip totals for every budget level, duration and party size"""
+    unknown = [level for level in budget if level not in BUDGET_MULTIPLIERS]
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown budget level: {unknown[0]}"
+        )
+    if min_duration > max_duration or min_travelers > max_travelers:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Range minimum is greater than its maximum"
+        )
     
-    return seasonal_advice.get(destination.lower(), "Check local weather patterns and tourist seasons")
+    durations = range(min_duration, max_duration + 1)
+    travelers = range(min_travelers, max_travelers + 1)
+    grid = quote_grid(budget, durations, travelers)
+    content = {
+        "budgets": budget,
+        "durations": list(durations),
+        "travelers": list(travelers),
+        "totals": grid["total"],
+        "components": {name: grid[name] for name in COST_COMPONENTS} if components else None
+    }
+    # The arrays go straight to orjson instead of through nested lists
+    return Response(content=orjson.dumps(content, option=orjson.OPT_SERIALIZE_NUMPY), media_type="application/json")
 
-@router.get("/my-plans", response_model=List[dict])
+@router.get("/plans/{plan_id}", response_model=AITripPlanResponse)
+async def get_ai_plan(
+    plan_id: str,
+    current_user: Union[User, TokenPrincipal] = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get one of the user's generated trip plans by the id /generate-trip returned"""
+    owned = await db.scalar(
+        select(AITripPlan.id)
+        .where(AITripPlan.user_id == current_user.id, AITripPlan.generated_plan["plan_id"].as_string() == plan_id)
+        .limit(1)
+    )
+    body = await plan_cache.get(plan_id, db) if owned is not None else None
+    if body is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="AI plan not found"
+        )
+    return Response(content=body, media_type="application/json")
+
+@router.get("/my-plans", response_model=Page[AIPlanSummary])
 async def get_my_ai_plans(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    """Get user's AI-generated trip plans"""
-    plans = db.query(AITripPlan).filter(AITripPlan.user_id == current_user.id).all()
+    """Get user's AI-generated trip plans, newest first"""
+    stmt = paginate(select(AITripPlan).where(AITripPlan.user_id == current_user.id), AITripPlan, limit, cursor)
+    plans, next_cursor = next_page((await db.scalars(stmt)).all(), limit)
     
-    return [
-        {
-            "id": plan.id,
-            "destination": plan.destination,
-            "duration": plan.duration,
-            "travelers": plan.travelers,
-            "budget": plan.budget,
-            "interests": plan.interests,
-            "estimated_cost": plan.estimated_cost,
-            "created_at": plan.created_at
-        }
-        for plan in plans
-    ]
\ No newline at end of file
+    return model_response(Page[AIPlanSummary], Page[AIPlanSummary](
+        items=[
+            AIPlanSummary.model_validate(plan).model_copy(update={"plan_id": (plan.generated_plan or {}).get("plan_id")})
+            for plan in plans
+        ],
+        next_cursor=next_cursor
+    ))
\ No newline at end of file
@@ -1,25 +1,27 @@
 from fastapi import APIRouter, HTTPException, Depends, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import timedelta
 
-from ..database import get_db
+from ..database import get_db, run_write
 from ..auth import (
     authenticate_user, 
-    create_access_token, 
-    get_password_hash, 
+    create_user_access_token, 
+    get_password_hash_async, 
     get_current_user,
     ACCESS_TOKEN_EXPIRE_MINUTES
 )
 from ..models import User
 from ..schemas import UserCreate, UserLogin, UserResponse, Token, UserUpdate
+from ..serializers import model_response
 
 router = APIRouter()
 
 @router.post("/register", response_model=UserResponse)
-async def register(user_data: UserCreate, db: Session = Depends(get_db)):
+async def register(user_data: UserCreate, db: AsyncSession = Depends(get_db)):
     """Register a new user"""
     # Check if username already exists
-    existing_user = db.query(User).filter(User.username == user_data.username).first()
+    existing_user = await db.scalar(select(User).where(User.username == user_data.username))
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -27,15 +29,16 @@ async def register(user_data: UserCreate, db: Session = Depends(get_db)):
         )
     
     # Check if email already exists
-    existing_email = db.query(User).filter(User.email == user_data.email).first()
+    existing_email = await db.scalar(select(User).where(User.email == user_data.email))
     if existing_email:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered"
         )
     
-    # Hash password and create user
-    hashed_password = get_password_hash(user_data.password)
+    # Hash password and create user; return the connection to the pool while the hash runs
+    await db.commit()
+    hashed_password = await get_password_hash_async(user_data.password)
     
     user = User(
         username=user_data.username,
@@ -49,28 +52,19 @@ async def register(user_data: UserCreate, db: Session = Depends(get_db)):
         is_verified=False
     )
     
-    db.add(user)
-    db.commit()
-    db.refresh(user)
+    async def insert_user(session):
+        session.add(user)
+        await session.flush()
+        await session.refresh(user)
     
-    return UserResponse(
-        id=user.id,
-        username=user.username,
-        email=user.email,
-        full_name=user.full_name,
-        phone_number=user.phone_number,
-        date_of_birth=user.date_of_birth,
-        country=user.country,
-        is_active=user.is_active,
-        is_verified=user.is_verified,
-        created_at=user.created_at,
-        updated_at=user.updated_at
-    )
+    await run_write(insert_user, db)
+    
+    return model_response(UserResponse, UserResponse.model_validate(user))
 
 @router.post("/login", response_model=Token)
-async def login(user_credentials: UserLogin, db: Session = Depends(get_db)):
+async def login(user_credentials: UserLogin, db: AsyncSession = Depends(get_db)):
     """Authenticate user and return access token"""
-    user = authenticate_user(db, user_credentials.username, user_credentials.password)
+    user = await authenticate_user(db, user_credentials.username, user_credentials.password)
     
     if not user:
         raise HTTPException(
@@ -80,9 +74,7 @@ async def login(user_credentials: UserLogin, db: Session = Depends(get_db)):
         )
     
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    access_token = create_access_token(
-        data={"sub": user.username}, expires_delta=access_token_expires
-    )
+    access_token = create_user_access_token(user, expires_delta=access_token_expires)
     
     return Token(
         access_token=access_token,
@@ -93,16 +85,4 @@ async def login(user_credentials: UserLogin, db: Session = Depends(get_db)):
 @router.get("/me", response_model=UserResponse)
 async def get_current_user_info(current_user: User = Depends(get_current_user)):
     """Get current user information"""
-    return UserResponse(
-        id=current_user.id,
-        username=current_user.username,
-        email=current_user.email,
-        full_name=current_user.full_name,
-        phone_number=current_user.phone_number,
-        date_of_birth=current_user.date_of_birth,
-        country=current_user.country,
-        is_active=current_user.is_active,
-        is_verified=current_user.is_verified,
-        created_at=current_user.created_at,
-        updated_at=current_user.updated_at
-    )
\ No newline at end of file
+    return model_response(UserResponse, UserResponse.model_validate(current_user))
\ No newline at end of file
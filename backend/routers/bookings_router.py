@@ -1,12 +1,33 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, status
+from pydantic import ValidationError
+from sqlalchemy import select, insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional, Tuple
+from datetime import datetime
+import logging
+import os
 import random
 import string
+from dotenv import load_dotenv
 
-from ..database import get_db
+from ..database import get_db, run_write
 from ..auth import get_current_user
-from ..models import User, Booking, BookingStatus, BookingType
+from ..idempotency import idempotency_store
+from ..models import User, Booking, BookingStatus, BookingType, Trip
+from ..pagination import paginate, next_page, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from ..schemas import (
+    Page, BookingSummary, BookingCreate, BulkBookingRequest, BulkBookingResult, BulkBookingResponse
+)
+from ..serializers import model_response
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Bookings accepted per bulk request, and inserted per transaction
+BULK_BOOKING_MAX_ITEMS = int(os.getenv("BULK_BOOKING_MAX_ITEMS", 5000))
+BULK_BOOKING_CHUNK_SIZE = int(os.getenv("BULK_BOOKING_CHUNK_SIZE", 500))
 
 router = APIRouter()
 
@@ -14,38 +35,45 @@ def generate_booking_reference() -> str:
     """Generate a unique booking reference"""
     return ''.join(random.choices(string.ascii_uppercase + string.digits, k=8))
 
-@router.get("/my-bookings")
+@router.get("/my-bookings", response_model=Page[BookingSummary])
 async def get_my_bookings(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    """Get user's bookings"""
-    bookings = db.query(Booking).filter(Booking.user_id == current_user.id).all()
+    """Get user's bookings, newest first"""
+    stmt = paginate(select(Booking).where(Booking.user_id == current_user.id), Booking, limit, cursor)
+    bookings, next_cursor = next_page((await db.scalars(stmt)).all(), limit)
     
-    return [
-        {
-            "id": booking.id,
-            "booking_reference": booking.booking_reference,
-            "booking_type": booking.booking_type,
-            "service_name": booking.service_name,
-            "total_amount": booking.total_amount,
-            "currency": booking.currency,
-            "status": booking.status,
-            "created_at": booking.created_at
-        }
-        for booking in bookings
-    ]
+    return model_response(Page[BookingSummary], Page[BookingSummary](
+        items=[BookingSummary.model_validate(booking) for booking in bookings], next_cursor=next_cursor
+    ))
 
 @router.post("/simulate-booking")
 async def simulate_booking(
     booking_type: str,
     service_name: str,
     amount: float,
+    http_request: Request,
+    idempotency_key: Optional[str] = Header(None, max_length=255),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    """Simulate a booking for demo purposes"""
-    
+    """Simulate a booking for demo purposes; retries with the same Idempotency-Key replay the first booking"""
+    return await idempotency_store.run(
+        http_request, current_user.id, idempotency_key,
+        lambda: create_simulated_booking(booking_type, service_name, amount, current_user, db)
+    )
+
+async def create_simulated_booking(
+    booking_type: str,
+    service_name: str,
+    amount: float,
+    current_user: User,
+    db: AsyncSession
+):
+    """Save a confirmed simulated booking"""
     booking_reference = generate_booking_reference()
     
     booking = Booking(
@@ -53,17 +81,109 @@ async def simulate_booking(
         booking_reference=booking_reference,
         booking_type=BookingType(booking_type),
         service_name=service_name,
+        booking_date=datetime.utcnow(),
         total_amount=amount,
         currency="USD",
         status=BookingStatus.CONFIRMED,
         confirmation_details={"simulated": True}
     )
     
-    db.add(booking)
-    db.commit()
+    await run_write(lambda session: session.add(booking), db)
     
     return {
         "booking_reference": booking_reference,
         "status": "confirmed",
         "message": "Booking simulation successful"
-    }
\ No newline at end of file
+    }
+
+async def _free_references(session, count: int) -> List[str]:
+    """``count`` distinct booking references not yet in the table"""
+    references = set()
+    while len(references) < count:
+        candidates = set()
+        while len(references) + len(candidates) < count:
+            candidate = generate_booking_reference()
+            if candidate not in references:
+                candidates.add(candidate)
+        taken = set(await session.scalars(
+            select(Booking.booking_reference).where(Booking.booking_reference.in_(candidates))
+        ))
+        references |= candidates - taken
+    return list(references)
+
+async def _insert_bookings(session, user_id: int, items: List[Tuple[int, BookingCreate]], now: datetime) -> List[str]:
+    references = await _free_references(session, len(items))
+    # One executemany (multi-row INSERT) for the whole chunk
+    await session.execute(insert(Booking), [
+        {
+            "user_id": user_id,
+            "trip_id": booking.trip_id,
+            "booking_reference": reference,
+            "booking_type": BookingType(booking.booking_type.value),
+            "service_name": booking.service_name,
+            "booking_date": now,
+            "total_amount": booking.amount,
+            "currency": booking.currency,
+            "status": BookingStatus.CONFIRMED,
+            "confirmation_details": {"source": "bulk"}
+        }
+        for (_, booking), reference in zip(items, references)
+    ])
+    return references
+
+@router.post("/bulk", response_model=BulkBookingResponse)
+async def create_bookings_bulk(
+    request: BulkBookingRequest,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Create many bookings in one call, reporting the outcome of each item"""
+    if len(request.items) > BULK_BOOKING_MAX_ITEMS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {BULK_BOOKING_MAX_ITEMS} bookings per request"
+        )
+    
+    results = [None] * len(request.items)
+    valid = []
+    for index, item in enumerate(request.items):
+        try:
+            valid.append((index, BookingCreate.model_validate(item)))
+        except ValidationError as exc:
+            results[index] = BulkBookingResult(index=index, status="invalid", errors=[
+                f"{'.'.join(str(part) for part in error['loc']) or 'item'}: {error['msg']}" for error in exc.errors()
+            ])
+    
+    # Every referenced trip is checked against the caller in one query
+    trip_ids = {booking.trip_id for _, booking in valid if booking.trip_id is not None}
+    if trip_ids:
+        owned = set(await db.scalars(
+            select(Trip.id).where(Trip.id.in_(trip_ids), Trip.user_id == current_user.id)
+        ))
+        for index, booking in valid:
+            if booking.trip_id is not None and booking.trip_id not in owned:
+                results[index] = BulkBookingResult(index=index, status="invalid", errors=["trip_id: Trip not found"])
+        valid = [(index, booking) for index, booking in valid if results[index] is None]
+    
+    # Each chunk is its own transaction: a failure loses that chunk only,
+    # and the single SQLite writer is never held for the whole request
+    now = datetime.utcnow()
+    for start in range(0, len(valid), BULK_BOOKING_CHUNK_SIZE):
+        chunk = valid[start:start + BULK_BOOKING_CHUNK_SIZE]
+        try:
+            references = await run_write(
+                lambda session: _insert_bookings(session, current_user.id, chunk, now), db
+            )
+        except SQLAlchemyError:
+            logger.exception("Bulk booking chunk of %d items failed", len(chunk))
+            await db.rollback()
+            for index, _ in chunk:
+                results[index] = BulkBookingResult(index=index, status="failed", errors=["Booking could not be saved"])
+            continue
+        for (index, _), reference in zip(chunk, references):
+            results[index] = BulkBookingResult(index=index, status="confirmed", booking_reference=reference)
+    
+    created = sum(result.status == "confirmed" for result in results)
+    return model_response(BulkBookingResponse, BulkBookingResponse(
+        created=created, failed=len(results) - created, results=results
+    ))
@@ -1,80 +1,207 @@
-from fastapi import APIRouter, HTTPException, Depends, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 
 from ..database import get_db
-from ..auth import get_current_user
-from ..models import User, Destination
-from ..schemas import DestinationResponse, DestinationSearchRequest, DestinationSearchResponse
+from ..auth import TokenPrincipal
+from ..catalog import catalog_version, get_catalog_reader, strong_etag, etag_matches, not_modified, cache_headers
+from ..models import Destination
+from ..search import search_destination_ids
+from ..geo import geo_index, sync_geo_index
+from ..popularity import popularity_index
+from ..schemas import (
+    DestinationResponse, DestinationSearchRequest, DestinationSearchResponse,
+    NearbyDestinationResponse, DestinationMarker, MarkerCluster
+)
+from ..fieldsets import parse_fields, load_options
+from ..serializers import project, projection_type, model_response
 
 router = APIRouter()
 
+# What a destination card renders; ``fields=*`` returns full destinations
+DESTINATION_LIST_FIELDS = (
+    "id,name,country,city,image_url,best_time_to_visit,average_budget_per_day,safety_rating,tourist_rating"
+)
+FIELDS_DESCRIPTION = "Comma-separated fields to return, e.g. name,country,image_url; * for all"
+
 @router.get("/search", response_model=List[DestinationSearchResponse])
 async def search_destinations(
+    request: Request,
     query: str,
     limit: int = 10,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: Optional[TokenPrincipal] = Depends(get_catalog_reader),
+    db: AsyncSession = Depends(get_db)
 ):
     """Search for destinations"""
-    destinations = db.query(Destination).filter(
-        Destination.name.ilike(f"%{query}%") | 
-        Destination.country.ilike(f"%{query}%") |
-        Destination.city.ilike(f"%{query}%")
-    ).limit(limit).all()
+    etag = strong_etag("catalog", await catalog_version.get(db))
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    ids = await search_destination_ids(db, query, limit)
+    by_id = {
+        dest.id: dest
+        for dest in (await db.scalars(select(Destination).where(Destination.id.in_(ids)))).all()
+    }
+    # Keep the relevance order from the index
+    destinations = [by_id[destination_id] for destination_id in ids if destination_id in by_id]
     
-    return [
-        DestinationSearchResponse(
-            name=dest.name,
-            country=dest.country,
-            city=dest.city,
-            description=dest.description,
-            image_url=dest.image_url,
-            average_budget=dest.average_budget_per_day,
-            best_time_to_visit=dest.best_time_to_visit
+    return model_response(
+        List[DestinationSearchResponse],
+        [DestinationSearchResponse.model_validate(dest) for dest in destinations],
+        headers=cache_headers(etag)
+    )
+
+class BoundingBox:
+    """Map viewport query parameters; min_lon > max_lon crosses the antimeridian"""
+
+    def __init__(
+        self,
+        min_lat: float = Query(..., ge=-90, le=90),
+        min_lon: float = Query(..., ge=-180, le=180),
+        max_lat: float = Query(..., ge=-90, le=90),
+        max_lon: float = Query(..., ge=-180, le=180)
+    ):
+        if min_lat > max_lat:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="min_lat must not be greater than max_lat"
+            )
+        self.min_lat = min_lat
+        self.min_lon = min_lon
+        self.max_lat = max_lat
+        self.max_lon = max_lon
+
+@router.get("/nearby", response_model=List[NearbyDestinationResponse])
+async def get_nearby_destinations(
+    request: Request,
+    lat: float = Query(..., ge=-90, le=90),
+    lon: float = Query(..., ge=-180, le=180),
+    k: int = Query(10, ge=1, le=100),
+    current_user: Optional[TokenPrincipal] = Depends(get_catalog_reader),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get the destinations closest to a point"""
+    version = await catalog_version.get(db)
+    etag = strong_etag("catalog", version)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    await sync_geo_index(db, version)
+    nearest = geo_index.nearest(lat, lon, k)
+    rows = {
+        row.id: row
+        for row in (await db.execute(
+            select(Destination.id, Destination.name, Destination.country, Destination.city)
+            .where(Destination.id.in_([destination_id for destination_id, _, _, _ in nearest]))
+        )).all()
+    }
+    
+    return model_response(List[NearbyDestinationResponse], [
+        NearbyDestinationResponse(
+            id=destination_id,
+            name=rows[destination_id].name,
+            country=rows[destination_id].country,
+            city=rows[destination_id].city,
+            latitude=latitude,
+            longitude=longitude,
+            distance_km=round(distance, 3)
         )
-        for dest in destinations
-    ]
+        for destination_id, latitude, longitude, distance in nearest
+        if destination_id in rows
+    ], headers=cache_headers(etag))
+
+@router.get("/within", response_model=List[DestinationMarker])
+async def get_destinations_within(
+    request: Request,
+    box: BoundingBox = Depends(),
+    limit: int = Query(500, ge=1, le=5000),
+    current_user: Optional[TokenPrincipal] = Depends(get_catalog_reader),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get destination markers inside a bounding box"""
+    version = await catalog_version.get(db)
+    etag = strong_etag("catalog", version)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    await sync_geo_index(db, version)
+    points = geo_index.within(box.min_lat, box.min_lon, box.max_lat, box.max_lon, limit)
+    names = dict((await db.execute(
+        select(Destination.id, Destination.name)
+        .where(Destination.id.in_([destination_id for destination_id, _, _ in points]))
+    )).all())
+    
+    return model_response(List[DestinationMarker], [
+        DestinationMarker(id=destination_id, name=names[destination_id], latitude=latitude, longitude=longitude)
+        for destination_id, latitude, longitude in points
+        if destination_id in names
+    ], headers=cache_headers(etag))
+
+@router.get("/clusters", response_model=List[MarkerCluster])
+async def get_destination_clusters(
+    request: Request,
+    box: BoundingBox = Depends(),
+    zoom: int = Query(..., ge=0, le=22),
+    limit: int = Query(2000, ge=1, le=10000),
+    current_user: Optional[TokenPrincipal] = Depends(get_catalog_reader),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get clustered destination markers for a map viewport"""
+    version = await catalog_version.get(db)
+    etag = strong_etag("catalog", version)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    await sync_geo_index(db, version)
+    return model_response(List[MarkerCluster], [
+        MarkerCluster(
+            latitude=cluster.latitude,
+            longitude=cluster.longitude,
+            count=cluster.count,
+            destination_id=cluster.destination_id
+        )
+        for cluster in geo_index.clusters(box.min_lat, box.min_lon, box.max_lat, box.max_lon, zoom, limit)
+    ], headers=cache_headers(etag))
 
 @router.get("/popular", response_model=List[DestinationResponse])
 async def get_popular_destinations(
+    request: Request,
     limit: int = 10,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    db: AsyncSession = Depends(get_db),
+    current_user: Optional[TokenPrincipal] = Depends(get_catalog_reader)
 ):
     """Get popular destinations"""
-    destinations = db.query(Destination).order_by(Destination.tourist_rating.desc()).limit(limit).all()
+    fieldset = parse_fields(fields, DestinationResponse, DESTINATION_LIST_FIELDS)
+    ranking = popularity_index.ranking
+    if ranking is None:
+        # Only before the first background refresh has published a ranking
+        ranking = await popularity_index.refresh(db)
     
-    return [
-        DestinationResponse(
-            id=dest.id,
-            name=dest.name,
-            country=dest.country,
-            city=dest.city,
-            latitude=dest.latitude,
-            longitude=dest.longitude,
-            description=dest.description,
-            best_time_to_visit=dest.best_time_to_visit,
-            average_budget_per_day=dest.average_budget_per_day,
-            safety_rating=dest.safety_rating,
-            tourist_rating=dest.tourist_rating,
-            image_url=dest.image_url,
-            weather_info=dest.weather_info or {},
-            attractions=dest.attractions or [],
-            local_cuisine=dest.local_cuisine or [],
-            created_at=dest.created_at
-        )
-        for dest in destinations
-    ]
+    etag = strong_etag("popular", ranking.digest)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    return model_response(
+        List[projection_type(DestinationResponse, fieldset)],
+        [project(DestinationResponse, dest, fieldset) for dest in ranking.destinations[:limit]],
+        headers=cache_headers(etag),
+        exclude_unset=fieldset is not None
+    )
 
 @router.get("/{destination_id}", response_model=DestinationResponse)
 async def get_destination(
+    request: Request,
     destination_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    db: AsyncSession = Depends(get_db),
+    current_user: Optional[TokenPrincipal] = Depends(get_catalog_reader)
 ):
     """Get destination details"""
-    destination = db.query(Destination).filter(Destination.id == destination_id).first()
+    fieldset = parse_fields(fields, DestinationResponse)
+    etag = strong_etag("catalog", await catalog_version.get(db))
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    destination = await db.scalar(
+        select(Destination).where(Destination.id == destination_id)
+        .options(*load_options(Destination, DestinationResponse, fieldset))
+    )
     
     if not destination:
         raise HTTPException(
@@ -82,21 +209,9 @@ async def get_destination(
             detail="Destination not found"
         )
     
-    return DestinationResponse(
-        id=destination.id,
-        name=destination.name,
-        country=destination.country,
-        city=destination.city,
-        latitude=destination.latitude,
-        longitude=destination.longitude,
-        description=destination.description,
-        best_time_to_visit=destination.best_time_to_visit,
-        average_budget_per_day=destination.average_budget_per_day,
-        safety_rating=destination.safety_rating,
-        tourist_rating=destination.tourist_rating,
-        image_url=destination.image_url,
-        weather_info=destination.weather_info or {},
-        attractions=destination.attractions or [],
-        local_cuisine=destination.local_cuisine or [],
-        created_at=destination.created_at
+    return model_response(
+        projection_type(DestinationResponse, fieldset),
+        project(DestinationResponse, destination, fieldset),
+        headers=cache_headers(etag),
+        exclude_unset=fieldset is not None
     )
\ No newline at end of file
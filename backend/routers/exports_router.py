@@ -0,0 +1,25 @@
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
+from typing import Union
+from datetime import datetime
+
+from ..auth import get_current_principal, TokenPrincipal
+from ..exports import stream_export, EXPORT_MODELS, MEDIA_TYPES
+from ..models import User
+from ..schemas import ExportKindEnum, ExportFormatEnum
+
+router = APIRouter()
+
+@router.get("/{kind}")
+async def export_my_rows(
+    kind: ExportKindEnum,
+    export_format: ExportFormatEnum = Query(ExportFormatEnum.NDJSON, alias="format"),
+    current_user: Union[User, TokenPrincipal] = Depends(get_current_principal)
+):
+    """Download the current user's trips, bookings or AI plans as NDJSON or CSV"""
+    filename = f"{kind.value}-{datetime.utcnow():%Y%m%d}.{export_format.value}"
+    return StreamingResponse(
+        stream_export(EXPORT_MODELS[kind.value], export_format.value, current_user.id),
+        media_type=MEDIA_TYPES[export_format.value],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
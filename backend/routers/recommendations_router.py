@@ -1,7 +1,7 @@
 from fastapi import APIRouter, Depends
-from typing import List
+from typing import List, Union
 
-from ..auth import get_current_user
+from ..auth import get_current_principal, TokenPrincipal
 from ..models import User
 from ..schemas import RecommendationResponse
 
@@ -11,7 +11,7 @@ router = APIRouter()
 async def get_recommendations(
     destination_id: int = None,
     category: str = None,
-    current_user: User = Depends(get_current_user)
+    current_user: Union[User, TokenPrincipal] = Depends(get_current_principal)
 ):
     """Get travel recommendations"""
     # Mock recommendations - in production, this would query the database
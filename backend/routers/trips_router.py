@@ -1,26 +1,37 @@
-from fastapi import APIRouter, HTTPException, Depends, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, HTTPException, Depends, Query, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 from datetime import datetime, timedelta
 import random
 
-from ..database import get_db
+from ..database import get_db, run_write
 from ..auth import get_current_user
 from ..models import User, Trip, Destination, TripStatus
-from ..schemas import TripCreate, TripResponse, DestinationResponse
+from ..pagination import paginate, next_page, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from ..fieldsets import parse_fields, load_options
+from ..schemas import TripCreate, TripResponse, Page
+from ..serializers import to_trip, project, projection_type, model_response
 
 router = APIRouter()
 
+# What a trip list renders; ``fields=*`` returns full trips
+TRIP_LIST_FIELDS = (
+    "id,title,start_date,end_date,status,travelers_count,total_budget,created_at,"
+    "destination.id,destination.name,destination.city,destination.country,destination.image_url"
+)
+FIELDS_DESCRIPTION = "Comma-separated fields to return, e.g. title,start_date,destination.name; * for all"
+
 @router.post("/", response_model=TripResponse)
 async def create_trip(
     trip_data: TripCreate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Create a new trip"""
     
     # Check if destination exists
-    destination = db.query(Destination).filter(Destination.id == trip_data.destination_id).first()
+    destination = await db.scalar(select(Destination).where(Destination.id == trip_data.destination_id))
     if not destination:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -46,122 +57,55 @@ async def create_trip(
         ai_generated=False
     )
     
-    db.add(trip)
-    db.commit()
-    db.refresh(trip)
+    async def insert_trip(session):
+        session.add(trip)
+        await session.flush()
+        await session.refresh(trip)
     
-    # Load destination for response
-    destination_response = DestinationResponse(
-        id=destination.id,
-        name=destination.name,
-        country=destination.country,
-        city=destination.city,
-        latitude=destination.latitude,
-        longitude=destination.longitude,
-        description=destination.description,
-        best_time_to_visit=destination.best_time_to_visit,
-        average_budget_per_day=destination.average_budget_per_day,
-        safety_rating=destination.safety_rating,
-        tourist_rating=destination.tourist_rating,
-        image_url=destination.image_url,
-        weather_info=destination.weather_info or {},
-        attractions=destination.attractions or [],
-        local_cuisine=destination.local_cuisine or [],
-        created_at=destination.created_at
-    )
+    await run_write(insert_trip, db)
     
-    return TripResponse(
-        id=trip.id,
-        user_id=trip.user_id,
-        destination_id=trip.destination_id,
-        title=trip.title,
-        description=trip.description,
-        start_date=trip.start_date,
-        end_date=trip.end_date,
-        total_budget=trip.total_budget,
-        spent_amount=trip.spent_amount,
-        travelers_count=trip.travelers_count,
-        trip_type=trip.trip_type,
-        accommodation_preference=trip.accommodation_preference,
-        interests=trip.interests,
-        pace=trip.pace,
-        special_requests=trip.special_requests,
-        status=trip.status,
-        itinerary=trip.itinerary,
-        ai_generated=trip.ai_generated,
-        created_at=trip.created_at,
-        destination=destination_response
-    )
+    return model_response(TripResponse, to_trip(trip, destination))
 
-@router.get("/", response_model=List[TripResponse])
+@router.get("/", response_model=Page[TripResponse])
 async def get_my_trips(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    """Get all trips for the current user"""
-    trips = db.query(Trip).filter(Trip.user_id == current_user.id).all()
-    
-    trip_responses = []
-    for trip in trips:
-        destination = db.query(Destination).filter(Destination.id == trip.destination_id).first()
-        destination_response = None
-        
-        if destination:
-            destination_response = DestinationResponse(
-                id=destination.id,
-                name=destination.name,
-                country=destination.country,
-                city=destination.city,
-                latitude=destination.latitude,
-                longitude=destination.longitude,
-                description=destination.description,
-                best_time_to_visit=destination.best_time_to_visit,
-                average_budget_per_day=destination.average_budget_per_day,
-                safety_rating=destination.safety_rating,
-                tourist_rating=destination.tourist_rating,
-                image_url=destination.image_url,
-                weather_info=destination.weather_info or {},
-                attractions=destination.attractions or [],
-                local_cuisine=destination.local_cuisine or [],
-                created_at=destination.created_at
-            )
-        
-        trip_responses.append(TripResponse(
-            id=trip.id,
-            user_id=trip.user_id,
-            destination_id=trip.destination_id,
-            title=trip.title,
-            description=trip.description,
-            start_date=trip.start_date,
-            end_date=trip.end_date,
-            total_budget=trip.total_budget,
-            spent_amount=trip.spent_amount,
-            travelers_count=trip.travelers_count,
-            trip_type=trip.trip_type,
-            accommodation_preference=trip.accommodation_preference,
-            interests=trip.interests,
-            pace=trip.pace,
-            special_requests=trip.special_requests,
-            status=trip.status,
-            itinerary=trip.itinerary,
-            ai_generated=trip.ai_generated,
-            created_at=trip.created_at,
-            destination=destination_response
-        ))
+    """Get the current user's trips, newest first"""
+    fieldset = parse_fields(fields, TripResponse, TRIP_LIST_FIELDS)
+    # Only the selected columns are read; destinations come from one extra
+    # IN query rather than one per trip
+    stmt = paginate(
+        select(Trip).where(Trip.user_id == current_user.id).options(
+            *load_options(Trip, TripResponse, fieldset, required=["created_at"])
+        ),
+        Trip, limit, cursor
+    )
+    trips, next_cursor = next_page((await db.scalars(stmt)).all(), limit)
     
-    return trip_responses
+    page_type = Page[projection_type(TripResponse, fieldset)]
+    return model_response(
+        page_type,
+        page_type(items=[project(TripResponse, trip, fieldset) for trip in trips], next_cursor=next_cursor),
+        exclude_unset=fieldset is not None
+    )
 
 @router.get("/{trip_id}", response_model=TripResponse)
 async def get_trip(
     trip_id: int,
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Get a specific trip"""
-    trip = db.query(Trip).filter(
+    fieldset = parse_fields(fields, TripResponse)
+    trip = await db.scalar(select(Trip).where(
         Trip.id == trip_id,
         Trip.user_id == current_user.id
-    ).first()
+    ).options(*load_options(Trip, TripResponse, fieldset)))
     
     if not trip:
         raise HTTPException(
@@ -169,63 +113,23 @@ async def get_trip(
             detail="Trip not found"
         )
     
-    destination = db.query(Destination).filter(Destination.id == trip.destination_id).first()
-    destination_response = None
-    
-    if destination:
-        destination_response = DestinationResponse(
-            id=destination.id,
-            name=destination.name,
-            country=destination.country,
-            city=destination.city,
-            latitude=destination.latitude,
-            longitude=destination.longitude,
-            description=destination.description,
-            best_time_to_visit=destination.best_time_to_visit,
-            average_budget_per_day=destination.average_budget_per_day,
-            safety_rating=destination.safety_rating,
-            tourist_rating=destination.tourist_rating,
-            image_url=destination.image_url,
-            weather_info=destination.weather_info or {},
-            attractions=destination.attractions or [],
-            local_cuisine=destination.local_cuisine or [],
-            created_at=destination.created_at
-        )
-    
-    return TripResponse(
-        id=trip.id,
-        user_id=trip.user_id,
-        destination_id=trip.destination_id,
-        title=trip.title,
-        description=trip.description,
-        start_date=trip.start_date,
-        end_date=trip.end_date,
-        total_budget=trip.total_budget,
-        spent_amount=trip.spent_amount,
-        travelers_count=trip.travelers_count,
-        trip_type=trip.trip_type,
-        accommodation_preference=trip.accommodation_preference,
-        interests=trip.interests,
-        pace=trip.pace,
-        special_requests=trip.special_requests,
-        status=trip.status,
-        itinerary=trip.itinerary,
-        ai_generated=trip.ai_generated,
-        created_at=trip.created_at,
-        destination=destination_response
+    return model_response(
+        projection_type(TripResponse, fieldset),
+        project(TripResponse, trip, fieldset),
+        exclude_unset=fieldset is not None
     )
 
 @router.delete("/{trip_id}")
 async def delete_trip(
     trip_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Delete a trip"""
-    trip = db.query(Trip).filter(
+    trip = await db.scalar(select(Trip).where(
         Trip.id == trip_id,
         Trip.user_id == current_user.id
-    ).first()
+    ))
     
     if not trip:
         raise HTTPException(
@@ -233,7 +137,9 @@ async def delete_trip(
             detail="Trip not found"
         )
     
-    db.delete(trip)
-    db.commit()
+    async def delete_trip_row(session):
+        await session.delete(await session.get(Trip, trip.id))
+    
+    await run_write(delete_trip_row, db)
     
     return {"message": "Trip deleted successfully"}
\ No newline at end of file
@@ -1,8 +1,8 @@
 from fastapi import APIRouter, Depends
-from typing import List
+from typing import List, Union
 import random
 
-from ..auth import get_current_user
+from ..auth import get_current_principal, TokenPrincipal
 from ..models import User
 from ..schemas import WeatherResponse
 
@@ -11,7 +11,7 @@ router = APIRouter()
 @router.get("/current", response_model=WeatherResponse)
 async def get_current_weather(
     city: str,
-    current_user: User = Depends(get_current_user)
+    current_user: Union[User, TokenPrincipal] = Depends(get_current_principal)
 ):
     """Get current weather for a city"""
     # Mock weather data - in production, integrate with OpenWeatherMap API
@@ -36,7 +36,7 @@ async def get_current_weather(
 async def get_weather_forecast(
     city: str,
     days: int = 5,
-    current_user: User = Depends(get_current_user)
+    current_user: Union[User, TokenPrincipal] = Depends(get_current_principal)
 ):
     """Get weather forecast for a city"""
     forecast = []
@@ -1,5 +1,5 @@
-from pydantic import BaseModel, EmailStr, Field, validator
-from typing import List, Optional, Dict, Any
+from pydantic import BaseModel, EmailStr, Field, AliasChoices, field_validator, validator
+from typing import List, Optional, Dict, Any, Generic, TypeVar
 from datetime import datetime, date
 from enum import Enum
 
@@ -25,11 +25,32 @@ class BookingTypeEnum(str, Enum):
     CAR_RENTAL = "car_rental"
     ACTIVITY = "activity"
 
+class ExportKindEnum(str, Enum):
+    TRIPS = "trips"
+    BOOKINGS = "bookings"
+    AI_PLANS = "ai-plans"
+
+class ExportFormatEnum(str, Enum):
+    NDJSON = "ndjson"
+    CSV = "csv"
+
+class AIJobStatusEnum(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
 # Base schemas
 class BaseSchema(BaseModel):
     class Config:
         from_attributes = True
 
+ItemT = TypeVar("ItemT")
+
+class Page(BaseSchema, Generic[ItemT]):
+    items: List[ItemT]
+    next_cursor: Optional[str] = None
+
 # User schemas
 class UserBase(BaseSchema):
     username: str = Field(..., min_length=3, max_length=50)
@@ -71,6 +92,7 @@ class AITripPlanRequest(BaseSchema):
     travelers: int = Field(..., ge=1, le=20)
     budget: str = Field(..., description="budget, moderate, luxury")
     interests: List[str] = []
+    seed: Optional[int] = Field(None, ge=0, description="Reuse a plan's seed to reproduce it")
 
 class ItineraryActivity(BaseSchema):
     time: str
@@ -103,6 +125,75 @@ class AITripPlanResponse(BaseSchema):
     estimated_cost: EstimatedCost
     travel_tips: List[str] = []
     best_time_to_visit: Optional[str] = None
+    seed: Optional[int] = None
+
+class AITripPlanVariation(BaseSchema):
+    """Changes to the base request; fields left out or null are inherited"""
+    destination: Optional[str] = Field(None, min_length=1, max_length=200)
+    duration: Optional[int] = Field(None, ge=1, le=30)
+    travelers: Optional[int] = Field(None, ge=1, le=20)
+    budget: Optional[str] = None
+    interests: Optional[List[str]] = None
+    seed: Optional[int] = Field(None, ge=0)
+
+class AITripPlanVariantsRequest(BaseSchema):
+    base: AITripPlanRequest
+    variations: List[AITripPlanVariation] = Field(..., min_length=1)
+
+class AITripPlanVariantsResponse(BaseSchema):
+    # One plan per variation, in request order
+    plans: List[AITripPlanResponse]
+
+class AIJobResponse(BaseSchema):
+    id: str
+    status: AIJobStatusEnum
+    plan_id: Optional[str] = None
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    # The generated plan, once the job has succeeded
+    result: Optional[AITripPlanResponse] = None
+
+class TextGenerationRequest(BaseSchema):
+    prompt: str = Field(..., min_length=1, max_length=10000)
+    max_new_tokens: int = Field(500, ge=1, le=1000)
+
+class TextGenerationResponse(BaseSchema):
+    text: str
+    # Tokens generated for this prompt
+    tokens: int
+    model: str
+    backend: str
+
+class AITextPlanResponse(BaseSchema):
+    destination: str
+    duration: int
+    plan: str
+    # As reported by the inference worker
+    model: str
+    backend: str
+
+class PriceGridResponse(BaseSchema):
+    budgets: List[str]
+    durations: List[int]
+    travelers: List[int]
+    # Estimated totals in USD, indexed [budget][duration][travelers]
+    totals: List[List[List[float]]]
+    # Per-component estimates with the same layout, when requested
+    components: Optional[Dict[str, List[List[List[float]]]]] = None
+
+class AIPlanSummary(BaseSchema):
+    id: int
+    # For GET /ai/plans/{plan_id}; None for plans stored before plans had ids
+    plan_id: Optional[str] = None
+    destination: str
+    duration: int
+    travelers: int
+    budget: Optional[str] = None
+    interests: Optional[List[str]] = None
+    estimated_cost: Optional[Dict[str, Any]] = None
+    created_at: datetime
 
 # Destination schemas
 class DestinationBase(BaseSchema):
@@ -124,6 +215,39 @@ class DestinationResponse(DestinationBase):
     attractions: List[Dict[str, Any]] = []
     local_cuisine: List[Dict[str, Any]] = []
     created_at: datetime
+    
+    # NULL JSON columns read from the ORM become empty containers
+    @field_validator("weather_info", mode="before")
+    @classmethod
+    def _empty_dict(cls, value):
+        return {} if value is None else value
+    
+    @field_validator("attractions", "local_cuisine", mode="before")
+    @classmethod
+    def _empty_list(cls, value):
+        return [] if value is None else value
+
+# Geo schemas
+class NearbyDestinationResponse(BaseSchema):
+    id: int
+    name: str
+    country: str
+    city: Optional[str] = None
+    latitude: float
+    longitude: float
+    distance_km: float
+
+class DestinationMarker(BaseSchema):
+    id: int
+    name: str
+    latitude: float
+    longitude: float
+
+class MarkerCluster(BaseSchema):
+    latitude: float
+    longitude: float
+    count: int
+    destination_id: Optional[int] = None
 
 # Trip schemas
 class TripBase(BaseSchema):
@@ -153,6 +277,49 @@ class TripResponse(TripBase):
     ai_generated: bool
     created_at: datetime
     destination: Optional[DestinationResponse] = None
+    
+    @field_validator("interests", mode="before")
+    @classmethod
+    def _empty_list(cls, value):
+        return [] if value is None else value
+    
+    @field_validator("itinerary", mode="before")
+    @classmethod
+    def _empty_dict(cls, value):
+        return {} if value is None else value
+
+# Booking schemas
+class BookingSummary(BaseSchema):
+    id: int
+    booking_reference: str
+    booking_type: BookingTypeEnum
+    service_name: Optional[str] = None
+    total_amount: float
+    currency: Optional[str] = None
+    status: Optional[BookingStatusEnum] = None
+    created_at: datetime
+
+class BookingCreate(BaseSchema):
+    booking_type: BookingTypeEnum
+    service_name: str = Field(..., min_length=1, max_length=200)
+    amount: float = Field(..., gt=0)
+    currency: str = Field("USD", min_length=3, max_length=10)
+    trip_id: Optional[int] = None
+
+class BulkBookingRequest(BaseSchema):
+    # Items are validated one by one so a bad item fails alone
+    items: List[Any] = Field(..., min_length=1)
+
+class BulkBookingResult(BaseSchema):
+    index: int
+    status: str  # confirmed, invalid or failed
+    booking_reference: Optional[str] = None
+    errors: List[str] = []
+
+class BulkBookingResponse(BaseSchema):
+    created: int
+    failed: int
+    results: List[BulkBookingResult]
 
 # Weather schemas
 class WeatherResponse(BaseSchema):
@@ -188,5 +355,7 @@ class DestinationSearchResponse(BaseSchema):
     city: Optional[str] = None
     description: Optional[str] = None
     image_url: Optional[str] = None
-    average_budget: Optional[float] = None
+    average_budget: Optional[float] = Field(
+        None, validation_alias=AliasChoices("average_budget", "average_budget_per_day")
+    )
     best_time_to_visit: Optional[str] = None
\ No newline at end of file
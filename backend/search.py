@@ -0,0 +1,201 @@
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Dict, List
+import difflib
+import os
+import re
+import time
+from dotenv import load_dotenv
+
+from .database import IS_SQLITE
+
+load_dotenv()
+
+# Word characters only: everything else is dropped before it reaches the
+# full-text query syntax
+TERM_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+# Terms shorter than this are never typo-corrected
+MIN_FUZZY_TERM_LENGTH = 4
+FUZZY_CUTOFF = 0.75
+FUZZY_MATCHES_PER_TERM = 3
+
+# How long typo correction reuses the index vocabulary before re-reading it
+SEARCH_VOCABULARY_TTL_SECONDS = float(os.getenv("SEARCH_VOCABULARY_TTL_SECONDS", 300))
+
+# Attraction and dish names flattened to plain text for the index. JSON
+# elements are usually {"name": ..., "type": ...} objects but bare strings
+# are accepted too.
+def _json_names_sql(column: str) -> str:
+    return (
+        f"(SELECT group_concat(CASE WHEN type = 'object' THEN json_extract(value, '$.name') "
+        f"ELSE value END, ' ') FROM json_each({column}))"
+    )
+
+def _extras_sql(alias: str) -> str:
+    return (
+        f"coalesce({_json_names_sql(f'{alias}.attractions')}, '') || ' ' || "
+        f"coalesce({_json_names_sql(f'{alias}.local_cuisine')}, '')"
+    )
+
+FTS_COLUMNS = "name, city, country, description, extras"
+
+def _fts_values_sql(alias: str) -> str:
+    return (
+        f"{alias}.name, {alias}.city, {alias}.country, {alias}.description, {_extras_sql(alias)}"
+    )
+
+# SQLite: an FTS5 table keyed by destination id, kept in sync by triggers so
+# every write path (ORM, bulk statements, the seed) updates it
+SQLITE_INDEX_DDL = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS destinations_fts USING fts5(
+        {FTS_COLUMNS}, tokenize = 'unicode61 remove_diacritics 2'
+    )""",
+    "CREATE VIRTUAL TABLE IF NOT EXISTS destinations_fts_vocab USING fts5vocab(destinations_fts, 'row')",
+    f"""CREATE TRIGGER IF NOT EXISTS destinations_fts_insert AFTER INSERT ON destinations BEGIN
+        INSERT INTO destinations_fts(rowid, {FTS_COLUMNS}) VALUES (NEW.id, {_fts_values_sql('NEW')});
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS destinations_fts_delete AFTER DELETE ON destinations BEGIN
+        DELETE FROM destinations_fts WHERE rowid = OLD.id;
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS destinations_fts_update AFTER UPDATE ON destinations BEGIN
+        DELETE FROM destinations_fts WHERE rowid = OLD.id;
+        INSERT INTO destinations_fts(rowid, {FTS_COLUMNS}) VALUES (NEW.id, {_fts_values_sql('NEW')});
+    END""",
+    # Backfill rows written before the index existed
+    f"""INSERT INTO destinations_fts(rowid, {FTS_COLUMNS})
+        SELECT d.id, {_fts_values_sql('d')} FROM destinations d
+        WHERE d.id NOT IN (SELECT rowid FROM destinations_fts)""",
+]
+
+# PostgreSQL: a weighted tsvector generated column with a GIN index, plus
+# trigram indexes for typo-tolerant matching on the short text columns
+POSTGRES_INDEX_DDL = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    """ALTER TABLE destinations ADD COLUMN IF NOT EXISTS search_vector tsvector
+        GENERATED ALWAYS AS (
+            setweight(to_tsvector('simple', coalesce(name, '')), 'A') ||
+            setweight(to_tsvector('simple', coalesce(city, '') || ' ' || coalesce(country, '')), 'B') ||
+            setweight(jsonb_to_tsvector('simple', coalesce(attractions::jsonb, '[]') || coalesce(local_cuisine::jsonb, '[]'), '["string"]'), 'C') ||
+            setweight(to_tsvector('simple', coalesce(description, '')), 'D')
+        ) STORED""",
+    "CREATE INDEX IF NOT EXISTS ix_destinations_search ON destinations USING GIN (search_vector)",
+    "CREATE INDEX IF NOT EXISTS ix_destinations_name_trgm ON destinations USING GIN (name gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS ix_destinations_city_trgm ON destinations USING GIN (city gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS ix_destinations_country_trgm ON destinations USING GIN (country gin_trgm_ops)",
+]
+
+def create_search_index(connection):
+    """Create the destination full-text index and backfill it (idempotent)"""
+    for statement in SQLITE_INDEX_DDL if IS_SQLITE else POSTGRES_INDEX_DDL:
+        connection.exec_driver_sql(statement)
+
+def search_terms(query: str) -> List[str]:
+    """Split a free-text query into lowercase index terms"""
+    return [term.lower() for term in TERM_PATTERN.findall(query)]
+
+def _fts5_term(term: str, prefix: bool = False) -> str:
+    return f'"{term}"*' if prefix else f'"{term}"'
+
+def build_fts5_query(terms: List[str], corrections: Dict[str, List[str]] = None) -> str:
+    """All terms must match; the last one as a prefix so results follow typing"""
+    corrections = corrections or {}
+    groups = []
+    for position, term in enumerate(terms):
+        options = [_fts5_term(term, prefix=position == len(terms) - 1)]
+        options += [_fts5_term(correction) for correction in corrections.get(term, [])]
+        groups.append(options[0] if len(options) == 1 else f"({' OR '.join(options)})")
+    return " AND ".join(groups)
+
+async def _sqlite_ranked_ids(db: AsyncSession, match: str, limit: int) -> List[int]:
+    # bm25 weights per column: name, city, country, description, extras
+    result = await db.execute(
+        text(
+            "SELECT rowid FROM destinations_fts WHERE destinations_fts MATCH :match "
+            "ORDER BY bm25(destinations_fts, 10.0, 5.0, 5.0, 1.0, 2.0) LIMIT :limit"
+        ),
+        {"match": match, "limit": limit}
+    )
+    return list(result.scalars())
+
+# first letter -> (expires_at, indexed terms starting with it)
+_vocabulary = {}
+
+async def _vocabulary_for(db: AsyncSession, letter: str) -> List[str]:
+    """Indexed terms sharing a first letter, cached for a while.
+
+    Reading the fts5vocab table walks every matching doclist, far too slow to
+    repeat per query; slightly stale suggestions are fine.
+    """
+    entry = _vocabulary.get(letter)
+    if entry is not None and entry[0] > time.monotonic():
+        return entry[1]
+    result = await db.execute(
+        text("SELECT term FROM destinations_fts_vocab WHERE term >= :low AND term < :high"),
+        {"low": letter, "high": chr(ord(letter) + 1)}
+    )
+    terms = list(result.scalars())
+    _vocabulary[letter] = (time.monotonic() + SEARCH_VOCABULARY_TTL_SECONDS, terms)
+    return terms
+
+async def _sqlite_corrections(db: AsyncSession, terms: List[str]) -> Dict[str, List[str]]:
+    """Close spellings from the index vocabulary for terms it does not contain"""
+    corrections = {}
+    for term in terms:
+        if len(term) < MIN_FUZZY_TERM_LENGTH:
+            continue
+        # Candidates share the first letter and roughly the length
+        candidates = [
+            candidate for candidate in await _vocabulary_for(db, term[0])
+            if abs(len(candidate) - len(term)) <= 2
+        ]
+        if term in candidates:
+            continue
+        matches = difflib.get_close_matches(term, candidates, n=FUZZY_MATCHES_PER_TERM, cutoff=FUZZY_CUTOFF)
+        if matches:
+            corrections[term] = matches
+    return corrections
+
+async def _sqlite_search(db: AsyncSession, terms: List[str], limit: int) -> List[int]:
+    ids = await _sqlite_ranked_ids(db, build_fts5_query(terms), limit)
+    if not ids:
+        # Nothing matched as typed: retry with close spellings of each term
+        corrections = await _sqlite_corrections(db, terms)
+        if corrections:
+            ids = await _sqlite_ranked_ids(db, build_fts5_query(terms, corrections), limit)
+    return ids
+
+async def _postgres_search(db: AsyncSession, terms: List[str], limit: int) -> List[int]:
+    tsquery = " & ".join(terms[:-1] + [f"{terms[-1]}:*"])
+    result = await db.execute(
+        text(
+            "SELECT id FROM destinations, to_tsquery('simple', :tsquery) AS query "
+            "WHERE search_vector @@ query "
+            "ORDER BY ts_rank(search_vector, query) DESC, id LIMIT :limit"
+        ),
+        {"tsquery": tsquery, "limit": limit}
+    )
+    ids = list(result.scalars())
+    if not ids:
+        # Nothing matched as typed: fall back to trigram word similarity
+        # against the short columns
+        result = await db.execute(
+            text(
+                "SELECT id FROM destinations "
+                "WHERE :query <% name OR :query <% city OR :query <% country "
+                "ORDER BY greatest(word_similarity(:query, name), word_similarity(:query, city), "
+                "word_similarity(:query, country)) DESC, id LIMIT :limit"
+            ),
+            {"query": " ".join(terms), "limit": limit}
+        )
+        ids = list(result.scalars())
+    return ids
+
+async def search_destination_ids(db: AsyncSession, query: str, limit: int) -> List[int]:
+    """Destination ids matching a free-text query, best match first"""
+    terms = search_terms(query)
+    if not terms or limit <= 0:
+        return []
+    if IS_SQLITE:
+        return await _sqlite_search(db, terms, limit)
+    return await _postgres_search(db, terms, limit)
@@ -0,0 +1,86 @@
+from fastapi import Response
+from pydantic import BaseModel, TypeAdapter, create_model
+from sqlalchemy.orm.attributes import set_committed_value
+from functools import lru_cache
+from typing import Any, Dict, Optional, Union, get_args
+
+from .models import Destination, Trip
+from .schemas import DestinationResponse, TripResponse
+
+@lru_cache(maxsize=None)
+def get_adapter(response_type: Any) -> TypeAdapter:
+    """Compiled validator/serializer for a response type, built once per type"""
+    return TypeAdapter(response_type)
+
+def dump_json(response_type: Any, value, exclude_unset: bool = False) -> bytes:
+    return get_adapter(response_type).dump_json(value, exclude_unset=exclude_unset)
+
+def to_destination(destination: Destination) -> DestinationResponse:
+    return DestinationResponse.model_validate(destination)
+
+def to_trip(trip: Trip, destination: Optional[Destination] = None) -> TripResponse:
+    """Build a trip response; pass ``destination`` when the relationship is not loaded"""
+    if destination is not None:
+        # Attach without marking the trip dirty or cascading it into a session
+        set_committed_value(trip, "destination", destination)
+    return TripResponse.model_validate(trip)
+
+def nested_model(response_type, name: str):
+    """The response model a field holds (``Optional[X]`` included), or None"""
+    annotation = response_type.model_fields[name].annotation
+    for candidate in (annotation, *get_args(annotation)):
+        if isinstance(candidate, type) and issubclass(candidate, BaseModel):
+            return candidate
+    return None
+
+@lru_cache(maxsize=None)
+def partial_model(response_type):
+    """``response_type`` with every field optional, for sparse fieldsets.
+
+    Only the fields a projection sets are validated and, dumped with
+    ``exclude_unset``, serialized; the parent's field validators still apply.
+    """
+    fields = {}
+    for name, field in response_type.model_fields.items():
+        nested = nested_model(response_type, name)
+        annotation = partial_model(nested) if nested else field.annotation
+        fields[name] = (Optional[annotation], None)
+    return create_model(f"Partial{response_type.__name__}", __base__=response_type, **fields)
+
+def projection_type(response_type, fieldset: Optional[Dict[str, Union[bool, dict]]]):
+    return response_type if fieldset is None else partial_model(response_type)
+
+def project(response_type, obj, fieldset: Optional[Dict[str, Union[bool, dict]]]):
+    """Validate only the fields in ``fieldset`` (all of them when None).
+
+    Attributes outside the fieldset are never touched, so columns left
+    unloaded by ``load_only`` are not lazily fetched.
+    """
+    if fieldset is None:
+        return response_type.model_validate(obj)
+    data = {}
+    for name, selection in fieldset.items():
+        value = getattr(obj, name)
+        if selection is not True and value is not None:
+            value = project(nested_model(response_type, name), value, selection)
+        data[name] = value
+    return partial_model(response_type).model_validate(data)
+
+def model_response(
+    response_type: Any,
+    value,
+    status_code: int = 200,
+    headers: dict = None,
+    exclude_unset: bool = False
+) -> Response:
+    """JSON response from already-validated models, encoded by pydantic-core.
+
+    Returning a Response skips FastAPI's second validation and encoding pass
+    over ``response_model``; routes keep it for the OpenAPI schema.
+    """
+    return Response(
+        content=dump_json(response_type, value, exclude_unset),
+        status_code=status_code,
+        headers=headers,
+        media_type="application/json"
+    )
@@ -0,0 +1,13 @@
+from typing import Iterable
+
+# Recent timings kept for the quantiles reported in metrics
+TIMING_SAMPLES = 1000
+
+def quantiles_ms(samples: Iterable[float]) -> dict:
+    """p50, p95 and max of timings in seconds, in milliseconds"""
+    ordered = sorted(samples)
+    if not ordered:
+        return {"p50": None, "p95": None, "max": None}
+    def at(fraction):
+        return round(ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] * 1000, 3)
+    return {"p50": at(0.5), "p95": at(0.95), "max": round(ordered[-1] * 1000, 3)}
@@ -0,0 +1,118 @@
+"""AI plan job queue: submit latency, drain time and queue metrics vs inline ``generate-trip``.
+
+Runs the app in-process against a throwaway SQLite database:
+
+    python -m benchmarks.ai_jobs --jobs 500 --workers 2 --executor thread
+
+Every request names a new destination, so each plan is generated rather
+than served from the plan cache. The inline pass calls ``generate-trip``
+for the same number of plans first. ``--generation-ms`` adds a blocking
+delay to every plan generation on both paths, standing in for a real model.
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+GENERATION_DELAY_ENV = "BENCHMARK_GENERATION_MS"
+
+def slow_generate_plan_body(request_data: dict, plan_id: str) -> bytes:
+    """The job executor's generation step plus a model-like delay"""
+    from backend.planner import generate_plan
+    from backend.schemas import AITripPlanRequest, AITripPlanResponse
+    from backend.serializers import dump_json
+    time.sleep(float(os.environ.get(GENERATION_DELAY_ENV, 0)) / 1000)
+    return dump_json(AITripPlanResponse, generate_plan(AITripPlanRequest.model_validate(request_data), plan_id))
+
+def main(args):
+    os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/ai_jobs.db"
+    os.environ["AI_JOB_WORKERS"] = str(args.workers)
+    os.environ["AI_JOB_EXECUTOR"] = args.executor
+    # Read by spawned job processes too
+    os.environ[GENERATION_DELAY_ENV] = str(args.generation_ms)
+
+    from fastapi.testclient import TestClient
+
+    from backend import ai_jobs
+    from backend.main import app
+    from backend.routers import ai_router
+    from .common import percentile, report
+
+    ai_job_queue = ai_jobs.ai_job_queue
+    if args.generation_ms:
+        generate_plan = ai_router.generate_plan
+
+        def slow_generate_plan(request, plan_id):
+            time.sleep(args.generation_ms / 1000)
+            return generate_plan(request, plan_id)
+
+        ai_router.generate_plan = slow_generate_plan
+        ai_jobs.generate_plan_body = slow_generate_plan_body
+
+    def plan_request(label, number):
+        return {
+            "destination": f"{label} {number}", "duration": args.days, "travelers": 2,
+            "budget": "moderate", "interests": ["culture", "food", "nature"]
+        }
+
+    with TestClient(app) as client:
+        client.post("/api/v1/auth/register", json={
+            "username": "jobs", "email": "jobs@example.com",
+            "full_name": "Jobs", "password": "benchmark-password"
+        })
+        token = client.post("/api/v1/auth/login", json={
+            "username": "jobs", "password": "benchmark-password"
+        }).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+
+        inline = []
+        start = time.perf_counter()
+        for number in range(args.jobs):
+            request_start = time.perf_counter()
+            client.post("/api/v1/ai/generate-trip", headers=headers, json=plan_request("Inline", number)).raise_for_status()
+            inline.append((time.perf_counter() - request_start) * 1000)
+        inline_elapsed = time.perf_counter() - start
+        report(f"inline generate-trip x {args.jobs:,} ({args.days}-day plans, +{args.generation_ms} ms generation)", {
+            "median latency (ms)": statistics.median(inline),
+            "p95 latency (ms)": percentile(inline, 95),
+            "plans/s": f"{args.jobs / inline_elapsed:,.0f}",
+        })
+
+        submits = []
+        job_ids = []
+        start = time.perf_counter()
+        for number in range(args.jobs):
+            request_start = time.perf_counter()
+            response = client.post("/api/v1/ai/jobs", headers=headers, json=plan_request("Queued", number))
+            submits.append((time.perf_counter() - request_start) * 1000)
+            response.raise_for_status()
+            job_ids.append(response.json()["id"])
+        submitted = time.perf_counter() - start
+
+        async def drained():
+            await ai_job_queue._queue.join()
+        client.portal.call(drained)
+        elapsed = time.perf_counter() - start
+
+        statuses = [client.get(f"/api/v1/ai/jobs/{job_id}", headers=headers).json()["status"] for job_id in job_ids]
+        metrics = client.get("/api/v1/ai/jobs/metrics", headers=headers).json()
+        report(f"POST /ai/jobs x {args.jobs:,}, {args.workers} {args.executor} workers", {
+            "median submit latency (ms)": statistics.median(submits),
+            "p95 submit latency (ms)": percentile(submits, 95),
+            "all submitted after (s)": submitted,
+            "all finished after (s)": elapsed,
+            "plans/s": f"{args.jobs / elapsed:,.0f}",
+            "succeeded": statuses.count("succeeded"),
+            "queue wait p50 / p95 (ms)": f"{metrics['queue_wait_ms']['p50']} / {metrics['queue_wait_ms']['p95']}",
+            "run time p50 / p95 (ms)": f"{metrics['run_ms']['p50']} / {metrics['run_ms']['p95']}",
+        })
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--jobs", type=int, default=500)
+    parser.add_argument("--days", type=int, default=14)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--executor", choices=["thread", "process"], default="thread")
+    parser.add_argument("--generation-ms", type=float, default=0)
+    main(parser.parse_args())
@@ -0,0 +1,140 @@
+"""Hit rate and latency of ``POST /api/v1/ai/generate-trip`` on a replayed request log.
+
+Runs the app in-process against a throwaway SQLite database:
+
+    python -m benchmarks.ai_plan_cache --requests 5000 --memory-size 1000
+    python -m benchmarks.ai_plan_cache --log requests.jsonl
+
+``--log`` replays JSON request bodies, one per line. Without it a
+production-like log is synthesized: destinations and trip shapes follow a
+Zipf-like popularity curve, and the same trip arrives with varying case,
+whitespace and interest order, as it does from different clients.
+``--memory-size 0`` leaves only the database tier.
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import tempfile
+import time
+
+DESTINATIONS = [
+    "Paris", "Tokyo", "Bali", "New York", "London", "Rome", "Barcelona", "Lisbon",
+    "Bangkok", "Istanbul", "Prague", "Amsterdam", "Kyoto", "Sydney", "Cape Town",
+    "Reykjavik", "Marrakech", "Vienna", "Hanoi", "Buenos Aires", "Dubrovnik",
+    "Seoul", "Mexico City", "Edinburgh", "Queenstown", "Havana", "Cusco", "Oslo",
+    "Santorini", "Zanzibar",
+]
+INTERESTS = ["culture", "food", "adventure", "nature", "shopping"]
+
+def synthesize_log(count: int, rng: random.Random) -> list:
+    """Requests whose popularity falls off like a Zipf distribution"""
+    trips = [
+        {
+            "destination": destination,
+            "duration": rng.choice([3, 4, 5, 7, 7, 10, 14]),
+            "travelers": rng.choice([1, 2, 2, 2, 3, 4]),
+            "budget": rng.choice(["budget", "moderate", "moderate", "luxury"]),
+            "interests": rng.sample(INTERESTS, rng.randint(1, 3)),
+        }
+        for destination in DESTINATIONS
+        for _ in range(20)
+    ]
+    rng.shuffle(trips)
+    weights = [1 / rank for rank in range(1, len(trips) + 1)]
+    log = []
+    for trip in rng.choices(trips, weights, k=count):
+        destination = trip["destination"]
+        log.append({
+            **trip,
+            "destination": rng.choice([destination, destination.lower(), f" {destination.upper()}"]),
+            "budget": rng.choice([trip["budget"], trip["budget"].capitalize()]),
+            "interests": rng.sample(trip["interests"], len(trip["interests"])),
+        })
+    return log
+
+def main(args):
+    os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/plan_cache.db"
+    os.environ["AI_PLAN_CACHE_SIZE"] = str(args.memory_size)
+
+    from fastapi.testclient import TestClient
+
+    from backend.main import app
+    from .common import percentile, report
+
+    try:
+        from backend.plan_cache import plan_cache
+    except ImportError:
+        plan_cache = None
+
+    if args.log:
+        with open(args.log) as log_file:
+            log = [json.loads(line) for line in log_file if line.strip()][:args.requests]
+    else:
+        log = synthesize_log(args.requests, random.Random(args.seed))
+
+    with TestClient(app) as client:
+        client.post("/api/v1/auth/register", json={
+            "username": "planner", "email": "planner@example.com",
+            "full_name": "Planner", "password": "benchmark-password"
+        })
+        token = client.post("/api/v1/auth/login", json={
+            "username": "planner", "password": "benchmark-password"
+        }).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+
+        latencies = []
+        hit_latencies, miss_latencies = [], []
+        plan_ids = set()
+        start = time.perf_counter()
+        for body in log:
+            misses = plan_cache.misses if plan_cache is not None else 0
+            request_start = time.perf_counter()
+            response = client.post("/api/v1/ai/generate-trip", headers=headers, json=body)
+            latency = (time.perf_counter() - request_start) * 1000
+            latencies.append(latency)
+            if plan_cache is not None:
+                (miss_latencies if plan_cache.misses > misses else hit_latencies).append(latency)
+            response.raise_for_status()
+            plan_ids.add(response.json()["id"])
+        elapsed = time.perf_counter() - start
+
+        rows = {
+            "requests": len(log),
+            "distinct plan ids": len(plan_ids),
+            "requests/s": f"{len(log) / elapsed:,.0f}",
+            "median latency (ms)": statistics.median(latencies),
+            "p95 latency (ms)": percentile(latencies, 95),
+            "p99 latency (ms)": percentile(latencies, 99),
+        }
+        if plan_cache is not None:
+            stats = plan_cache.stats()
+            rows.update({
+                "memory hits": stats["memory_hits"],
+                "database hits": stats["db_hits"],
+                "misses": stats["misses"],
+                "hit rate": f"{stats['hit_rate']:.1%}",
+                "median hit latency (ms)": statistics.median(hit_latencies or [0]),
+                "median miss latency (ms)": statistics.median(miss_latencies or [0]),
+            })
+
+            lookup_ids = list(plan_ids)[:args.lookups]
+            lookups = []
+            for plan_id in lookup_ids:
+                request_start = time.perf_counter()
+                client.get(f"/api/v1/ai/plans/{plan_id}", headers=headers).raise_for_status()
+                lookups.append((time.perf_counter() - request_start) * 1000)
+            rows[f"GET /ai/plans/{{id}} median (ms), {len(lookups)} ids"] = statistics.median(lookups)
+
+    source = args.log or "synthesized log"
+    report(f"generate-trip replay: {source}, in-memory tier {args.memory_size:,} plans", rows)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--log", help="JSONL file of generate-trip request bodies")
+    parser.add_argument("--memory-size", type=int, default=1000)
+    parser.add_argument("--lookups", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=7)
+    main(parser.parse_args())
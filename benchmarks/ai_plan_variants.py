@@ -0,0 +1,82 @@
+"""Alternative plans: N sequential ``generate-trip`` calls vs one ``generate-variants`` call.
+
+Runs the app in-process against a throwaway SQLite database:
+
+    python -m benchmarks.ai_plan_variants --rounds 200
+
+Each round asks for the same six variations (three budgets x two interest
+mixes) of a new destination, so every plan is generated rather than served
+from the plan cache; ``--warm`` repeats the destinations instead.
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+VARIATIONS = [
+    {"budget": budget, "interests": interests}
+    for budget in ("budget", "moderate", "luxury")
+    for interests in (["culture", "food"], ["adventure", "nature"])
+]
+
+def main(args):
+    os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/variants.db"
+
+    from fastapi.testclient import TestClient
+    from sqlalchemy import event
+
+    from backend.main import app
+    from backend.database import engine, writer_engine
+    from .common import percentile, report
+
+    commits = []
+    for target in {engine, writer_engine or engine}:
+        event.listen(target.sync_engine, "commit", lambda conn: commits.append(1))
+
+    with TestClient(app) as client:
+        client.post("/api/v1/auth/register", json={
+            "username": "variants", "email": "variants@example.com",
+            "full_name": "Variants", "password": "benchmark-password"
+        })
+        token = client.post("/api/v1/auth/login", json={
+            "username": "variants", "password": "benchmark-password"
+        }).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+
+        def base(round_number, label):
+            destination = "Lisbon" if args.warm else f"{label} City {round_number}"
+            return {"destination": destination, "duration": args.days, "travelers": 2, "budget": "moderate"}
+
+        def sequential(round_number):
+            request = base(round_number, "Sequential")
+            for variation in VARIATIONS:
+                client.post("/api/v1/ai/generate-trip", headers=headers, json={**request, **variation}).raise_for_status()
+
+        def batched(round_number):
+            response = client.post("/api/v1/ai/generate-variants", headers=headers, json={
+                "base": base(round_number, "Batched"), "variations": VARIATIONS
+            })
+            response.raise_for_status()
+            assert len(response.json()["plans"]) == len(VARIATIONS)
+
+        for title, run in (("sequential generate-trip", sequential), ("one generate-variants call", batched)):
+            commits.clear()
+            latencies = []
+            for round_number in range(args.rounds):
+                start = time.perf_counter()
+                run(round_number)
+                latencies.append((time.perf_counter() - start) * 1000)
+            report(f"{title}: {len(VARIATIONS)} {args.days}-day plans x {args.rounds} rounds", {
+                "median per round (ms)": statistics.median(latencies),
+                "p95 per round (ms)": percentile(latencies, 95),
+                "plans/s": f"{len(VARIATIONS) * len(latencies) / (sum(latencies) / 1000):,.0f}",
+                "commits per round": len(commits) / args.rounds,
+            })
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=200)
+    parser.add_argument("--days", type=int, default=7)
+    parser.add_argument("--warm", action="store_true")
+    main(parser.parse_args())
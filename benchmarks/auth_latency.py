@@ -0,0 +1,55 @@
+"""Latency of authenticated requests, dominated by the auth dependency.
+
+    python -m benchmarks.auth_latency --requests 2000
+
+Set ``AUTH_CACHE_TTL_SECONDS=0`` on the server to disable the user cache.
+Catalog routes read identity from the token claims, so compare those
+against a build without the claims to see their effect.
+"""
+import argparse
+import asyncio
+import time
+
+import httpx
+
+from .common import DEFAULT_BASE_URL, register_and_login, percentile, report
+
+ENDPOINTS = [
+    ("GET /api/v1/me", "/api/v1/me", {}),
+    ("GET /api/v1/weather/current", "/api/v1/weather/current", {"city": "Paris"}),
+    ("GET /api/v1/destinations/1", "/api/v1/destinations/1", {}),
+]
+
+async def measure(client: httpx.AsyncClient, headers: dict, path: str, params: dict, count: int, concurrency: int) -> list:
+    latencies = []
+
+    async def worker(n):
+        for _ in range(n):
+            start = time.perf_counter()
+            response = await client.get(path, headers=headers, params=params)
+            response.raise_for_status()
+            latencies.append(time.perf_counter() - start)
+
+    await asyncio.gather(*(worker(count // concurrency) for _ in range(concurrency)))
+    return latencies
+
+async def main(args):
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=60) as client:
+        headers = await register_and_login(client)
+        for title, path, params in ENDPOINTS:
+            # Warm up connections and caches
+            await measure(client, headers, path, params, 50, 1)
+            latencies = await measure(client, headers, path, params, args.requests, args.concurrency)
+            report(title, {
+                "requests": len(latencies),
+                "mean (ms)": sum(latencies) / len(latencies) * 1000,
+                "p50 (ms)": percentile(latencies, 50) * 1000,
+                "p99 (ms)": percentile(latencies, 99) * 1000,
+            })
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-url", default=DEFAULT_BASE_URL)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=1)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,79 @@
+"""Booking throughput: one ``simulate-booking`` call per booking vs ``POST /bookings/bulk``.
+
+Runs the app in-process against a throwaway SQLite database:
+
+    python -m benchmarks.bulk_bookings --bookings 5000 --batch-sizes 100 1000 5000
+
+Both paths write through ``run_write``, so with the SQLite production
+profile every transaction goes through the single writer queue.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+def main(args):
+    os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/bulk.db"
+
+    from fastapi.testclient import TestClient
+    from sqlalchemy import event
+
+    from backend.main import app
+    from backend.database import engine, writer_engine
+    from .common import report
+
+    commits = []
+    for target in {engine, writer_engine or engine}:
+        event.listen(target.sync_engine, "commit", lambda conn: commits.append(1))
+
+    with TestClient(app) as client:
+        client.post("/api/v1/auth/register", json={
+            "username": "bulk", "email": "bulk@example.com",
+            "full_name": "Bulk", "password": "benchmark-password"
+        })
+        token = client.post("/api/v1/auth/login", json={
+            "username": "bulk", "password": "benchmark-password"
+        }).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+        item = {"booking_type": "hotel", "service_name": "Harbour View Hotel", "amount": 180.0}
+
+        commits.clear()
+        start = time.perf_counter()
+        for _ in range(args.bookings):
+            client.post("/api/v1/bookings/simulate-booking", headers=headers, params=item).raise_for_status()
+        elapsed = time.perf_counter() - start
+        report(f"simulate-booking x {args.bookings:,}", {
+            "elapsed (s)": elapsed,
+            "bookings/s": f"{args.bookings / elapsed:,.0f}",
+            "HTTP requests": args.bookings,
+            "commits": len(commits),
+        })
+        single_rate = args.bookings / elapsed
+
+        for batch_size in args.batch_sizes:
+            commits.clear()
+            created = 0
+            start = time.perf_counter()
+            for offset in range(0, args.bookings, batch_size):
+                count = min(batch_size, args.bookings - offset)
+                response = client.post("/api/v1/bookings/bulk", headers=headers, json={"items": [item] * count})
+                response.raise_for_status()
+                created += response.json()["created"]
+            elapsed = time.perf_counter() - start
+            report(f"bulk, {batch_size:,} per request", {
+                "elapsed (s)": elapsed,
+                "bookings/s": f"{args.bookings / elapsed:,.0f}",
+                "speedup vs single": args.bookings / elapsed / single_rate,
+                "HTTP requests": -(-args.bookings // batch_size),
+                "commits": len(commits),
+            })
+            if created != args.bookings:
+                print(f"\nFAIL: created {created} of {args.bookings} bookings")
+                sys.exit(1)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--bookings", type=int, default=5000)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[100, 1000, 5000])
+    main(parser.parse_args())
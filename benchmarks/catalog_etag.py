@@ -0,0 +1,69 @@
+"""Full responses against ``If-None-Match`` revalidations on the catalog endpoints.
+
+Runs the app in-process against a throwaway SQLite database:
+
+    python -m benchmarks.catalog_etag --repeat 200
+
+For each endpoint, times a plain request (200, body serialized) and a
+conditional request carrying the ETag it returned (304, empty body).
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+ENDPOINTS = [
+    ("destination", "/api/v1/destinations/1", {}),
+    ("popular", "/api/v1/destinations/popular", {"limit": 100}),
+    ("search", "/api/v1/destinations/search", {"query": "tokyo"}),
+    ("clusters", "/api/v1/destinations/clusters", {
+        "min_lat": -90, "min_lon": -180, "max_lat": 90, "max_lon": 180, "zoom": 2
+    }),
+]
+
+def main(args):
+    os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/catalog.db"
+
+    from fastapi.testclient import TestClient
+
+    from backend.main import app
+    from .common import report
+
+    def timed(client, url, headers, params):
+        timings = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            response = client.get(url, headers=headers, params=params)
+            timings.append(time.perf_counter() - start)
+        return statistics.median(timings) * 1000, response
+
+    with TestClient(app) as client:
+        client.post("/api/v1/auth/register", json={
+            "username": "cacher", "email": "cacher@example.com",
+            "full_name": "Cacher", "password": "benchmark-password"
+        })
+        token = client.post("/api/v1/auth/login", json={
+            "username": "cacher", "password": "benchmark-password"
+        }).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+
+        for label, url, params in ENDPOINTS:
+            full_ms, full = timed(client, url, headers, params)
+            full.raise_for_status()
+            conditional_ms, conditional = timed(
+                client, url, {**headers, "If-None-Match": full.headers["etag"]}, params
+            )
+            report(f"{label}: {url}", {
+                "200 median (ms)": full_ms,
+                "200 body bytes": len(full.content),
+                "304 median (ms)": conditional_ms,
+                "304 status": conditional.status_code,
+                "ETag": full.headers["etag"],
+                "Cache-Control": full.headers["cache-control"],
+            })
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=200)
+    main(parser.parse_args())
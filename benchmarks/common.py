@@ -0,0 +1,53 @@
+"""Helpers shared by the HTTP benchmarks.
+
+The benchmarks talk to a running server, e.g.
+``python -m uvicorn backend.main:app --port 8000``, so the same script can be
+pointed at two builds to compare them.
+"""
+import time
+import uuid
+
+import httpx
+
+DEFAULT_BASE_URL = "http://localhost:8000"
+
+async def register_and_login(client: httpx.AsyncClient, username: str = None) -> dict:
+    """Create a throwaway user and return its Authorization header"""
+    username = username or f"bench_{uuid.uuid4().hex[:10]}"
+    password = "benchmark-password"
+    await client.post("/api/v1/auth/register", json={
+        "username": username,
+        "email": f"{username}@example.com",
+        "full_name": "Benchmark User",
+        "password": password
+    })
+    response = await client.post("/api/v1/auth/login", json={"username": username, "password": password})
+    response.raise_for_status()
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+def percentile(samples: list, pct: float) -> float:
+    """Nearest-rank percentile of a list of samples"""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+def report(title: str, rows: dict):
+    """Print a small aligned result table"""
+    print(f"\n{title}")
+    width = max(len(key) for key in rows)
+    for key, value in rows.items():
+        if isinstance(value, float):
+            value = f"{value:,.2f}"
+        print(f"  {key.ljust(width)}  {value}")
+
+class Timer:
+    """Context manager measuring wall-clock seconds"""
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.elapsed = time.perf_counter() - self.start
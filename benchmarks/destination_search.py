@@ -0,0 +1,114 @@
+"""Destination search latency: the full-text index against the old ILIKE scan.
+
+Builds a throwaway SQLite catalog of synthetic destinations and times the
+same queries both ways:
+
+    python -m benchmarks.destination_search --rows 500000
+
+The ILIKE query is the one ``/destinations/search`` ran before the index
+(``name``/``country``/``city`` with ``%q%``, no ordering). The hit column shows
+what each approach finds; ILIKE never matches typos or attraction names.
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import tempfile
+import time
+
+SYLLABLES = ["ka", "lo", "mi", "ra", "ten", "vor", "sa", "bel", "dun", "ri", "po", "zan", "qui", "mar", "tol", "ven"]
+COUNTRIES = ["France", "Japan", "Italy", "Peru", "Kenya", "Norway", "Chile", "Vietnam", "Morocco", "Canada"]
+ATTRACTIONS = ["Cathedral", "Museum", "Harbour", "Market", "Castle", "Gardens", "Tower", "Bazaar"]
+DISHES = ["Ramen", "Tagine", "Ceviche", "Pierogi", "Paella", "Gelato", "Curry", "Dumplings"]
+WORDS = ["ancient", "coastal", "vibrant", "quiet", "mountain", "historic", "modern", "river", "desert", "island"]
+
+QUERIES = [
+    ("exact name", "Paris"),
+    ("prefix", "Toky"),
+    ("country", "Norway"),
+    ("typo", "Pariss"),
+    ("attraction", "Eiffel"),
+    ("two words", "historic harbour"),
+    ("no match", "zzqxv"),
+]
+
+def synthetic_name(rng: random.Random) -> str:
+    return "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))).capitalize()
+
+def synthetic_rows(rng: random.Random, count: int) -> list:
+    rows = []
+    for _ in range(count):
+        name = synthetic_name(rng)
+        rows.append({
+            "name": name,
+            "country": rng.choice(COUNTRIES),
+            "city": synthetic_name(rng),
+            "description": f"A {rng.choice(WORDS)} {rng.choice(WORDS)} destination called {name}.",
+            "attractions": [
+                {"name": f"{name} {rng.choice(ATTRACTIONS)}", "type": "landmark"} for _ in range(2)
+            ],
+            "local_cuisine": [{"name": rng.choice(DISHES), "type": "main_dish"}],
+            "tourist_rating": round(rng.uniform(5, 10), 1),
+        })
+    return rows
+
+def main(args):
+    os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/search.db"
+
+    from sqlalchemy import insert, select, func
+
+    from backend.database import SessionLocal, engine, init_db, write_queue
+    from backend.models import Destination
+    from backend.search import search_destination_ids
+    from .common import report
+
+    async def old_search(session, query, limit):
+        return (await session.scalars(select(Destination.id).where(
+            Destination.name.ilike(f"%{query}%") |
+            Destination.country.ilike(f"%{query}%") |
+            Destination.city.ilike(f"%{query}%")
+        ).limit(limit))).all()
+
+    async def timed(func, session, query):
+        timings = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            ids = await func(session, query, args.limit)
+            timings.append(time.perf_counter() - start)
+        return statistics.median(timings), len(ids)
+
+    async def run():
+        await init_db()
+        rng = random.Random(42)
+        seed_start = time.perf_counter()
+        async with SessionLocal() as session:
+            for offset in range(0, args.rows, 10000):
+                count = min(10000, args.rows - offset)
+                await session.execute(insert(Destination), synthetic_rows(rng, count))
+            await session.commit()
+            total = await session.scalar(select(func.count()).select_from(Destination))
+        print(f"Seeded {total:,} destinations (index kept by triggers) in {time.perf_counter() - seed_start:.1f}s")
+
+        async with SessionLocal() as session:
+            for label, query in QUERIES:
+                old_elapsed, old_hits = await timed(old_search, session, query)
+                new_elapsed, new_hits = await timed(search_destination_ids, session, query)
+                report(f"{label}: {query!r} (limit={args.limit})", {
+                    "ILIKE scan (ms)": old_elapsed * 1000,
+                    "ILIKE hits": old_hits,
+                    "full-text index (ms)": new_elapsed * 1000,
+                    "full-text hits": new_hits,
+                })
+
+        await write_queue.stop()
+        await engine.dispose()
+
+    asyncio.run(run())
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=500000)
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=5)
+    main(parser.parse_args())
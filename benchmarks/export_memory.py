@@ -0,0 +1,185 @@
+"""Peak RSS and throughput of ``GET /api/v1/exports/bookings`` on a large table.
+
+Runs the app in-process against a throwaway SQLite database:
+
+    python -m benchmarks.export_memory --bookings 1000000
+
+The response is driven through the ASGI interface with a ``send`` that
+counts and discards the body, so only the server's memory is measured
+(the test client would buffer the whole download). For comparison,
+``--materialized`` also builds the same NDJSON body from one ``.all()``
+query, as a non-streaming endpoint would.
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import threading
+import time
+
+def rss_mb() -> tuple:
+    """Total and anonymous (heap) resident memory of this process, in MB.
+
+    Total RSS also counts file-backed pages, including SQLite's mmap of the
+    database file, which grows with the data read but is reclaimable.
+    """
+    fields = {}
+    with open("/proc/self/status") as status:
+        for line in status:
+            if line.startswith(("VmRSS:", "RssAnon:")):
+                name, value, _ = line.split()
+                fields[name] = int(value) / 1024
+    return fields["VmRSS:"], fields["RssAnon:"]
+
+class PeakRSS:
+    """Samples this process's resident set size in a background thread"""
+
+    def __enter__(self):
+        self.baseline = self.peak = rss_mb()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+        return self
+
+    def _sample(self):
+        while not self._stop.wait(0.005):
+            self._update()
+
+    def _update(self):
+        total, anonymous = rss_mb()
+        self.peak = (max(self.peak[0], total), max(self.peak[1], anonymous))
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self._update()
+
+    def rows(self) -> dict:
+        return {
+            "RSS before (MB)": self.baseline[0],
+            "peak RSS (MB)": self.peak[0],
+            "heap RSS before (MB)": self.baseline[1],
+            "peak heap RSS (MB)": self.peak[1],
+            "peak heap growth (MB)": self.peak[1] - self.baseline[1],
+        }
+
+def main(args):
+    os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/export.db"
+
+    from datetime import datetime
+    from fastapi.testclient import TestClient
+    from sqlalchemy import insert, select
+
+    from backend.main import app
+    from backend.database import SessionLocal
+    from backend.exports import encode_ndjson, export_columns
+    from backend.models import Booking, BookingStatus, BookingType, User
+    from .common import report
+
+    with TestClient(app) as client:
+        client.post("/api/v1/auth/register", json={
+            "username": "exporter", "email": "exporter@example.com",
+            "full_name": "Exporter", "password": "benchmark-password"
+        })
+        token = client.post("/api/v1/auth/login", json={
+            "username": "exporter", "password": "benchmark-password"
+        }).json()["access_token"]
+
+        async def seed():
+            async with SessionLocal() as session:
+                user_id = await session.scalar(select(User.id).where(User.username == "exporter"))
+                now = datetime.utcnow()
+                for offset in range(0, args.bookings, 10000):
+                    await session.execute(insert(Booking), [
+                        {
+                            "user_id": user_id, "booking_reference": f"E{i:012d}",
+                            "booking_type": BookingType.HOTEL, "service_name": "Harbour View Hotel",
+                            "booking_date": now, "total_amount": 180.0, "currency": "USD",
+                            "status": BookingStatus.CONFIRMED,
+                            "confirmation_details": {"room": "double", "nights": 3, "breakfast": True},
+                        }
+                        for i in range(offset, min(offset + 10000, args.bookings))
+                    ])
+                await session.commit()
+                return user_id
+
+        seed_start = time.perf_counter()
+        user_id = client.portal.call(seed)
+        print(f"Seeded {args.bookings:,} bookings in {time.perf_counter() - seed_start:.1f}s")
+
+        async def download(export_format):
+            path = "/api/v1/exports/bookings"
+            scope = {
+                "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+                "method": "GET", "scheme": "http", "path": path, "raw_path": path.encode(),
+                "root_path": "", "query_string": f"format={export_format}".encode(),
+                "headers": [(b"host", b"testserver"), (b"authorization", f"Bearer {token}".encode())],
+                "client": ("127.0.0.1", 50000), "server": ("testserver", 80),
+            }
+            state = {"status": None, "bytes": 0, "lines": 0}
+            requested = asyncio.Event()
+            disconnected = asyncio.Event()
+
+            async def receive():
+                if not requested.is_set():
+                    requested.set()
+                    return {"type": "http.request", "body": b"", "more_body": False}
+                await disconnected.wait()
+                return {"type": "http.disconnect"}
+
+            async def send(message):
+                if message["type"] == "http.response.start":
+                    state["status"] = message["status"]
+                elif message["type"] == "http.response.body":
+                    body = message.get("body", b"")
+                    state["bytes"] += len(body)
+                    state["lines"] += body.count(b"\n")
+                    if not message.get("more_body", False):
+                        disconnected.set()
+
+            await app(scope, receive, send)
+            return state
+
+        results = {}
+        for export_format in ("ndjson", "csv"):
+            with PeakRSS() as rss:
+                start = time.perf_counter()
+                state = client.portal.call(download, export_format)
+                elapsed = time.perf_counter() - start
+            rows = state["lines"] - (1 if export_format == "csv" else 0)
+            results[f"streamed {export_format}"] = {
+                "status": state["status"],
+                "rows": f"{rows:,}",
+                "body (MB)": state["bytes"] / 2**20,
+                "elapsed (s)": elapsed,
+                "rows/s": f"{rows / elapsed:,.0f}",
+                **rss.rows(),
+            }
+
+        if args.materialized:
+            async def materialized():
+                columns = export_columns(Booking, include_user=False)
+                async with SessionLocal() as session:
+                    rows = (await session.execute(
+                        select(*columns).where(Booking.user_id == user_id).order_by(Booking.created_at, Booking.id)
+                    )).all()
+                return len(encode_ndjson([column.key for column in columns], rows))
+
+            with PeakRSS() as rss:
+                start = time.perf_counter()
+                body_bytes = client.portal.call(materialized)
+                elapsed = time.perf_counter() - start
+            results["materialized ndjson (.all())"] = {
+                "body (MB)": body_bytes / 2**20,
+                "elapsed (s)": elapsed,
+                **rss.rows(),
+            }
+
+    for title, rows in results.items():
+        report(f"Export of {args.bookings:,} bookings: {title}", rows)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--bookings", type=int, default=1000000)
+    parser.add_argument("--materialized", action="store_true")
+    main(parser.parse_args())
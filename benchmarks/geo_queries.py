@@ -0,0 +1,95 @@
+"""Geo index query latency at 1M destinations.
+
+Loads random points into the in-memory grid index used by the
+``/destinations/nearby``, ``/within`` and ``/clusters`` endpoints:
+
+    python -m benchmarks.geo_queries --points 1000000
+
+Points are clustered around a few hundred synthetic cities, like real
+destinations. Nearest-neighbour answers are checked against a brute-force
+haversine scan, which is also timed for comparison.
+"""
+import argparse
+import statistics
+import time
+
+import numpy as np
+
+from backend.geo import GeoIndex, GEO_CELL_DEGREES, haversine_km
+from .common import report, percentile
+
+def synthetic_points(count: int, seed: int):
+    rng = np.random.default_rng(seed)
+    centres_lat = rng.uniform(-55, 70, 500)
+    centres_lon = rng.uniform(-180, 180, 500)
+    centre = rng.integers(0, 500, count)
+    lats = np.clip(centres_lat[centre] + rng.normal(0, 2, count), -89.9, 89.9)
+    lons = (centres_lon[centre] + rng.normal(0, 2, count) + 180) % 360 - 180
+    return np.arange(1, count + 1), lats, lons
+
+def time_queries(queries, run):
+    timings = []
+    sizes = []
+    for query in queries:
+        start = time.perf_counter()
+        result = run(*query)
+        timings.append((time.perf_counter() - start) * 1000)
+        sizes.append(len(result))
+    return {
+        "median (ms)": statistics.median(timings),
+        "p99 (ms)": percentile(timings, 99),
+        "max (ms)": max(timings),
+        "median results": statistics.median(sizes),
+    }
+
+def main(args):
+    ids, lats, lons = synthetic_points(args.points, args.seed)
+    index = GeoIndex(GEO_CELL_DEGREES)
+    start = time.perf_counter()
+    index.load(zip(ids.tolist(), lats.tolist(), lons.tolist()))
+    len(index)
+    print(f"Indexed {args.points:,} points in {time.perf_counter() - start:.2f}s")
+
+    rng = np.random.default_rng(args.seed + 1)
+    probes = list(zip(rng.uniform(-60, 75, args.queries).tolist(), rng.uniform(-180, 180, args.queries).tolist()))
+
+    # Correctness: distances of the k nearest must match a full scan
+    for lat, lon in probes[:20]:
+        expected = np.sort(haversine_km(lat, lon, lats, lons))[:args.k]
+        actual = [distance for _, _, _, distance in index.nearest(lat, lon, args.k)]
+        assert np.allclose(actual, expected), (lat, lon)
+
+    report(f"k-nearest (k={args.k})", time_queries(
+        [(lat, lon, args.k) for lat, lon in probes], index.nearest
+    ))
+    report("k-nearest by full haversine scan", time_queries(
+        [(lat, lon) for lat, lon in probes[:20]],
+        lambda lat, lon: np.argpartition(haversine_km(lat, lon, lats, lons), args.k)[:args.k]
+    ))
+
+    for label, span in [("city", 0.5), ("region", 5.0), ("country", 15.0)]:
+        report(f"bounding box, {label} ({span:g} deg, limit={args.limit})", time_queries(
+            [(lat, lon, lat + span, lon + span, args.limit) for lat, lon in probes], index.within
+        ))
+
+    for zoom, span in [(2, 180.0), (5, 30.0), (9, 2.0), (13, 0.15)]:
+        # Cluster levels are built on first use at each zoom
+        start = time.perf_counter()
+        index.clusters(0, 0, 1, 1, zoom, 1)
+        build = (time.perf_counter() - start) * 1000
+        rows = time_queries(
+            [(max(lat - span / 2, -90), lon, min(lat + span / 2, 90), (lon + span + 180) % 360 - 180, zoom, 5000)
+             for lat, lon in probes],
+            index.clusters
+        )
+        rows["first-use build (ms)"] = build
+        report(f"clusters, zoom {zoom} ({span:g} deg viewport)", rows)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--points", type=int, default=1000000)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--limit", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=7)
+    main(parser.parse_args())
@@ -0,0 +1,112 @@
+"""flan-t5 on CPU per inference backend: latency, peak RSS and output parity with fp32 torch.
+
+Needs torch and transformers, plus ``optimum[onnxruntime]`` for onnx:
+
+    python -m benchmarks.inference_backends --backends torch int8 onnx --max-new-tokens 500
+
+Each backend runs in its own process, so peak RSS (the process's maximum
+resident set size, model included) is not shared between them. The fixed
+planner prompts are generated one at a time, as the planner app does, and
+every text is compared with the torch backend's text for the same prompt.
+The ONNX export happens on the first onnx run; run it twice to time a load
+from the exported files.
+"""
+import argparse
+import difflib
+import json
+import resource
+import statistics
+import subprocess
+import sys
+import time
+
+PROMPTS = [
+    "Plan a 3-day couple trip to Paris in April. Budget: $1500. Interests include food, museums.",
+    "Plan a 5-day solo trip to Kyoto in November. Budget: moderate. Interests include temples, hiking.",
+    "Plan a 2-day family trip to Lisbon in Summer. Budget: €800. Interests include beaches, history.",
+    "Plan a 7-day group trip to Cape Town in March. Budget: not specified. Interests include wine, nature.",
+    "Plan a 4-day business trip to Singapore in June. Budget: luxury. Interests include food, architecture.",
+    "Plan a 6-day couple trip to Reykjavik in winter. Budget: $3000. Interests include northern lights, spas.",
+]
+SUFFIX = (
+    " Provide a detailed, day-by-day itinerary with morning, afternoon, and evening plans."
+    " Include food recommendations, accommodations, transport tips, and safety advice."
+)
+
+def measure(backend: str, args) -> dict:
+    """Runs in the child process for one backend"""
+    import torch
+    from backend.inference import GENERATION_KWARGS, MAX_INPUT_TOKENS, load_model
+
+    start = time.perf_counter()
+    # Bounds torch's threads, or ONNX Runtime's for onnx
+    tokenizer, model = load_model(args.model, backend, args.threads)
+    load_seconds = time.perf_counter() - start
+
+    texts, latencies, tokens = [], [], 0
+    for prompt in PROMPTS:
+        inputs = tokenizer(prompt + SUFFIX, return_tensors="pt", truncation=True, max_length=MAX_INPUT_TOKENS)
+        start = time.perf_counter()
+        with torch.inference_mode():
+            outputs = model.generate(**inputs, max_new_tokens=args.max_new_tokens, **GENERATION_KWARGS)
+        latencies.append((time.perf_counter() - start) * 1000)
+        tokens += int((outputs != tokenizer.pad_token_id).sum())
+        texts.append(tokenizer.decode(outputs[0], skip_special_tokens=True))
+    return {
+        "load_seconds": load_seconds,
+        "latencies": latencies,
+        "tokens": tokens,
+        # Kilobytes on Linux
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "texts": texts,
+    }
+
+def main(args):
+    from .common import percentile, report
+
+    results = {}
+    for backend in args.backends:
+        child = subprocess.run(
+            [sys.executable, "-m", "benchmarks.inference_backends", "--child", backend,
+             "--model", args.model, "--threads", str(args.threads), "--max-new-tokens", str(args.max_new_tokens)],
+            capture_output=True, text=True, check=True
+        )
+        results[backend] = result = json.loads(child.stdout.splitlines()[-1])
+        latencies = result["latencies"]
+        report(f"{backend}: {len(PROMPTS)} prompts, {args.threads} threads, max {args.max_new_tokens} new tokens", {
+            "model load (s)": result["load_seconds"],
+            "median latency (ms)": statistics.median(latencies),
+            "p95 latency (ms)": percentile(latencies, 95),
+            "tokens/s": result["tokens"] / (sum(latencies) / 1000),
+            "peak RSS (MB)": result["peak_rss_mb"],
+        })
+
+    reference = results.get("torch")
+    if reference is None:
+        return
+    for backend, result in results.items():
+        if backend == "torch":
+            continue
+        similarity = [
+            difflib.SequenceMatcher(None, expected, text).ratio()
+            for expected, text in zip(reference["texts"], result["texts"])
+        ]
+        report(f"{backend} vs torch", {
+            "median latency, torch / backend": statistics.median(reference["latencies"]) / statistics.median(result["latencies"]),
+            "peak RSS, backend / torch": result["peak_rss_mb"] / reference["peak_rss_mb"],
+            "identical texts": f"{sum(a == b for a, b in zip(reference['texts'], result['texts']))} / {len(PROMPTS)}",
+            "min text similarity": min(similarity),
+        })
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--backends", nargs="+", default=["torch", "int8", "onnx"])
+    parser.add_argument("--model", default="google/flan-t5-base")
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--max-new-tokens", type=int, default=500)
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        print(json.dumps(measure(args.child, args)))
+    else:
+        main(args)
@@ -0,0 +1,84 @@
+"""Text generation under concurrent users: one prompt per ``generate`` vs dynamic batches.
+
+Runs the inference worker's generator in-process (needs torch and
+transformers, and downloads the model on first use):
+
+    python -m benchmarks.inference_batching --users 8 --prompts 32 --max-batch-size 8
+
+``--users`` threads submit ``--prompts`` planner prompts between them, first
+with batches of one (what every Streamlit session did on its own) and then
+with batching. Both runs use ``--threads`` torch threads. The texts of the
+two runs are compared prompt by prompt.
+"""
+import argparse
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+DESTINATIONS = ["Paris", "Kyoto", "Lisbon", "Cape Town", "Reykjavik", "Cusco", "Hanoi", "Marrakesh"]
+INTERESTS = ["food, history", "beaches, nightlife", "hiking, nature", "museums, architecture"]
+
+def prompts(count):
+    return [
+        f"Plan a {3 + number % 5}-day couple trip to {DESTINATIONS[number % len(DESTINATIONS)]}. "
+        f"Budget: moderate. Interests include {INTERESTS[number % len(INTERESTS)]}. "
+        "Provide a detailed, day-by-day itinerary with morning, afternoon, and evening plans."
+        for number in range(count)
+    ]
+
+def main(args):
+    from backend.inference import BatchingGenerator, INFERENCE_BACKEND, INFERENCE_MODEL, load_model
+    from .common import percentile, report
+
+    # Loaded once and shared, so both runs time generation only
+    tokenizer, model = load_model(args.model or INFERENCE_MODEL, INFERENCE_BACKEND, args.threads)
+    batch = prompts(args.prompts)
+
+    def run(max_batch_size):
+        generator = BatchingGenerator(args.model or INFERENCE_MODEL, max_batch_size, args.window_ms, args.threads, len(batch))
+        generator.tokenizer, generator.model = tokenizer, model
+        generator.start()
+
+        def timed(prompt):
+            start = time.perf_counter()
+            generation = generator.submit(prompt, args.max_new_tokens).result()
+            return generation.text, (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.users) as users:
+            results = list(users.map(timed, batch))
+        elapsed = time.perf_counter() - start
+        generator.stop()
+
+        stats = generator.stats()
+        latencies = [latency for _, latency in results]
+        report(f"max batch size {max_batch_size}: {args.users} users, {len(batch)} prompts, {args.threads} threads", {
+            "median latency (ms)": statistics.median(latencies),
+            "p95 latency (ms)": percentile(latencies, 95),
+            "prompts/s": len(batch) / elapsed,
+            "tokens/s": stats["tokens_per_second"],
+            "batches by size": stats["batch_sizes"],
+            "queue wait p50 / p95 (ms)": f"{stats['queue_wait_ms']['p50']} / {stats['queue_wait_ms']['p95']}",
+        })
+        return [text for text, _ in results], elapsed
+
+    if args.warm_up:
+        run(1)
+    single, single_elapsed = run(1)
+    batched, batched_elapsed = run(args.max_batch_size)
+    report("comparison", {
+        "throughput, batched / single": single_elapsed / batched_elapsed,
+        "identical texts": f"{sum(a == b for a, b in zip(single, batched))} / {len(batch)}",
+    })
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--model", default=None)
+    parser.add_argument("--users", type=int, default=8)
+    parser.add_argument("--prompts", type=int, default=32)
+    parser.add_argument("--max-batch-size", type=int, default=8)
+    parser.add_argument("--window-ms", type=float, default=20)
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--max-new-tokens", type=int, default=200)
+    parser.add_argument("--warm-up", action="store_true")
+    main(parser.parse_args())
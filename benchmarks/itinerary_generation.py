@@ -0,0 +1,64 @@
+"""Per-plan cost of ``generate_smart_itinerary`` for long, many-interest trips.
+
+Runs in-process, with no server or database:
+
+    python -m benchmarks.itinerary_generation --days 30 --plans 2000
+
+The function is looked up on ``backend.itinerary``, or on
+``backend.routers.ai_router`` where older checkouts defined it, so the same
+script can be run against both to compare them.
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+INTERESTS = ["culture", "food", "adventure", "nature", "shopping"]
+
+def main(args):
+    os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/itinerary.db")
+
+    try:
+        from backend import itinerary
+    except ImportError:
+        from backend.routers import ai_router as itinerary
+    from backend.schemas import AITripPlanRequest
+    from .common import report
+
+    request = AITripPlanRequest(
+        destination="Lisbon, Portugal",
+        duration=args.days,
+        travelers=2,
+        budget="moderate",
+        interests=INTERESTS[:args.interests]
+    )
+    generate = itinerary.generate_smart_itinerary
+
+    for _ in range(args.plans // 10):
+        generate(request)
+
+    runs = []
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        for _ in range(args.plans):
+            generate(request)
+        runs.append((time.perf_counter() - start) / args.plans * 1e6)
+
+    rows = {
+        "median per plan (µs)": statistics.median(runs),
+        "best per plan (µs)": min(runs),
+        "plans/s": f"{1e6 / statistics.median(runs):,.0f}",
+    }
+    if "seed" in AITripPlanRequest.model_fields:
+        seeded = request.model_copy(update={"seed": 42})
+        rows["same seed, same plan"] = generate(seeded) == generate(seeded)
+    report(f"{args.days}-day plan, {args.interests} interests, {args.plans:,} plans x {args.repeat}", rows)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--interests", type=int, default=5, choices=range(1, len(INTERESTS) + 1))
+    parser.add_argument("--plans", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=5)
+    main(parser.parse_args())
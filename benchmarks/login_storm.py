@@ -0,0 +1,91 @@
+"""Latency of an unrelated endpoint while 100 logins run concurrently.
+
+    python -m benchmarks.login_storm --logins 100 --rounds 3
+
+Logins that the server sheds with 503 (password hashing saturated) are
+counted separately from failures.
+"""
+import argparse
+import asyncio
+import time
+from collections import Counter
+
+import httpx
+
+from .common import DEFAULT_BASE_URL, register_and_login, percentile, report
+
+PASSWORD = "benchmark-password"
+
+async def login(client: httpx.AsyncClient, username: str, outcomes: Counter, latencies: list):
+    start = time.perf_counter()
+    try:
+        response = await client.post("/api/v1/auth/login", json={"username": username, "password": PASSWORD})
+        outcomes[response.status_code] += 1
+        if response.status_code == 200:
+            latencies.append(time.perf_counter() - start)
+    except httpx.HTTPError as exc:
+        outcomes[type(exc).__name__] += 1
+
+async def probe(client: httpx.AsyncClient, headers: dict, stop: asyncio.Event, latencies: list):
+    while not stop.is_set():
+        start = time.perf_counter()
+        try:
+            await client.get("/api/v1/weather/current", headers=headers, params={"city": "Paris"})
+        except httpx.HTTPError:
+            pass
+        # A timed-out probe still counts, with the time it spent waiting
+        latencies.append(time.perf_counter() - start)
+        await asyncio.sleep(0.01)
+
+async def main(args):
+    limits = httpx.Limits(max_connections=args.logins + 10)
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=300) as client:
+        headers = await register_and_login(client)
+        username = "storm_user"
+        await client.post("/api/v1/auth/register", json={
+            "username": username, "email": "storm_user@example.com",
+            "full_name": "Storm User", "password": PASSWORD
+        })
+
+        idle = []
+        stop = asyncio.Event()
+        probe_task = asyncio.create_task(probe(client, headers, stop, idle))
+        await asyncio.sleep(args.idle_seconds)
+        stop.set()
+        await probe_task
+
+        during, login_latencies, outcomes = [], [], Counter()
+        stop = asyncio.Event()
+        probe_task = asyncio.create_task(probe(client, headers, stop, during))
+        started = time.perf_counter()
+        for _ in range(args.rounds):
+            await asyncio.gather(*(
+                login(client, username, outcomes, login_latencies) for _ in range(args.logins)
+            ))
+        elapsed = time.perf_counter() - started
+        stop.set()
+        await probe_task
+
+    report("GET /api/v1/weather/current, idle", {
+        "p50 (ms)": percentile(idle, 50) * 1000,
+        "p99 (ms)": percentile(idle, 99) * 1000,
+    })
+    report(f"GET /api/v1/weather/current during {args.rounds} x {args.logins} concurrent logins", {
+        "probes": len(during),
+        "p50 (ms)": percentile(during, 50) * 1000,
+        "p99 (ms)": percentile(during, 99) * 1000,
+        "max (ms)": max(during, default=0) * 1000,
+    })
+    report("Logins", {
+        "logins/sec": outcomes[200] / elapsed,
+        "p99 (ms)": percentile(login_latencies, 99) * 1000,
+        **{f"status {key}": count for key, count in sorted(outcomes.items(), key=str)},
+    })
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-url", default=DEFAULT_BASE_URL)
+    parser.add_argument("--logins", type=int, default=100)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--idle-seconds", type=float, default=3.0)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,113 @@
+"""Page latency of the keyset-paginated list endpoints at 100k rows per user.
+
+Runs the app in-process against a throwaway SQLite database:
+
+    python -m benchmarks.pagination_depth --rows 100000
+
+Reports the first page, a page halfway down and the last page of
+``/bookings/my-bookings``, next to fetching every row in one response
+the way the endpoint did before it was paginated.
+"""
+import argparse
+import os
+import tempfile
+import time
+
+def main(args):
+    os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/pagination.db"
+
+    from datetime import datetime, timedelta
+    from fastapi.testclient import TestClient
+    from sqlalchemy import insert, select
+
+    from backend.main import app
+    from backend.database import SessionLocal
+    from backend.models import Booking, BookingStatus, BookingType, User
+    from backend.pagination import encode_cursor
+    from .common import report
+
+    def timed_get(client, headers, params):
+        timings = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            response = client.get("/api/v1/bookings/my-bookings", headers=headers, params=params)
+            timings.append(time.perf_counter() - start)
+            response.raise_for_status()
+        return min(timings), response
+
+    with TestClient(app) as client:
+        client.post("/api/v1/auth/register", json={
+            "username": "pager", "email": "pager@example.com",
+            "full_name": "Pager", "password": "benchmark-password"
+        })
+        token = client.post("/api/v1/auth/login", json={
+            "username": "pager", "password": "benchmark-password"
+        }).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+
+        async def seed():
+            async with SessionLocal() as session:
+                user_id = await session.scalar(select(User.id).where(User.username == "pager"))
+                start = datetime(2024, 1, 1)
+                for offset in range(0, args.rows, 10000):
+                    await session.execute(insert(Booking), [
+                        {
+                            "user_id": user_id,
+                            "booking_reference": f"B{i:09d}",
+                            "booking_type": BookingType.HOTEL,
+                            "service_name": "Benchmark Hotel",
+                            "booking_date": start,
+                            "total_amount": 100.0,
+                            "status": BookingStatus.CONFIRMED,
+                            # A few rows share each second to exercise the id tie-breaker
+                            "created_at": start + timedelta(seconds=i // 3)
+                        }
+                        for i in range(offset, min(offset + 10000, args.rows))
+                    ])
+                await session.commit()
+                return user_id
+
+        seed_start = time.perf_counter()
+        user_id = client.portal.call(seed)
+        print(f"Seeded {args.rows:,} bookings in {time.perf_counter() - seed_start:.1f}s")
+
+        async def cursor_at(depth):
+            async with SessionLocal() as session:
+                row = (await session.execute(
+                    select(Booking.created_at, Booking.id)
+                    .where(Booking.user_id == user_id)
+                    .order_by(Booking.created_at.desc(), Booking.id.desc())
+                    .offset(depth - 1).limit(1)
+                )).one()
+                return encode_cursor(row.created_at, row.id)
+
+        results = {}
+        for label, depth in [("first page", 0), ("middle page", args.rows // 2), ("last page", args.rows - args.limit)]:
+            params = {"limit": args.limit}
+            if depth:
+                params["cursor"] = client.portal.call(cursor_at, depth)
+            elapsed, response = timed_get(client, headers, params)
+            results[label] = (elapsed, len(response.content))
+
+        async def fetch_all():
+            async with SessionLocal() as session:
+                start = time.perf_counter()
+                rows = (await session.scalars(select(Booking).where(Booking.user_id == user_id))).all()
+                return time.perf_counter() - start, len(rows)
+        full_elapsed, full_rows = client.portal.call(fetch_all)
+
+    for label, (elapsed, size) in results.items():
+        report(f"{label} (limit={args.limit})", {
+            "latency (ms)": elapsed * 1000,
+            "response bytes": size,
+        })
+    report(f"Unpaginated query alone ({full_rows:,} ORM rows, before serialization)", {
+        "latency (ms)": full_elapsed * 1000,
+    })
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=5)
+    main(parser.parse_args())
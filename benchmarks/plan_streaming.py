@@ -0,0 +1,115 @@
+"""Time to first itinerary day: ``generate-trip`` (JSON) vs ``generate-trip/stream`` (SSE).
+
+Runs the app in-process against a throwaway SQLite database:
+
+    python -m benchmarks.plan_streaming --days 30 --plans 50 --day-ms 50
+
+Responses are driven through the ASGI interface and every body chunk is
+timestamped as the app sends it, so the stream is not buffered by a test
+client. With JSON the first day arrives with the whole plan. ``--day-ms``
+adds a blocking delay per generated day, standing in for a real model.
+Every request names a new destination so each plan is generated.
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+def main(args):
+    os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/streaming.db"
+
+    import orjson
+    from fastapi.testclient import TestClient
+
+    from backend import planner
+    from backend.main import app
+    from .common import percentile, report
+
+    if args.day_ms:
+        iter_itinerary = planner.iter_itinerary
+
+        def slow_iter_itinerary(*itinerary_args, **kwargs):
+            for day in iter_itinerary(*itinerary_args, **kwargs):
+                time.sleep(args.day_ms / 1000)
+                yield day
+
+        planner.iter_itinerary = slow_iter_itinerary
+
+    with TestClient(app) as client:
+        client.post("/api/v1/auth/register", json={
+            "username": "streamer", "email": "streamer@example.com",
+            "full_name": "Streamer", "password": "benchmark-password"
+        })
+        token = client.post("/api/v1/auth/login", json={
+            "username": "streamer", "password": "benchmark-password"
+        }).json()["access_token"]
+
+        async def timed_post(path, body, first_marker):
+            """Seconds until the first chunk containing ``first_marker`` and until the end"""
+            payload = orjson.dumps(body)
+            scope = {
+                "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+                "method": "POST", "scheme": "http", "path": path, "raw_path": path.encode(),
+                "root_path": "", "query_string": b"",
+                "headers": [
+                    (b"host", b"testserver"), (b"authorization", f"Bearer {token}".encode()),
+                    (b"content-type", b"application/json"), (b"content-length", str(len(payload)).encode()),
+                ],
+                "client": ("127.0.0.1", 50000), "server": ("testserver", 80),
+            }
+            state = {"status": None, "first": None, "end": None, "body": b""}
+            requested = asyncio.Event()
+            finished = asyncio.Event()
+
+            async def receive():
+                if not requested.is_set():
+                    requested.set()
+                    return {"type": "http.request", "body": payload, "more_body": False}
+                await finished.wait()
+                return {"type": "http.disconnect"}
+
+            async def send(message):
+                if message["type"] == "http.response.start":
+                    state["status"] = message["status"]
+                elif message["type"] == "http.response.body":
+                    state["body"] += message.get("body", b"")
+                    if state["first"] is None and first_marker in state["body"]:
+                        state["first"] = time.perf_counter() - start
+                    if not message.get("more_body", False):
+                        state["end"] = time.perf_counter() - start
+                        finished.set()
+
+            start = time.perf_counter()
+            await app(scope, receive, send)
+            return state
+
+        def run(path, label, first_marker):
+            first, total = [], []
+            for number in range(args.plans):
+                body = {
+                    "destination": f"{label} {number}", "duration": args.days, "travelers": 2,
+                    "budget": "moderate", "interests": ["culture", "food", "nature"]
+                }
+                state = client.portal.call(timed_post, path, body, first_marker)
+                assert state["status"] == 200, state
+                first.append(state["first"] * 1000)
+                total.append(state["end"] * 1000)
+            report(f"{path}: {args.plans} {args.days}-day plans, +{args.day_ms} ms per day", {
+                "median time to first day (ms)": statistics.median(first),
+                "p95 time to first day (ms)": percentile(first, 95),
+                "median time to complete plan (ms)": statistics.median(total),
+            })
+            return statistics.median(first)
+
+        json_first = run("/api/v1/ai/generate-trip", "Json", b'"itinerary"')
+        stream_first = run("/api/v1/ai/generate-trip/stream", "Stream", b"event: day")
+        report("comparison", {"time to first day, JSON / SSE": json_first / stream_first})
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--plans", type=int, default=50)
+    parser.add_argument("--day-ms", type=float, default=0)
+    main(parser.parse_args())
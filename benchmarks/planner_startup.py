@@ -0,0 +1,100 @@
+"""Planner app startup: time to first render and ``-X importtime`` breakdown.
+
+Needs streamlit (and transformers for versions that load the model at
+import time):
+
+    python -m benchmarks.planner_startup --runs 5
+
+Every run is a fresh Python process that renders ``TravellingPlanner.py``
+once with streamlit's AppTest, the way a first visitor gets the page, so
+no import or model is cached between runs. ``--app`` points at another
+copy of the script, e.g. ``git show HEAD~1:TravellingPlanner.py >
+/tmp/planner_before.py``, to compare two versions. The import breakdown
+is from the last run and groups modules by top-level package.
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+def render(app: str, timeout: float) -> dict:
+    """Runs in the child process"""
+    start = time.perf_counter()
+    from streamlit.testing.v1 import AppTest
+    harness_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    at = AppTest.from_file(app, default_timeout=timeout).run()
+    return {
+        "harness_seconds": harness_seconds,
+        "render_seconds": time.perf_counter() - start,
+        "exceptions": [exception.value for exception in at.exception],
+        "tabs": len(at.tabs),
+    }
+
+def import_breakdown(stderr: str) -> dict:
+    """Cumulative import microseconds per top-level package"""
+    packages = defaultdict(int)
+    for line in stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        # Only imports made directly by the process; nested ones are in their cumulative time
+        if match and len(match.group(3)) == 1:
+            packages[match.group(4).split(".")[0]] += int(match.group(2))
+    return packages
+
+def main(args):
+    from .common import report
+
+    app = os.path.abspath(args.app)
+    runs = []
+    for _ in range(args.runs):
+        start = time.perf_counter()
+        child = subprocess.run(
+            [sys.executable, "-X", "importtime", "-m", "benchmarks.planner_startup",
+             "--child", app, "--timeout", str(args.timeout)],
+            capture_output=True, text=True, check=True, env={**os.environ, **dict(args.env)}
+        )
+        result = json.loads(child.stdout.splitlines()[-1])
+        result["process_seconds"] = time.perf_counter() - start
+        result["imports"] = import_breakdown(child.stderr)
+        runs.append(result)
+
+    last = runs[-1]
+    report(f"{args.app}: first render in a fresh process x {args.runs}", {
+        "median time to first render (ms)": statistics.median(run["render_seconds"] * 1000 for run in runs),
+        "best time to first render (ms)": min(run["render_seconds"] * 1000 for run in runs),
+        "median process total (ms)": statistics.median(run["process_seconds"] * 1000 for run in runs),
+        "streamlit test harness import (ms)": statistics.median(run["harness_seconds"] * 1000 for run in runs),
+        "tabs rendered": last["tabs"],
+        "exceptions": "; ".join(last["exceptions"]) or "none",
+    })
+    heaviest = sorted(last["imports"].items(), key=lambda item: item[1], reverse=True)[:args.top]
+    report(f"import time by top-level package, last run (total {sum(last['imports'].values()) / 1000:,.0f} ms)", {
+        f"{package} (ms)": microseconds / 1000 for package, microseconds in heaviest
+    })
+
+def environment_variable(value: str):
+    name, _, setting = value.partition("=")
+    return name, setting
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--app", default="TravellingPlanner.py")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--timeout", type=float, default=600)
+    parser.add_argument("--env", type=environment_variable, action="append", default=[],
+                        help="NAME=VALUE set for the app, e.g. PLANNER_WARM_UP=true")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        print(json.dumps(render(args.child, args.timeout)))
+    else:
+        main(args)
@@ -0,0 +1,158 @@
+"""``/destinations/popular`` latency and the cost of keeping its ranking current.
+
+Runs the app in-process against a throwaway SQLite database:
+
+    python -m benchmarks.popular_destinations --destinations 100000 --trips 200000
+
+Reports the endpoint served from the precomputed ranking (and the SQL it
+issues, which should be none) next to the per-request ``ORDER BY
+tourist_rating`` query it replaced, then the background refresh cost: a
+full rebuild, an incremental refresh after new trips, and an idle refresh.
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+def main(args):
+    os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/popular.db"
+
+    from datetime import datetime, timedelta
+    from fastapi.testclient import TestClient
+    from sqlalchemy import event, insert, select
+
+    from backend.main import app
+    from backend.database import engine, SessionLocal
+    from backend.models import Booking, BookingStatus, BookingType, Destination, Trip, User
+    from backend.popularity import popularity_index
+    from backend.serializers import to_destination
+    from .common import report
+
+    statements = []
+    event.listen(engine.sync_engine, "before_cursor_execute", lambda *a: statements.append(a[2]))
+    rng = random.Random(11)
+
+    with TestClient(app) as client:
+        client.post("/api/v1/auth/register", json={
+            "username": "popular", "email": "popular@example.com",
+            "full_name": "Popular", "password": "benchmark-password"
+        })
+        token = client.post("/api/v1/auth/login", json={
+            "username": "popular", "password": "benchmark-password"
+        }).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+
+        async def seed():
+            async with SessionLocal() as session:
+                user_id = await session.scalar(select(User.id).where(User.username == "popular"))
+                for offset in range(0, args.destinations, 10000):
+                    await session.execute(insert(Destination), [
+                        {
+                            "name": f"Destination {i}", "country": "Benchmark",
+                            "tourist_rating": round(rng.uniform(5, 10), 1),
+                            "safety_rating": round(rng.uniform(5, 10), 1),
+                            "attractions": [{"name": "Old Town", "type": "landmark"}],
+                        }
+                        for i in range(offset, min(offset + 10000, args.destinations))
+                    ])
+                destination_ids = (await session.scalars(select(Destination.id))).all()
+                await add_activity(session, user_id, destination_ids, args.trips)
+                await session.commit()
+                return user_id, destination_ids
+
+        async def add_activity(session, user_id, destination_ids, count):
+            now = datetime.utcnow()
+            first_trip = (await session.scalar(select(Trip.id).order_by(Trip.id.desc()).limit(1))) or 0
+            for offset in range(0, count, 10000):
+                batch = range(offset, min(offset + 10000, count))
+                await session.execute(insert(Trip), [
+                    {
+                        "user_id": user_id,
+                        # Skewed towards a few destinations, like real demand
+                        "destination_id": destination_ids[int(rng.paretovariate(1.2)) % len(destination_ids)],
+                        "title": "Trip", "start_date": now, "end_date": now,
+                        "created_at": now - timedelta(days=rng.uniform(0, 45)),
+                    }
+                    for _ in batch
+                ])
+            trip_ids = (await session.scalars(select(Trip.id).where(Trip.id > first_trip))).all()
+            await session.execute(insert(Booking), [
+                {
+                    "user_id": user_id, "trip_id": trip_id,
+                    "booking_reference": f"P{trip_id:010d}", "booking_type": BookingType.HOTEL,
+                    "booking_date": now, "total_amount": 100.0, "status": BookingStatus.CONFIRMED,
+                }
+                for trip_id in trip_ids[::2]
+            ])
+
+        seed_start = time.perf_counter()
+        user_id, destination_ids = client.portal.call(seed)
+        print(f"Seeded {args.destinations:,} destinations and {args.trips:,} trips "
+              f"in {time.perf_counter() - seed_start:.1f}s")
+
+        async def timed_refresh(rebuild):
+            if rebuild:
+                popularity_index._rebuilt_at = None
+            async with SessionLocal() as session:
+                start = time.perf_counter()
+                ranking = await popularity_index.refresh(session)
+                return time.perf_counter() - start, ranking.version
+
+        rebuild_elapsed, _ = client.portal.call(timed_refresh, True)
+
+        async def more_trips():
+            async with SessionLocal() as session:
+                await add_activity(session, user_id, destination_ids, args.new_trips)
+                await session.commit()
+        client.portal.call(more_trips)
+        incremental_elapsed, version = client.portal.call(timed_refresh, False)
+        idle_elapsed, _ = client.portal.call(timed_refresh, False)
+
+        client.get("/api/v1/destinations/popular", headers=headers)
+        timings = []
+        statements.clear()
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            response = client.get("/api/v1/destinations/popular", headers=headers, params={"limit": args.limit})
+            timings.append(time.perf_counter() - start)
+            response.raise_for_status()
+        new_statements = len(statements) / args.repeat
+
+        async def old_query():
+            async with SessionLocal() as session:
+                start = time.perf_counter()
+                destinations = (await session.scalars(
+                    select(Destination).order_by(Destination.tourist_rating.desc()).limit(args.limit)
+                )).all()
+                [to_destination(dest) for dest in destinations]
+                return time.perf_counter() - start
+        old_timings = [client.portal.call(old_query) for _ in range(args.repeat)]
+
+    report(f"GET /destinations/popular?limit={args.limit} (precomputed ranking)", {
+        "median latency (ms)": statistics.median(timings) * 1000,
+        "SQL statements per request": new_statements,
+        "ranking version": version,
+    })
+    report("Old per-request query + response build (no HTTP)", {
+        "median latency (ms)": statistics.median(old_timings) * 1000,
+    })
+    report("Background refresh", {
+        "full rebuild (ms)": rebuild_elapsed * 1000,
+        f"incremental, {args.new_trips:,} new trips (ms)": incremental_elapsed * 1000,
+        "incremental, nothing new (ms)": idle_elapsed * 1000,
+    })
+    if new_statements:
+        print("\nFAIL: the popular endpoint queried the database")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--destinations", type=int, default=100000)
+    parser.add_argument("--trips", type=int, default=200000)
+    parser.add_argument("--new-trips", type=int, default=1000)
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=50)
+    main(parser.parse_args())
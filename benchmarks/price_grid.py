@@ -0,0 +1,78 @@
+"""Price-quote grid: ``pricing.quote_grid`` vs looping over ``calculate_trip_cost``.
+
+Runs in-process, with no server or database:
+
+    python -m benchmarks.price_grid --repeat 50
+
+Builds the full pricing-page grid (3 budget levels x durations 1-30 x
+travelers 1-20 = 1,800 quotes) both ways and checks every component of
+every quote matches.
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+def main(args):
+    os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/price_grid.db")
+
+    from backend.pricing import BUDGET_MULTIPLIERS, COST_COMPONENTS, quote_grid
+    from backend.planner import calculate_trip_cost
+    from backend.schemas import AITripPlanRequest
+    from .common import report
+
+    budgets = list(BUDGET_MULTIPLIERS)
+    durations = range(1, args.max_duration + 1)
+    travelers = range(1, args.max_travelers + 1)
+    cells = len(budgets) * len(durations) * len(travelers)
+
+    def scalar_grid():
+        return [
+            [
+                [
+                    calculate_trip_cost(AITripPlanRequest.model_construct(
+                        destination="Lisbon", duration=duration, travelers=party, budget=budget
+                    ))
+                    for party in travelers
+                ]
+                for duration in durations
+            ]
+            for budget in budgets
+        ]
+
+    def timed(build):
+        runs = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            result = build()
+            runs.append((time.perf_counter() - start) * 1000)
+        return result, runs
+
+    scalar, scalar_runs = timed(scalar_grid)
+    vectorized, vectorized_runs = timed(lambda: quote_grid(budgets, durations, travelers))
+
+    mismatches = sum(
+        getattr(scalar[b][d][t], name) != vectorized[name][b, d, t]
+        for name in (*COST_COMPONENTS, "total")
+        for b in range(len(budgets))
+        for d in range(len(durations))
+        for t in range(len(travelers))
+    )
+    for title, runs in (("scalar calculate_trip_cost loop", scalar_runs), ("vectorized quote_grid", vectorized_runs)):
+        report(f"{title}: {cells:,} quotes x {args.repeat}", {
+            "median per grid (ms)": statistics.median(runs),
+            "best per grid (ms)": min(runs),
+            "per quote (µs)": statistics.median(runs) * 1000 / cells,
+        })
+    report("comparison", {
+        "speedup (median)": statistics.median(scalar_runs) / statistics.median(vectorized_runs),
+        "mismatched values": mismatches,
+    })
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--max-duration", type=int, default=30)
+    parser.add_argument("--max-travelers", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=50)
+    main(parser.parse_args())
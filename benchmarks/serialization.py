@@ -0,0 +1,134 @@
+"""Response serialization cost: hand-built models through FastAPI's encoder vs ``backend.serializers``.
+
+Runs the app in-process against a throwaway SQLite database:
+
+    python -m benchmarks.serialization --trips 1000 --repeat 20
+
+Reports the per-object cost of turning loaded ``Trip`` rows (with their
+destinations) into JSON bytes both ways, then the end-to-end latency of
+``GET /api/v1/trips/?limit=<trips>&fields=*`` on the current code.
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+def main(args):
+    os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/serialization.db"
+    os.environ["MAX_PAGE_SIZE"] = str(max(args.trips, 100))
+
+    from datetime import datetime
+    from fastapi.responses import JSONResponse
+    from fastapi.routing import serialize_response
+    from fastapi.utils import create_response_field
+    from sqlalchemy import select
+    from sqlalchemy.orm import selectinload
+
+    from fastapi.testclient import TestClient
+
+    from backend.main import app
+    from backend.database import SessionLocal
+    from backend.models import Destination, Trip, User
+    from backend.schemas import DestinationResponse, Page, TripResponse
+    from backend.serializers import dump_json, to_trip
+    from .common import report
+
+    def hand_built(trip):
+        """The keyword-by-keyword construction the routers used to do"""
+        destination = trip.destination
+        destination_response = DestinationResponse(
+            **{name: getattr(destination, name) for name in DestinationResponse.model_fields},
+        )
+        fields = {name: getattr(trip, name) for name in TripResponse.model_fields if name != "destination"}
+        return TripResponse(**fields, destination=destination_response)
+
+    response_field = create_response_field(name="response", type_=Page[TripResponse])
+
+    def old_path(trips):
+        # What FastAPI did with the returned model: validate it again against
+        # response_model, walk it with jsonable_encoder, then json.dumps
+        page = Page[TripResponse](items=[hand_built(trip) for trip in trips])
+        content = asyncio.run(serialize_response(field=response_field, response_content=page))
+        return JSONResponse(content).body
+
+    def new_path(trips):
+        page = Page[TripResponse](items=[to_trip(trip) for trip in trips])
+        return dump_json(Page[TripResponse], page)
+
+    with TestClient(app) as client:
+        client.post("/api/v1/auth/register", json={
+            "username": "serializer", "email": "serializer@example.com",
+            "full_name": "Serializer", "password": "benchmark-password"
+        })
+        token = client.post("/api/v1/auth/login", json={
+            "username": "serializer", "password": "benchmark-password"
+        }).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+
+        async def load_trips():
+            async with SessionLocal() as session:
+                user = await session.scalar(select(User).where(User.username == "serializer"))
+                destination_ids = (await session.scalars(select(Destination.id))).all()
+                session.add_all(
+                    Trip(
+                        user_id=user.id,
+                        destination_id=destination_ids[i % len(destination_ids)],
+                        title=f"Trip {i}",
+                        description="A week of museums, food markets and day trips",
+                        start_date=datetime(2025, 5, 1),
+                        end_date=datetime(2025, 5, 7),
+                        total_budget=2500.0,
+                        interests=["food", "culture", "history"],
+                        itinerary={"day_1": ["Arrive", "Old town walk"], "day_2": ["Museum", "Market"]}
+                    )
+                    for i in range(args.trips)
+                )
+                await session.commit()
+            async with SessionLocal() as session:
+                return (await session.scalars(
+                    select(Trip).options(selectinload(Trip.destination)).order_by(Trip.id)
+                )).all()
+        trips = client.portal.call(load_trips)
+
+        if old_path(trips) != new_path(trips):
+            print("WARNING: old and new encodings differ")
+
+        def timed(serialize):
+            timings = []
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                body = serialize(trips)
+                timings.append(time.perf_counter() - start)
+            return statistics.median(timings), len(body)
+
+        old_elapsed, old_bytes = timed(old_path)
+        new_elapsed, new_bytes = timed(new_path)
+
+        client.get("/api/v1/trips/", headers=headers, params={"limit": args.trips, "fields": "*"})
+        timings = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            response = client.get("/api/v1/trips/", headers=headers, params={"limit": args.trips, "fields": "*"})
+            timings.append(time.perf_counter() - start)
+            response.raise_for_status()
+
+    report(f"Serializing {len(trips):,} trips with destinations", {
+        "old: per object (us)": old_elapsed / len(trips) * 1e6,
+        "old: whole page (ms)": old_elapsed * 1000,
+        "new: per object (us)": new_elapsed / len(trips) * 1e6,
+        "new: whole page (ms)": new_elapsed * 1000,
+        "speedup": old_elapsed / new_elapsed,
+        "body bytes (old / new)": f"{old_bytes:,} / {new_bytes:,}",
+    })
+    report(f"GET /api/v1/trips/?limit={args.trips}&fields=* end to end", {
+        "items returned": len(response.json()["items"]),
+        "median latency (ms)": statistics.median(timings) * 1000,
+    })
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--trips", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=20)
+    main(parser.parse_args())
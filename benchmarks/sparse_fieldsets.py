@@ -0,0 +1,115 @@
+"""Bytes on the wire and bytes read from the database for ``fields=`` projections.
+
+Runs the app in-process against a throwaway SQLite database:
+
+    python -m benchmarks.sparse_fieldsets --trips 100 --repeat 50
+
+Seeds trips with a week-long itinerary and lists them with the full
+representation (``fields=*``), the compact list default, and a minimal
+projection. Database volume is the size of the column values the list
+queries return, measured by replaying the captured statements.
+"""
+import argparse
+import os
+import sqlite3
+import statistics
+import tempfile
+import time
+
+PROJECTIONS = [
+    ("full (fields=*)", "*"),
+    ("compact default", None),
+    ("title,start_date,destination.name", "title,start_date,destination.name"),
+]
+
+def main(args):
+    database_path = f"{tempfile.mkdtemp()}/fieldsets.db"
+    os.environ["DATABASE_URL"] = f"sqlite:///{database_path}"
+
+    from datetime import datetime
+    from fastapi.testclient import TestClient
+    from sqlalchemy import event, select
+
+    from backend.main import app
+    from backend.database import engine, SessionLocal
+    from backend.models import Destination, Trip, User
+    from .common import report
+
+    statements = []
+    event.listen(
+        engine.sync_engine, "before_cursor_execute",
+        lambda conn, cursor, statement, parameters, *a: statements.append((statement, parameters))
+    )
+
+    itinerary = {
+        f"day_{day}": [
+            {"time": "09:00", "activity": "Guided old town walk", "notes": "Meet at the main square fountain"},
+            {"time": "13:00", "activity": "Lunch at the covered market", "notes": "Try the regional specialities"},
+            {"time": "16:00", "activity": "Museum visit", "notes": "Tickets booked online in advance"},
+        ]
+        for day in range(1, 8)
+    }
+
+    with TestClient(app) as client:
+        client.post("/api/v1/auth/register", json={
+            "username": "sparse", "email": "sparse@example.com",
+            "full_name": "Sparse", "password": "benchmark-password"
+        })
+        token = client.post("/api/v1/auth/login", json={
+            "username": "sparse", "password": "benchmark-password"
+        }).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+
+        async def add_trips():
+            async with SessionLocal() as session:
+                user = await session.scalar(select(User).where(User.username == "sparse"))
+                destination_ids = (await session.scalars(select(Destination.id))).all()
+                session.add_all(
+                    Trip(
+                        user_id=user.id,
+                        destination_id=destination_ids[i % len(destination_ids)],
+                        title=f"Trip {i}",
+                        description="A week of museums, food markets and day trips",
+                        start_date=datetime(2025, 5, 1),
+                        end_date=datetime(2025, 5, 7),
+                        interests=["food", "culture", "history"],
+                        itinerary=itinerary
+                    )
+                    for i in range(args.trips)
+                )
+                await session.commit()
+        client.portal.call(add_trips)
+
+        replay = sqlite3.connect(database_path)
+        client.get("/api/v1/trips/", headers=headers)
+        for label, fields in PROJECTIONS:
+            params = {"limit": args.trips}
+            if fields is not None:
+                params["fields"] = fields
+            statements.clear()
+            response = client.get("/api/v1/trips/", headers=headers, params=params)
+            response.raise_for_status()
+            db_bytes = sum(
+                len(str(value).encode()) if value is not None else 0
+                for statement, parameters in statements
+                if "FROM trips" in statement or "FROM destinations" in statement
+                for row in replay.execute(statement, parameters).fetchall()
+                for value in row
+            )
+            timings = []
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                client.get("/api/v1/trips/", headers=headers, params=params)
+                timings.append(time.perf_counter() - start)
+            report(f"GET /trips/?limit={args.trips} {label}", {
+                "response bytes": f"{len(response.content):,}",
+                "bytes per trip": len(response.content) / args.trips,
+                "DB bytes read": f"{db_bytes:,}",
+                "median latency (ms)": statistics.median(timings) * 1000,
+            })
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--trips", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=50)
+    main(parser.parse_args())
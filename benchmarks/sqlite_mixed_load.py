@@ -0,0 +1,81 @@
+"""Mixed read/write traffic against a SQLite-backed server.
+
+Writes hit ``/bookings/simulate-booking`` and ``/ai/generate-trip``; reads
+hit ``/bookings/my-bookings`` and ``/trips/``. Start the server with
+``SQLITE_PROFILE=default`` and again with ``SQLITE_PROFILE=production``
+(optionally with ``--workers 2`` to add cross-process contention), then:
+
+    python -m benchmarks.sqlite_mixed_load --clients 100 --write-ratio 0.3
+"""
+import argparse
+import asyncio
+import random
+import time
+from collections import Counter
+
+import httpx
+
+from .common import DEFAULT_BASE_URL, register_and_login, percentile, report
+
+async def write(client: httpx.AsyncClient, headers: dict) -> httpx.Response:
+    if random.random() < 0.5:
+        return await client.post("/api/v1/bookings/simulate-booking", headers=headers, params={
+            "booking_type": "hotel", "service_name": "Benchmark Hotel", "amount": 120.0
+        })
+    return await client.post("/api/v1/ai/generate-trip", headers=headers, json={
+        "destination": "Paris", "duration": 3, "travelers": 2, "budget": "moderate", "interests": ["food"]
+    })
+
+async def read(client: httpx.AsyncClient, headers: dict) -> httpx.Response:
+    path = random.choice(["/api/v1/bookings/my-bookings", "/api/v1/trips/"])
+    return await client.get(path, headers=headers)
+
+async def worker(client, headers, args, deadline, stats):
+    while time.perf_counter() < deadline:
+        is_write = random.random() < args.write_ratio
+        start = time.perf_counter()
+        try:
+            response = await (write if is_write else read)(client, headers)
+            outcome = response.status_code
+        except httpx.HTTPError as exc:
+            outcome = type(exc).__name__
+        elapsed = time.perf_counter() - start
+        kind = "write" if is_write else "read"
+        if outcome == 200:
+            stats[kind].append(elapsed)
+        else:
+            stats["errors"][f"{kind}:{outcome}"] += 1
+
+async def main(args):
+    random.seed(args.seed)
+    limits = httpx.Limits(max_connections=args.clients, max_keepalive_connections=args.clients)
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=60) as client:
+        users = [await register_and_login(client) for _ in range(args.users)]
+        stats = {"read": [], "write": [], "errors": Counter()}
+        started = time.perf_counter()
+        deadline = started + args.duration
+        await asyncio.gather(*(
+            worker(client, users[i % len(users)], args, deadline, stats)
+            for i in range(args.clients)
+        ))
+        elapsed = time.perf_counter() - started
+
+    report(f"Mixed load, {args.clients} clients, {args.write_ratio:.0%} writes", {
+        "reads/sec": len(stats["read"]) / elapsed,
+        "writes/sec": len(stats["write"]) / elapsed,
+        "read p99 (ms)": percentile(stats["read"], 99) * 1000,
+        "write p99 (ms)": percentile(stats["write"], 99) * 1000,
+        "errors": sum(stats["errors"].values()),
+    })
+    for key, count in stats["errors"].most_common():
+        print(f"    {key}: {count}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-url", default=DEFAULT_BASE_URL)
+    parser.add_argument("--clients", type=int, default=100)
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--write-ratio", type=float, default=0.3)
+    parser.add_argument("--duration", type=float, default=20.0)
+    parser.add_argument("--seed", type=int, default=7)
+    asyncio.run(main(parser.parse_args()))
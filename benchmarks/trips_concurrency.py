@@ -0,0 +1,72 @@
+"""Requests/sec for ``GET /api/v1/trips/`` under concurrent load.
+
+Start the server, then run:
+
+    python -m benchmarks.trips_concurrency --clients 200 --duration 20
+
+Run it once against a build using the synchronous Session and once against
+the async database layer to compare throughput.
+"""
+import argparse
+import asyncio
+import time
+
+import httpx
+
+from .common import DEFAULT_BASE_URL, register_and_login, percentile, report
+
+async def seed_trips(client: httpx.AsyncClient, headers: dict, count: int):
+    """Give the benchmark user a few trips so the listing does real work"""
+    for i in range(count):
+        response = await client.post("/api/v1/trips/", headers=headers, json={
+            "title": f"Benchmark trip {i}",
+            "destination_id": 1,
+            "start_date": "2025-05-01T00:00:00",
+            "end_date": "2025-05-07T00:00:00",
+            "interests": ["culture", "food"]
+        })
+        response.raise_for_status()
+
+async def worker(client: httpx.AsyncClient, headers: dict, deadline: float, latencies: list, errors: list):
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        try:
+            response = await client.get("/api/v1/trips/", headers=headers)
+            if response.status_code != 200:
+                errors.append(response.status_code)
+                continue
+        except httpx.HTTPError as exc:
+            errors.append(type(exc).__name__)
+            continue
+        latencies.append(time.perf_counter() - start)
+
+async def main(args):
+    limits = httpx.Limits(max_connections=args.clients, max_keepalive_connections=args.clients)
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=60) as client:
+        headers = await register_and_login(client)
+        await seed_trips(client, headers, args.trips)
+
+        latencies, errors = [], []
+        started = time.perf_counter()
+        deadline = started + args.duration
+        await asyncio.gather(*(
+            worker(client, headers, deadline, latencies, errors)
+            for _ in range(args.clients)
+        ))
+        elapsed = time.perf_counter() - started
+
+    report(f"GET /api/v1/trips/ with {args.clients} concurrent clients", {
+        "requests": len(latencies),
+        "errors": len(errors),
+        "requests/sec": len(latencies) / elapsed,
+        "p50 latency (ms)": percentile(latencies, 50) * 1000,
+        "p99 latency (ms)": percentile(latencies, 99) * 1000,
+    })
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-url", default=DEFAULT_BASE_URL)
+    parser.add_argument("--clients", type=int, default=200)
+    parser.add_argument("--duration", type=float, default=20.0)
+    parser.add_argument("--trips", type=int, default=10)
+    asyncio.run(main(parser.parse_args()))
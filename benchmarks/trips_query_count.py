@@ -0,0 +1,82 @@
+"""SQL statements and latency of ``GET /api/v1/trips/`` as a user's trip count grows.
+
+Runs the app in-process against a throwaway SQLite database:
+
+    python -m benchmarks.trips_query_count --trips 1 10 100 1000
+
+The statement count should not depend on the number of trips;
+``tests/test_trips.py`` asserts that.
+"""
+import argparse
+import os
+import tempfile
+import time
+
+def main(args):
+    os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/query_count.db"
+
+    from datetime import datetime
+    from fastapi.testclient import TestClient
+    from sqlalchemy import event, select
+
+    from backend.main import app
+    from backend.database import engine, SessionLocal
+    from backend.models import Destination, Trip, User
+    from .common import report
+
+    statements = []
+    event.listen(engine.sync_engine, "before_cursor_execute", lambda *a: statements.append(a[2]))
+
+    results = {}
+    with TestClient(app) as client:
+        for index, trip_count in enumerate(args.trips):
+            username = f"counter{index}"
+            client.post("/api/v1/auth/register", json={
+                "username": username, "email": f"{username}@example.com",
+                "full_name": "Query Counter", "password": "benchmark-password"
+            })
+            token = client.post("/api/v1/auth/login", json={
+                "username": username, "password": "benchmark-password"
+            }).json()["access_token"]
+            headers = {"Authorization": f"Bearer {token}"}
+
+            async def add_trips():
+                async with SessionLocal() as session:
+                    user = await session.scalar(select(User).where(User.username == username))
+                    destination_ids = (await session.scalars(select(Destination.id))).all()
+                    session.add_all(
+                        Trip(
+                            user_id=user.id,
+                            destination_id=destination_ids[i % len(destination_ids)],
+                            title=f"Trip {i}",
+                            start_date=datetime(2025, 5, 1),
+                            end_date=datetime(2025, 5, 7),
+                            interests=["food"],
+                            itinerary={}
+                        )
+                        for i in range(trip_count)
+                    )
+                    await session.commit()
+            client.portal.call(add_trips)
+
+            # Warm the user cache so only the listing itself is counted
+            client.get("/api/v1/trips/", headers=headers)
+            statements.clear()
+            start = time.perf_counter()
+            response = client.get("/api/v1/trips/", headers=headers, params={"limit": args.limit})
+            elapsed = time.perf_counter() - start
+            response.raise_for_status()
+            results[trip_count] = (len(statements), elapsed, len(response.json()["items"]))
+
+    for trip_count, (count, elapsed, items) in results.items():
+        report(f"{trip_count} trips", {
+            "items returned": items,
+            "SQL statements": count,
+            "latency (ms)": elapsed * 1000,
+        })
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--trips", type=int, nargs="+", default=[1, 10, 100, 1000])
+    parser.add_argument("--limit", type=int, default=100)
+    main(parser.parse_args())
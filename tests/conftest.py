@@ -0,0 +1,37 @@
+import os
+import tempfile
+import uuid
+
+# Point the app at a throwaway database before backend is first imported
+os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/test.db"
+
+import pytest
+from fastapi.testclient import TestClient
+
+@pytest.fixture(scope="session")
+def client():
+    from backend.main import app
+
+    with TestClient(app) as client:
+        yield client
+
+@pytest.fixture
+def new_user(client):
+    """Registers a user and returns its Authorization header"""
+    def register_and_login():
+        username = f"test_{uuid.uuid4().hex[:10]}"
+        client.post("/api/v1/auth/register", json={
+            "username": username,
+            "email": f"{username}@example.com",
+            "full_name": "Test User",
+            "password": "test-password"
+        })
+        response = client.post("/api/v1/auth/login", json={"username": username, "password": "test-password"})
+        response.raise_for_status()
+        return {"Authorization": f"Bearer {response.json()['access_token']}"}
+    return register_and_login
+
+@pytest.fixture
+def auth_headers(new_user):
+    """Authorization header of a new user"""
+    return new_user()
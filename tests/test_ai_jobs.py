@@ -0,0 +1,116 @@
+import asyncio
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy import select
+
+from backend import ai_jobs
+from backend.ai_jobs import AIJobQueue, ai_job_queue, generate_plan_body
+from backend.database import SessionLocal
+from backend.models import AIJob, AIJobStatus
+
+PLAN = {"destination": "Kyoto", "duration": 2, "travelers": 1, "budget": "moderate", "interests": ["temples"]}
+
+def wait_for_job(client, headers, job_id, timeout=30):
+    deadline = time.monotonic() + timeout
+    while True:
+        job = client.get(f"/api/v1/ai/jobs/{job_id}", headers=headers).json()
+        if job["status"] not in ("queued", "running") or time.monotonic() > deadline:
+            return job
+        time.sleep(0.05)
+
+def test_job_runs_to_a_stored_plan(client, auth_headers, new_user):
+    response = client.post("/api/v1/ai/jobs", headers=auth_headers, json=PLAN)
+    assert response.status_code == 202
+    job = response.json()
+    assert job["status"] in ("queued", "running", "succeeded")
+    assert response.headers["Location"].endswith(f"/api/v1/ai/jobs/{job['id']}")
+
+    job = wait_for_job(client, auth_headers, job["id"])
+    assert job["status"] == "succeeded"
+    assert job["started_at"] is not None and job["finished_at"] is not None
+    assert job["result"]["id"] == job["plan_id"]
+    assert client.get(f"/api/v1/ai/plans/{job['plan_id']}", headers=auth_headers).json() == job["result"]
+    assert client.get(f"/api/v1/ai/jobs/{job['id']}", headers=new_user()).status_code == 404
+
+async def add_jobs(user_id, started):
+    """A job per name, queued if its started_at is None and running otherwise"""
+    now, ids = datetime.utcnow(), {}
+    async with SessionLocal() as session:
+        for name, started_at in started.items():
+            ids[name] = uuid.uuid4().hex
+            session.add(AIJob(
+                id=ids[name], user_id=user_id, request={**PLAN, "destination": f"Kyoto {ids[name]}"},
+                status=AIJobStatus.QUEUED if started_at is None else AIJobStatus.RUNNING,
+                created_at=now, started_at=started_at
+            ))
+        await session.commit()
+    return ids
+
+async def load_jobs(ids):
+    async with SessionLocal() as session:
+        jobs = {job.id: job for job in (await session.scalars(select(AIJob).where(AIJob.id.in_(ids.values())))).all()}
+    return {name: jobs[job_id] for name, job_id in ids.items()}
+
+def test_restart_requeues_only_queued_and_abandoned_jobs(client, auth_headers):
+    user_id = client.get("/api/v1/auth/me", headers=auth_headers).json()["id"]
+    now = datetime.utcnow()
+
+    async def restart():
+        # Jobs from other tests are done, so only these are recovered
+        await ai_job_queue._queue.join()
+        ids = await add_jobs(user_id, {
+            "queued": None,
+            # Claimed by a process that is still generating it
+            "running elsewhere": now,
+            "abandoned": now - timedelta(hours=1),
+        })
+        queue = AIJobQueue(1, "thread", 100, stale_seconds=600)
+        await queue.start()
+        # Queued twice, as when another process recovers it too; runs once
+        queue._queue.put_nowait(ids["queued"])
+        await queue._queue.join()
+        await queue.stop()
+        return {name: job.status for name, job in (await load_jobs(ids)).items()}, queue.completed
+
+    statuses, completed = client.portal.call(restart)
+    assert statuses == {
+        "queued": AIJobStatus.SUCCEEDED,
+        "running elsewhere": AIJobStatus.RUNNING,
+        "abandoned": AIJobStatus.SUCCEEDED,
+    }
+    assert completed == 2
+
+def test_stop_requeues_the_jobs_it_cut_off(client, auth_headers, monkeypatch):
+    user_id = client.get("/api/v1/auth/me", headers=auth_headers).json()["id"]
+    generating, release = threading.Event(), threading.Event()
+
+    def slow_generation(request_data, plan_id):
+        generating.set()
+        release.wait(10)
+        return generate_plan_body(request_data, plan_id)
+    monkeypatch.setattr(ai_jobs, "generate_plan_body", slow_generation)
+
+    async def redeploy():
+        await ai_job_queue._queue.join()
+        ids = await add_jobs(user_id, {"cut off": None})
+        queue = AIJobQueue(1, "thread", 100, stale_seconds=600)
+        await queue.start()
+        assert await asyncio.to_thread(generating.wait, 10)
+        await queue.stop()
+        release.set()
+        stopped = (await load_jobs(ids))["cut off"]
+
+        # The next start runs it at once, without waiting for it to go stale
+        monkeypatch.undo()
+        queue = AIJobQueue(1, "thread", 100, stale_seconds=600)
+        await queue.start()
+        await queue._queue.join()
+        await queue.stop()
+        return stopped, (await load_jobs(ids))["cut off"]
+
+    stopped, restarted = client.portal.call(redeploy)
+    assert (stopped.status, stopped.started_at) == (AIJobStatus.QUEUED, None)
+    assert restarted.status == AIJobStatus.SUCCEEDED
@@ -0,0 +1,30 @@
+import pytest
+
+@pytest.fixture
+def trip_id(client, auth_headers):
+    response = client.post("/api/v1/trips/", headers=auth_headers, json={
+        "title": "Trip 0",
+        "destination_id": 1,
+        "start_date": "2025-05-01T00:00:00",
+        "end_date": "2025-05-07T00:00:00"
+    })
+    response.raise_for_status()
+    return response.json()["id"]
+
+@pytest.mark.parametrize("fields", ["", ",", " , "])
+def test_empty_field_selection_is_rejected(client, auth_headers, trip_id, fields):
+    for path in (f"/api/v1/trips/{trip_id}", "/api/v1/trips/", "/api/v1/destinations/1", "/api/v1/destinations/popular"):
+        response = client.get(path, headers=auth_headers, params={"fields": fields})
+        assert response.status_code == 400, path
+
+def test_fields_select_nested_and_whole_objects(client, auth_headers, trip_id):
+    trip = client.get(f"/api/v1/trips/{trip_id}", headers=auth_headers,
+                      params={"fields": "title,destination.name"}).json()
+    assert trip == {"title": "Trip 0", "destination": {"name": trip["destination"]["name"]}}
+    trip = client.get(f"/api/v1/trips/{trip_id}", headers=auth_headers, params={"fields": "id,destination.*"}).json()
+    assert set(trip) == {"id", "destination"} and "country" in trip["destination"]
+
+def test_unknown_fields_are_rejected(client, auth_headers):
+    response = client.get("/api/v1/trips/", headers=auth_headers, params={"fields": "title,destination.nope"})
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Unknown field: destination.nope"
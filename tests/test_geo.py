@@ -0,0 +1,121 @@
+import numpy as np
+import pytest
+from sqlalchemy import select, text
+
+from backend.catalog import catalog_version
+from backend.database import SessionLocal
+from backend import geo
+from backend.geo import GeoIndex, geo_index, haversine_km
+from backend.models import Destination
+
+@pytest.fixture
+def points():
+    rng = np.random.default_rng(0)
+    lats, lons = rng.uniform(-85, 85, 2000), rng.uniform(-180, 180, 2000)
+    return [(number, float(lat), float(lon)) for number, (lat, lon) in enumerate(zip(lats, lons))]
+
+@pytest.fixture
+def index(points):
+    index = GeoIndex(2.0)
+    index.load(points)
+    return index
+
+@pytest.mark.parametrize("lat, lon", [(48.85, 2.35), (-33.9, 18.4), (0.0, 179.9), (89.0, -10.0)])
+def test_nearest_matches_brute_force(index, points, lat, lon):
+    lats, lons = np.array([point[1] for point in points]), np.array([point[2] for point in points])
+    expected = np.sort(haversine_km(lat, lon, lats, lons))[:10]
+    nearest = index.nearest(lat, lon, 10)
+    assert [distance for _, _, _, distance in nearest] == pytest.approx(expected.tolist())
+
+def test_within_handles_the_antimeridian(index, points):
+    expected = {
+        number for number, lat, lon in points
+        if -10 <= lat <= 10 and (lon >= 170 or lon <= -170)
+    }
+    assert {number for number, _, _ in index.within(-10, 170, 10, -170, 5000)} == expected
+
+def test_clusters_count_every_point_once(index, points):
+    clusters = index.clusters(-90, -180, 90, 180, 2, 10000)
+    assert sum(cluster.count for cluster in clusters) == len(points)
+
+def test_writes_are_queued_until_the_next_query(index):
+    index.upsert(5000, 10.0, 10.0)
+    index.remove(0)
+    assert index.nearest(10.0, 10.0, 1)[0][0] == 5000
+    assert 0 not in {number for number, _, _ in index.within(-90, -180, 90, 180, 5000)}
+
+def nearest_name(client, headers):
+    response = client.get("/api/v1/destinations/nearby", headers=headers, params={"lat": -80.0, "lon": 10.0, "k": 1})
+    return response.json()[0]["name"]
+
+def test_only_committed_destinations_reach_the_index(client, auth_headers):
+    before = nearest_name(client, auth_headers)
+
+    async def add(commit):
+        async with SessionLocal() as db:
+            db.add(Destination(name="Polar Station", country="AQ", city="Polar", latitude=-80.0, longitude=10.0))
+            await db.flush()
+            await (db.commit() if commit else db.rollback())
+
+    client.portal.call(add, False)
+    assert nearest_name(client, auth_headers) == before
+    client.portal.call(add, True)
+    assert nearest_name(client, auth_headers) == "Polar Station"
+
+    async def remove():
+        async with SessionLocal() as db:
+            await db.delete(await db.scalar(select(Destination).where(Destination.name == "Polar Station")))
+            await db.commit()
+    client.portal.call(remove)
+
+def test_local_writes_update_the_index_without_a_reload(client, auth_headers, monkeypatch):
+    nearest_name(client, auth_headers)
+    reloads = []
+    load_geo_index = geo.load_geo_index
+
+    async def counted_load(db):
+        reloads.append(db)
+        await load_geo_index(db)
+    monkeypatch.setattr(geo, "load_geo_index", counted_load)
+
+    async def write(change):
+        async with SessionLocal() as db:
+            station = await db.scalar(select(Destination).where(Destination.name == "Local Station"))
+            change(db, station)
+            await db.commit()
+
+    client.portal.call(write, lambda db, station: db.add(
+        Destination(name="Local Station", country="AQ", city="Local", latitude=-80.0, longitude=10.0)
+    ))
+    assert nearest_name(client, auth_headers) == "Local Station"
+    client.portal.call(write, lambda db, station: setattr(station, "latitude", 80.0))
+    assert nearest_name(client, auth_headers) != "Local Station"
+    client.portal.call(write, lambda db, station: setattr(station, "latitude", -80.0))
+    assert nearest_name(client, auth_headers) == "Local Station"
+    client.portal.call(write, lambda db, station: db.sync_session.delete(station))
+    assert nearest_name(client, auth_headers) != "Local Station"
+    assert reloads == []
+
+def test_index_reloads_when_another_process_changes_the_catalog(client, auth_headers):
+    nearest_name(client, auth_headers)
+
+    # Plain SQL, as another worker or an import script would write
+    async def insert():
+        async with SessionLocal() as db:
+            await db.execute(text(
+                "INSERT INTO destinations (name, country, city, latitude, longitude) "
+                "VALUES ('Remote Station', 'AQ', 'Remote', -80.0, 10.0)"
+            ))
+            await db.commit()
+    client.portal.call(insert)
+
+    # Other workers notice once their cached version expires
+    catalog_version.expire()
+    assert nearest_name(client, auth_headers) == "Remote Station"
+    assert len(geo_index) == client.portal.call(count_located)
+
+async def count_located():
+    async with SessionLocal() as db:
+        return await db.scalar(text(
+            "SELECT COUNT(*) FROM destinations WHERE latitude IS NOT NULL AND longitude IS NOT NULL"
+        ))
@@ -0,0 +1,110 @@
+import pytest
+from fastapi import HTTPException, Request, status
+
+from backend.idempotency import REPLAYED_HEADER, IdempotencyStore
+
+BOOKING = "/api/v1/bookings/simulate-booking"
+PLAN = {"destination": "Paris", "duration": 2, "travelers": 1, "budget": "moderate"}
+
+def booking_params(amount=120.0):
+    return {"booking_type": "hotel", "service_name": "Hotel Lutetia", "amount": amount}
+
+def test_retry_replays_the_first_booking(client, auth_headers):
+    headers = {**auth_headers, "Idempotency-Key": "booking-1"}
+    first = client.post(BOOKING, headers=headers, params=booking_params())
+    retry = client.post(BOOKING, headers=headers, params=booking_params())
+    assert first.status_code == retry.status_code == 200
+    assert retry.json() == first.json()
+    assert retry.headers["Idempotency-Replayed"] == "true"
+    assert "Idempotency-Replayed" not in first.headers
+
+def test_requests_without_a_key_are_not_deduplicated(client, auth_headers):
+    first = client.post(BOOKING, headers=auth_headers, params=booking_params())
+    second = client.post(BOOKING, headers=auth_headers, params=booking_params())
+    assert first.json()["booking_reference"] != second.json()["booking_reference"]
+
+def test_reusing_a_key_for_a_different_request_is_rejected(client, auth_headers):
+    headers = {**auth_headers, "Idempotency-Key": "booking-2"}
+    assert client.post(BOOKING, headers=headers, params=booking_params(120.0)).status_code == 200
+    assert client.post(BOOKING, headers=headers, params=booking_params(99.0)).status_code == 422
+
+def test_keys_are_scoped_per_user(client, auth_headers, new_user):
+    other_headers = {**new_user(), "Idempotency-Key": "booking-3"}
+    headers = {**auth_headers, "Idempotency-Key": "booking-3"}
+    mine = client.post(BOOKING, headers=headers, params=booking_params())
+    theirs = client.post(BOOKING, headers=other_headers, params=booking_params())
+    assert mine.json()["booking_reference"] != theirs.json()["booking_reference"]
+    assert "Idempotency-Replayed" not in theirs.headers
+
+def test_replay_keeps_the_location_header(client, auth_headers):
+    headers = {**auth_headers, "Idempotency-Key": "job-1"}
+    first = client.post("/api/v1/ai/jobs", headers=headers, json=PLAN)
+    retry = client.post("/api/v1/ai/jobs", headers=headers, json=PLAN)
+    assert first.status_code == retry.status_code
+    assert retry.json()["id"] == first.json()["id"]
+    assert retry.headers["Location"] == first.headers["Location"]
+
+def make_request(body=b"{}"):
+    async def receive():
+        return {"type": "http.request", "body": body}
+    return Request({"type": "http", "method": "POST", "path": "/test", "query_string": b"", "headers": []}, receive)
+
+@pytest.fixture
+def store():
+    # A short wait, so a key left pending fails the test quickly
+    return IdempotencyStore(ttl_seconds=3600, pending_timeout_seconds=120, wait_seconds=0.5)
+
+@pytest.fixture
+def user_id(client, auth_headers):
+    return client.get("/api/v1/auth/me", headers=auth_headers).json()["id"]
+
+def test_client_errors_are_stored_and_replayed(client, store, user_id):
+    calls = []
+
+    async def handler():
+        calls.append(None)
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Trip not found")
+
+    async def run():
+        return [await store.run(make_request(), user_id, "not-found", handler) for _ in range(2)]
+
+    first, retry = client.portal.call(run)
+    assert len(calls) == 1
+    assert first.status_code == retry.status_code == 404
+    assert retry.body == first.body
+    assert retry.headers[REPLAYED_HEADER] == "true"
+
+def test_server_errors_release_the_key(client, store, user_id):
+    calls = []
+
+    async def handler():
+        calls.append(None)
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Busy")
+
+    async def run():
+        for _ in range(2):
+            with pytest.raises(HTTPException):
+                await store.run(make_request(), user_id, "busy", handler)
+
+    client.portal.call(run)
+    assert len(calls) == 2
+
+def test_key_is_released_when_storing_the_response_fails(client, store, user_id, monkeypatch):
+    complete = store._complete
+
+    async def failing_complete(*args):
+        raise RuntimeError("database went away")
+
+    async def handler():
+        return {"ok": True}
+
+    async def run():
+        monkeypatch.setattr(store, "_complete", failing_complete)
+        with pytest.raises(RuntimeError):
+            await store.run(make_request(), user_id, "lost", handler)
+        monkeypatch.setattr(store, "_complete", complete)
+        return await store.run(make_request(), user_id, "lost", handler)
+
+    response = client.portal.call(run)
+    assert response.status_code == 200
+    assert REPLAYED_HEADER not in response.headers
@@ -0,0 +1,24 @@
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+from backend.pagination import decode_cursor, encode_cursor, next_page
+
+def test_cursor_round_trip():
+    created_at = datetime(2025, 5, 1, 12, 30, 15, 123456)
+    assert decode_cursor(encode_cursor(created_at, 42)) == (created_at, 42)
+
+@pytest.mark.parametrize("cursor", ["", "%%%", encode_cursor(datetime(2025, 1, 1), 1)[:-4], "WyJub3QgYSBkYXRlIiwgMV0"])
+def test_decode_cursor_rejects_garbage(cursor):
+    with pytest.raises(HTTPException) as error:
+        decode_cursor(cursor)
+    assert error.value.status_code == 400
+
+def test_next_page_returns_a_cursor_only_when_more_rows_follow():
+    rows = [SimpleNamespace(id=row_id, created_at=datetime(2025, 1, row_id)) for row_id in (3, 2, 1)]
+    page, cursor = next_page(rows, 2)
+    assert [row.id for row in page] == [3, 2]
+    assert decode_cursor(cursor) == (datetime(2025, 1, 2), 2)
+    assert next_page(rows, 3) == (rows, None)
@@ -0,0 +1,80 @@
+import json
+
+from backend.plan_cache import normalize_plan_request, plan_key
+from backend.routers import ai_router
+from backend.schemas import AITripPlanRequest
+
+def key(**fields):
+    request = {"destination": "Paris", "duration": 3, "travelers": 2, "budget": "moderate", "seed": 7, **fields}
+    return plan_key(normalize_plan_request(AITripPlanRequest(**request)))
+
+def test_key_ignores_spacing_case_and_duplicate_interests():
+    assert key(interests=["food", "museums"]) == key(
+        destination="  paris ", budget=" Moderate", interests=["Food ", "museums", "food"]
+    )
+
+def test_key_keeps_the_order_of_focus_interests_only():
+    assert key(interests=["food", "museums", "hiking", "wine"]) == key(interests=["food", "museums", "wine", "hiking"])
+    assert key(interests=["food", "museums"]) != key(interests=["museums", "food"])
+
+def test_key_changes_with_every_plan_input():
+    base = key(interests=["food"])
+    for change in ({"destination": "Rome"}, {"duration": 4}, {"travelers": 1}, {"budget": "luxury"},
+                   {"seed": 8}, {"interests": ["art"]}):
+        assert key(**{"interests": ["food"], **change}) != base, change
+
+def test_normalizing_keeps_the_users_interest_order():
+    request = AITripPlanRequest(destination="Paris", duration=3, travelers=2, budget="moderate",
+                                interests=["Museums", "food", "museums"])
+    assert normalize_plan_request(request).interests == ["museums", "food"]
+
+def test_equivalent_requests_share_a_plan_readable_only_by_its_requesters(client, auth_headers, new_user):
+    request = {"destination": "Paris", "duration": 2, "travelers": 1, "budget": "moderate",
+               "interests": ["food", "history"], "seed": 11}
+    plan = client.post("/api/v1/ai/generate-trip", headers=auth_headers, json=request).json()
+    again = client.post("/api/v1/ai/generate-trip", headers=auth_headers, json={
+        **request, "destination": " paris", "budget": "Moderate"
+    }).json()
+    assert again == plan
+    assert client.get(f"/api/v1/ai/plans/{plan['id']}", headers=auth_headers).json() == plan
+    assert client.get(f"/api/v1/ai/plans/{plan['id']}", headers=new_user()).status_code == 404
+    assert client.get("/api/v1/ai/plans/unknown", headers=auth_headers).status_code == 404
+
+def test_listed_plans_lead_to_their_stored_plan(client, auth_headers):
+    request = {"destination": "Lisbon", "duration": 2, "travelers": 2, "budget": "moderate", "interests": ["food"]}
+    plan = client.post("/api/v1/ai/generate-trip", headers=auth_headers, json=request).json()
+    listed = client.get("/api/v1/ai/my-plans", headers=auth_headers).json()["items"]
+    assert [item["plan_id"] for item in listed] == [plan["id"]]
+    assert client.get(f"/api/v1/ai/plans/{listed[0]['plan_id']}", headers=auth_headers).json() == plan
+
+def stream_events(client, headers, request):
+    with client.stream("POST", "/api/v1/ai/generate-trip/stream", headers=headers, json=request) as response:
+        text = "".join(response.iter_text())
+    events = []
+    for block in filter(None, text.split("\n\n")):
+        event, data = block.split("\n", 1)
+        events.append((event.removeprefix("event: "), json.loads(data.removeprefix("data: "))))
+    return events
+
+def test_stream_that_loses_a_race_sends_the_stored_plan(client, auth_headers, monkeypatch):
+    request = {"destination": "Porto", "duration": 2, "travelers": 1, "budget": "moderate", "interests": ["wine"]}
+    stored = client.post("/api/v1/ai/generate-trip", headers=auth_headers, json=request).json()
+
+    # As if this stream had looked the plan up before the other request stored it
+    async def not_cached(key, db):
+        return None
+    monkeypatch.setattr(ai_router.plan_cache, "get", not_cached)
+    monkeypatch.setattr(ai_router, "plan_seed", lambda request: stored["seed"] + 1)
+
+    events = stream_events(client, auth_headers, request)
+    names = [name for name, _ in events]
+    assert names[-2:] == ["replace", "done"]
+    assert events[0][1]["seed"] != stored["seed"]
+    assert events[-2][1] == stored
+    monkeypatch.undo()
+    assert client.get(f"/api/v1/ai/plans/{stored['id']}", headers=auth_headers).json() == stored
+
+def test_stream_sends_no_replace_when_it_stores_the_plan(client, auth_headers):
+    request = {"destination": "Seville", "duration": 2, "travelers": 1, "budget": "moderate", "interests": ["art"]}
+    events = stream_events(client, auth_headers, request)
+    assert [name for name, _ in events] == ["plan", "day", "day", "estimated_cost", "travel_tips", "done"]
@@ -0,0 +1,64 @@
+from contextlib import contextmanager
+
+from sqlalchemy import event
+
+from backend.database import engine
+
+def create_trips(client, headers, count):
+    ids = []
+    for number in range(count):
+        response = client.post("/api/v1/trips/", headers=headers, json={
+            "title": f"Trip {number}",
+            "destination_id": 1 + number % 3,
+            "start_date": "2025-05-01T00:00:00",
+            "end_date": "2025-05-07T00:00:00",
+            "interests": ["food"]
+        })
+        response.raise_for_status()
+        ids.append(response.json()["id"])
+    return ids
+
+@contextmanager
+def counted_statements():
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", record)
+
+def test_trip_listing_statement_count_does_not_grow_with_trips(client, auth_headers):
+    counts, created = [], 0
+    for total in (1, 5, 20):
+        created += len(create_trips(client, auth_headers, total - created))
+        # Warm the user cache so only the listing itself is counted
+        client.get("/api/v1/trips/", headers=auth_headers)
+        with counted_statements() as statements:
+            response = client.get("/api/v1/trips/", headers=auth_headers, params={"limit": 100})
+        assert response.status_code == 200
+        assert len(response.json()["items"]) == total
+        assert all(item["destination"] is not None for item in response.json()["items"])
+        counts.append(len(statements))
+    assert counts[0] > 0 and len(set(counts)) == 1, counts
+
+def test_trip_pages_follow_cursors_without_gaps_or_repeats(client, auth_headers):
+    ids = create_trips(client, auth_headers, 7)
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 3, **({"cursor": cursor} if cursor else {})}
+        page = client.get("/api/v1/trips/", headers=auth_headers, params=params).json()
+        assert len(page["items"]) <= 3
+        seen += [item["id"] for item in page["items"]]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    # Newest first
+    assert seen == ids[::-1]
+
+def test_trip_listing_rejects_a_malformed_cursor(client, auth_headers):
+    response = client.get("/api/v1/trips/", headers=auth_headers, params={"cursor": "not-a-cursor"})
+    assert response.status_code == 400